@@ -0,0 +1,161 @@
+import contextlib
+import copy
+import io
+import time
+from SudokuBitPuzzle import SudokuBitPuzzle
+from SudokuDLX import solve_dlx
+from SudokuFastSolver import solve_fast
+from SudokuPipeline import adaptive_pipeline
+from SudokuPipeline import default_pipeline
+from SudokuPipeline import get_pipeline
+from SudokuPipeline import ordered_optional_states
+from SudokuPuzzle import SudokuPuzzle
+from SudokuSolver import SudokuSolver
+import TestSudokuPuzzle
+
+__author__ = 'william'
+
+
+def get_test_boards():
+    """
+    :return: A list of (board name, board) tuples for every board in TestSudokuPuzzle, sorted by board name
+    """
+    test_class = TestSudokuPuzzle.TestSudokuPuzzle
+    return [(name, getattr(test_class, name)) for name in sorted(vars(test_class))
+            if name.endswith('_board') and isinstance(getattr(test_class, name), list)]
+
+
+def time_solve(puzzle_class, board, repeat, pipeline=None):
+    """
+    :param puzzle_class: The SudokuPuzzle class to benchmark
+    :param board: The board to solve
+    :param repeat: The number of times to solve the board
+    :param pipeline: The SudokuPipeline of the SudokuSolver. None for the default pipeline
+    :return: The fastest time in seconds to construct the puzzle and solve it with a SudokuSolver
+    """
+    best = None
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        ss = SudokuSolver(puzzle_class(copy.deepcopy(board)), pipeline=pipeline)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ss.do_work()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_solve_function(solve_function, board, repeat):
+    """
+    :param solve_function: A function from a board to its solution
+    :param board: The board to solve
+    :param repeat: The number of times to solve the board
+    :return: The fastest time in seconds to solve the board with the solve_function
+    """
+    best = None
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        solve_function(copy.deepcopy(board))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def compare_solve_functions(solve_functions, repeat=3):
+    """
+    :param solve_functions: The functions from a board to its solution to compare
+    :param repeat: The number of times to solve each board
+    Prints the time taken by each solve function to solve every board in TestSudokuPuzzle
+    """
+    totals = [0.0 for _ in solve_functions]
+    print('board'.ljust(40) + ''.join(f.__name__.rjust(18) for f in solve_functions))
+    for (name, board) in get_test_boards():
+        times = [time_solve_function(solve_function, board, repeat) for solve_function in solve_functions]
+        totals = [total + t for (total, t) in zip(totals, times)]
+        print(name.ljust(40) + ''.join(('%.2f ms' % (t * 1000)).rjust(18) for t in times))
+    print('total'.ljust(40) + ''.join(('%.2f ms' % (t * 1000)).rjust(18) for t in totals))
+
+
+def compare_puzzle_classes(puzzle_classes, repeat=3):
+    """
+    :param puzzle_classes: The SudokuPuzzle classes to compare
+    :param repeat: The number of times to solve each board
+    Prints the time taken by each puzzle class to solve every board in TestSudokuPuzzle
+    """
+    totals = [0.0 for _ in puzzle_classes]
+    print('board'.ljust(40) + ''.join(c.__name__.rjust(18) for c in puzzle_classes))
+    for (name, board) in get_test_boards():
+        try:
+            times = [time_solve(puzzle_class, board, repeat) for puzzle_class in puzzle_classes]
+        except Exception as e:
+            print(name.ljust(40) + ' skipped: ' + repr(e))
+            continue
+        totals = [total + t for (total, t) in zip(totals, times)]
+        print(name.ljust(40) + ''.join(('%.2f ms' % (t * 1000)).rjust(18) for t in times))
+    print('total'.ljust(40) + ''.join(('%.2f ms' % (t * 1000)).rjust(18) for t in totals))
+
+
+def compare_pipelines(pipelines, puzzle_class=SudokuBitPuzzle, repeat=3):
+    """
+    :param pipelines: The SudokuPipelines to compare
+    :param puzzle_class: The SudokuPuzzle class used to store the boards
+    :param repeat: The number of times to solve each board
+    Prints the time taken by a SudokuSolver with each pipeline to solve every board in TestSudokuPuzzle
+    """
+    totals = [0.0 for _ in pipelines]
+    print('board'.ljust(40) + ''.join(str(p).rjust(24) for p in pipelines))
+    for (name, board) in get_test_boards():
+        try:
+            times = [time_solve(puzzle_class, board, repeat, pipeline) for pipeline in pipelines]
+        except Exception as e:
+            print(name.ljust(40) + ' skipped: ' + repr(e))
+            continue
+        totals = [total + t for (total, t) in zip(totals, times)]
+        print(name.ljust(40) + ''.join(('%.2f ms' % (t * 1000)).rjust(24) for t in times))
+    print('total'.ljust(40) + ''.join(('%.2f ms' % (t * 1000)).rjust(24) for t in totals))
+
+
+def count_guesses(puzzle_class, board, pipeline=None):
+    """
+    :param puzzle_class: The SudokuPuzzle class used to store the board
+    :param board: The board to solve
+    :param pipeline: The SudokuPipeline of the SudokuSolver. None for the default pipeline
+    :return: The number of guesses made by a SudokuSolver to solve the board
+    """
+    ss = SudokuSolver(puzzle_class(copy.deepcopy(board)), pipeline=pipeline)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ss.do_work()
+    return ss.guess_strategy.num_guesses
+
+
+def compare_guesses(pipelines, puzzle_class=SudokuBitPuzzle, boards=None):
+    """
+    :param pipelines: The SudokuPipelines to compare
+    :param puzzle_class: The SudokuPuzzle class used to store the boards
+    :param boards: A list of (board name, board) tuples. None for every board in TestSudokuPuzzle
+    Prints the number of guesses made by a SudokuSolver with each pipeline to solve every board
+    """
+    totals = [0 for _ in pipelines]
+    print('board'.ljust(40) + ''.join(str(p).rjust(24) for p in pipelines))
+    for (name, board) in boards if boards is not None else get_test_boards():
+        try:
+            num_guesses = [count_guesses(puzzle_class, board, pipeline) for pipeline in pipelines]
+        except Exception as e:
+            print(name.ljust(40) + ' skipped: ' + repr(e))
+            continue
+        totals = [total + n for (total, n) in zip(totals, num_guesses)]
+        print(name.ljust(40) + ''.join(str(n).rjust(24) for n in num_guesses))
+    print('total'.ljust(40) + ''.join(str(n).rjust(24) for n in totals))
+
+
+def main():
+    compare_puzzle_classes([SudokuPuzzle, SudokuBitPuzzle])
+    print()
+    compare_pipelines([default_pipeline, adaptive_pipeline, get_pipeline('singles+search')])
+    print()
+    compare_guesses([default_pipeline, get_pipeline([state for state in ordered_optional_states
+                                                     if state not in ['XY_Wing', 'XYZ_Wing', 'W_Wing']])])
+    print()
+    compare_solve_functions([solve_fast, solve_dlx])
+
+
+if __name__ == "__main__": main()
@@ -0,0 +1,45 @@
+from SudokuHelper import all_possibilities_mask
+from SudokuHelper import bit_count
+from SudokuHelper import bit_to_vals
+from SudokuHelper import val_to_bit
+from SudokuPuzzle import SudokuPuzzle
+
+__author__ = 'william'
+
+
+class SudokuBitPuzzle(SudokuPuzzle):
+    """
+    A SudokuPuzzle whose cell_possibilities are stored as 9-bit masks, where bit (val - 1) is set iff val is possible.
+    It exposes the same API as SudokuPuzzle, but avoids allocating and hashing sets in the candidate operations.
+    """
+
+    # region Cell Possibilities
+    def new_cell_possibilities(self):
+        return all_possibilities_mask
+
+    def get_cell_possibilities(self, cell_id):
+        return set(bit_to_vals[self.cell_possibilities[cell_id]])
+
+    def get_cell_possibility_tuple(self, cell_id):
+        return bit_to_vals[self.cell_possibilities[cell_id]]
+
+    def count_cell_possibilities(self, cell_id):
+        return bit_count[self.cell_possibilities[cell_id]]
+
+    def get_cell_possibility_mask(self, cell_id):
+        return self.cell_possibilities[cell_id]
+
+    def discard_cell_possibility(self, cell_id, val):
+        mask = self.cell_possibilities[cell_id]
+        bit = val_to_bit[val]
+        if mask & bit:
+            self.cell_possibilities[cell_id] = mask & ~bit
+            return True
+        return False
+
+    def add_cell_possibility(self, cell_id, val):
+        self.cell_possibilities[cell_id] |= val_to_bit[val]
+
+    def set_cell_possibilities_to_val(self, cell_id, val):
+        self.cell_possibilities[cell_id] = val_to_bit[val]
+    # endregion
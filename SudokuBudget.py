@@ -0,0 +1,103 @@
+import math
+import time
+
+__author__ = 'william'
+
+
+class SudokuBudget:
+    """
+    Limits on the work a SudokuSolver may do before it stops with a partial result. None means no limit.
+    """
+
+    def __init__(self, max_steps=None, max_guesses=None, deadline=None, max_guess_depth=None):
+        """
+        :param max_steps: The maximum number of steps logged
+        :param max_guesses: The maximum number of guesses made
+        :param deadline: The time.time() after which to stop
+        :param max_guess_depth: The maximum number of guesses assumed at once
+        """
+        self.max_steps = max_steps
+        self.max_guesses = max_guesses
+        self.deadline = deadline
+        self.max_guess_depth = max_guess_depth
+
+    @staticmethod
+    def from_timeout(timeout, max_steps=None, max_guesses=None, max_guess_depth=None):
+        """
+        :param timeout: The number of seconds from now after which to stop, or None
+        :return: A SudokuBudget whose deadline is timeout seconds from now
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        return SudokuBudget(max_steps, max_guesses, deadline, max_guess_depth)
+
+    @staticmethod
+    def parse_timeout(timeout, max_timeout):
+        """
+        :param timeout: The number of seconds asked for, or None
+        :param max_timeout: The number of seconds the timeout is capped at
+        :return: The timeout as a float, capped at max_timeout. max_timeout if timeout is None
+        :raises ValueError: If the timeout is not a finite positive number
+        """
+        if timeout is None:
+            return max_timeout
+        try:
+            timeout = float(timeout)
+        except (TypeError, ValueError):
+            raise ValueError("The timeout must be a number: " + str(timeout))
+        # A nan timeout would give a deadline which is never reached
+        if not math.isfinite(timeout) or timeout <= 0:
+            raise ValueError("The timeout must be a finite positive number: " + str(timeout))
+        return min(timeout, max_timeout)
+
+    @staticmethod
+    def parse_limit(name, limit):
+        """
+        :param name: The name of the limit, for the error message
+        :param limit: The limit asked for, or None
+        :return: The limit as an int, or None if there is no limit
+        :raises ValueError: If the limit is not a non-negative integer
+        """
+        if limit is None:
+            return None
+        parsed_limit = None
+        # A bool is an int, but True is not a limit
+        if isinstance(limit, int) and not isinstance(limit, bool):
+            parsed_limit = limit
+        elif isinstance(limit, (float, str)):
+            try:
+                float_limit = float(limit)
+            except ValueError:
+                float_limit = None
+            # int() would truncate 2.5 into 2
+            if float_limit is not None and float_limit.is_integer():
+                parsed_limit = int(float_limit)
+        if parsed_limit is None:
+            raise ValueError(name + " must be an integer: " + str(limit))
+        if parsed_limit < 0:
+            raise ValueError(name + " must not be negative: " + str(limit))
+        return parsed_limit
+
+    def get_exceeded_reason(self, num_steps):
+        """
+        Checked before every transition of the solver
+        :param num_steps: The number of steps logged so far
+        :return: A description of the limit which was reached, or None if the solver may continue
+        """
+        if self.max_steps is not None and num_steps >= self.max_steps:
+            return "Reached the maximum of " + str(self.max_steps) + " steps"
+        if self.deadline is not None and time.time() > self.deadline:
+            return "Reached the deadline"
+        return None
+
+    def get_guess_exceeded_reason(self, num_guesses, guess_depth):
+        """
+        Checked before every guess
+        :param num_guesses: The number of guesses made so far
+        :param guess_depth: The number of guesses currently assumed
+        :return: A description of the limit which was reached, or None if the solver may guess
+        """
+        if self.max_guesses is not None and num_guesses >= self.max_guesses:
+            return "Reached the maximum of " + str(self.max_guesses) + " guesses"
+        if self.max_guess_depth is not None and guess_depth >= self.max_guess_depth:
+            return "Reached the maximum guess depth of " + str(self.max_guess_depth)
+        return None
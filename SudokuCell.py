@@ -1,30 +1,34 @@
-import copy
-import SudokuHelper
-from SudokuHelper import all_possibilities
+from SudokuHelper import block_by_cell_id
+from SudokuHelper import block_cell_num_by_cell_id
+from SudokuHelper import name_by_cell_id
+from SudokuHelper import x_by_cell_id
+from SudokuHelper import y_by_cell_id
 
 __author__ = 'william'
 
 
 class SudokuCell:
-
-    def __init__(self, y, x, possibilities=None, val=None):
-        self.y = y
-        self.x = x
-        self.block = SudokuHelper.loc_to_block_num(y, x)
-        self.block_cell_num = SudokuHelper.loc_to_block_cell_num(y, x)
-        self.possibilities = copy.deepcopy(possibilities if possibilities is not None else all_possibilities)
-        self.name = 'c' + str(self.y) + str(self.x) + str(self.block)
-        self.val = val
-
-    def set_val(self, val):
-        self.val = val
-        self.possibilities = {val}
-
-    def remove_possibility(self, possibility):
-        if possibility in self.possibilities:
-            self.possibilities.discard(possibility)
-            return True
-        return False
+    """
+    A name-based view of a single cell of a SudokuPuzzle.
+    The val and possibilities of the cell are stored in the puzzle's cell_vals and cell_possibilities arrays.
+    """
+
+    def __init__(self, sudoku_puzzle, cell_id):
+        self.sudoku_puzzle = sudoku_puzzle
+        self.cell_id = cell_id
+        self.y = y_by_cell_id[cell_id]
+        self.x = x_by_cell_id[cell_id]
+        self.block = block_by_cell_id[cell_id]
+        self.block_cell_num = block_cell_num_by_cell_id[cell_id]
+        self.name = name_by_cell_id[cell_id]
+
+    @property
+    def val(self):
+        return self.sudoku_puzzle.cell_vals[self.cell_id]
+
+    @property
+    def possibilities(self):
+        return self.sudoku_puzzle.get_cell_possibilities(self.cell_id)
 
     def to_json(self):
         return {
@@ -35,5 +39,3 @@ class SudokuCell:
             'candidate': self.val,
             'name': self.name
         }
-
-
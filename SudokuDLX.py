@@ -0,0 +1,253 @@
+from SudokuHelper import all_locs
+from SudokuHelper import loc_to_block_num
+
+__author__ = 'william'
+
+
+class SudokuDLX:
+    """
+    An exact cover solver for sudoku boards using Dancing Links (Knuth's Algorithm X).
+    Each of the 729 (y, x, val) placements is a row covering 4 of the 324 constraint columns:
+        * cell (y, x) is filled
+        * row y contains val
+        * col x contains val
+        * block contains val
+    The links are stored in flat lists indexed by node. Node 0 is the root and nodes 1-324 are the column headers.
+    """
+
+    num_columns = 324
+
+    def __init__(self, board):
+        """
+        :param board: A 2D-matrix containing known values
+        """
+        # left/right/up/down contain the index of the neighbouring node in each direction
+        self.left = []
+        self.right = []
+        self.up = []
+        self.down = []
+        # column[node] contains the column header of the node
+        self.column = []
+        # placement[node] contains the (y, x, val) placement of the row containing the node
+        self.placement = []
+        # size[column] contains the number of rows left in the column
+        self.size = [0 for _ in range(0, self.num_columns + 1)]
+        # The (y, x, val) placements of the known values and the rows chosen by the search
+        self.solution = []
+        # False if the known values break a sudoku rule
+        self.is_consistent = True
+
+        self.initialize_columns()
+        rows = {}
+        for y in all_locs:
+            for x in all_locs:
+                for val in range(1, 10):
+                    rows[(y, x, val)] = self.add_row((y, x, val))
+        self.cover_known_values(board, rows)
+
+    @staticmethod
+    def placement_to_columns(y, x, val):
+        """
+        :return: The 4 constraint columns covered by placing val at (y, x)
+        """
+        v = val - 1
+        return (1 + 9 * y + x,
+                82 + 9 * y + v,
+                163 + 9 * x + v,
+                244 + 9 * loc_to_block_num(y, x) + v)
+
+    def new_node(self, column, placement):
+        """
+        :return: A new node linked only to itself
+        """
+        node = len(self.left)
+        self.left.append(node)
+        self.right.append(node)
+        self.up.append(node)
+        self.down.append(node)
+        self.column.append(column)
+        self.placement.append(placement)
+        return node
+
+    def initialize_columns(self):
+        """
+        Creates the root and links the column headers into a circular list
+        """
+        for column in range(0, self.num_columns + 1):
+            self.new_node(column, None)
+        for column in range(0, self.num_columns + 1):
+            self.left[column] = column - 1 if column > 0 else self.num_columns
+            self.right[column] = column + 1 if column < self.num_columns else 0
+
+    def add_row(self, placement):
+        """
+        :param placement: The (y, x, val) placement of the row
+        :return: The first node of the row
+        """
+        first = None
+        for column in SudokuDLX.placement_to_columns(*placement):
+            node = self.new_node(column, placement)
+            # Link the node at the bottom of the column
+            self.up[node] = self.up[column]
+            self.down[node] = column
+            self.down[self.up[column]] = node
+            self.up[column] = node
+            self.size[column] += 1
+            # Link the node at the end of the row
+            if first is None:
+                first = node
+            else:
+                self.left[node] = self.left[first]
+                self.right[node] = first
+                self.right[self.left[first]] = node
+                self.left[first] = node
+        return first
+
+    def cover_known_values(self, board, rows):
+        """
+        Selects the row of each known value
+        :param board: A 2D-matrix containing known values
+        :param rows: A dictionary from (y, x, val) placement to the first node of its row
+        """
+        covered = set()
+        for y in all_locs:
+            for x in all_locs:
+                val = board[y][x]
+                if val is not None:
+                    columns = SudokuDLX.placement_to_columns(y, x, val)
+                    if covered.intersection(columns):
+                        self.is_consistent = False
+                        return
+                    covered.update(columns)
+                    node = rows[(y, x, val)]
+                    self.cover(self.column[node])
+                    self.cover_other_columns(node)
+                    self.solution.append((y, x, val))
+
+    # region Dancing Links
+    def cover(self, column):
+        """
+        Unlinks the column header and every row in the column from the other columns
+        """
+        left, right, up, down = self.left, self.right, self.up, self.down
+        right[left[column]] = right[column]
+        left[right[column]] = left[column]
+        i = down[column]
+        while i != column:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                self.size[self.column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, column):
+        """
+        Relinks what cover(column) unlinked, in reverse order
+        """
+        left, right, up, down = self.left, self.right, self.up, self.down
+        i = up[column]
+        while i != column:
+            j = left[i]
+            while j != i:
+                self.size[self.column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[column]] = column
+        left[right[column]] = column
+
+    def cover_other_columns(self, node):
+        j = self.right[node]
+        while j != node:
+            self.cover(self.column[j])
+            j = self.right[j]
+
+    def uncover_other_columns(self, node):
+        j = self.left[node]
+        while j != node:
+            self.uncover(self.column[j])
+            j = self.left[j]
+
+    def choose_column(self):
+        """
+        :return: The uncovered column with the fewest rows
+        """
+        best = None
+        best_size = 0
+        column = self.right[0]
+        while column != 0:
+            if best is None or self.size[column] < best_size:
+                best = column
+                best_size = self.size[column]
+                if best_size <= 1:
+                    break
+            column = self.right[column]
+        return best
+    # endregion
+
+    def get_board(self):
+        """
+        :return: A 2D-matrix with the values of the current solution
+        """
+        board = [[None for _ in all_locs] for _ in all_locs]
+        for (y, x, val) in self.solution:
+            board[y][x] = val
+        return board
+
+    def iterate_solutions(self, max_count=None):
+        """
+        :param max_count: The maximum number of solutions to yield. None for no limit
+        :return: A generator yielding each solution of the board as a 2D-matrix
+        """
+        if not self.is_consistent or max_count == 0:
+            return
+        count = 0
+        for _ in self.search():
+            yield self.get_board()
+            count += 1
+            if max_count is not None and count >= max_count:
+                return
+
+    def search(self):
+        """
+        Algorithm X. Yields (with self.solution filled in) every time all columns are covered
+        """
+        if self.right[0] == 0:
+            yield
+            return
+        column = self.choose_column()
+        if self.size[column] == 0:
+            return
+        # The links are restored even if the generator is closed early
+        self.cover(column)
+        try:
+            node = self.down[column]
+            while node != column:
+                self.solution.append(self.placement[node])
+                self.cover_other_columns(node)
+                try:
+                    for _ in self.search():
+                        yield
+                finally:
+                    self.uncover_other_columns(node)
+                    self.solution.pop()
+                node = self.down[node]
+        finally:
+            self.uncover(column)
+
+    def solve(self):
+        """
+        :return: The first solution of the board as a 2D-matrix, or None if the board has no solution
+        """
+        return next(self.iterate_solutions(1), None)
+
+
+def solve_dlx(board):
+    """
+    :param board: A 2D-matrix containing known values
+    :return: The solved board, or None if the board has no solution
+    """
+    return SudokuDLX(board).solve()
@@ -0,0 +1,128 @@
+import time
+from SudokuBitPuzzle import SudokuBitPuzzle
+from SudokuError import BadPuzzleError
+from SudokuGuessStrategy import SudokuGuessStrategy
+from SudokuNogoods import SudokuNogoods
+
+__author__ = 'william'
+
+
+def solve_fast(board, puzzle_class=SudokuBitPuzzle, guess_strategy=None, learn_nogoods=False, dead_states=None):
+    """
+    Solves the board using only sole/unique candidate propagation and backtracking on the cell with the fewest
+    possibilities. Unlike SudokuSolver, it does not use a state machine, a SudokuLogger or print anything.
+    :param board: A 2D-matrix containing known values
+    :param puzzle_class: The SudokuPuzzle class used to store the board
+    :param guess_strategy: The SudokuGuessStrategy choosing the guesses. None for MRV
+    :param learn_nogoods: True to jump back and prune guesses with the nogoods of contradictions. See SudokuNogoods
+    :param dead_states: A SudokuTranspositionTable of the states known to have no solution, which can be shared
+    between solves. None to not record dead states
+    :return: The solved board, or None if the board has no solution
+    """
+    try:
+        sp = puzzle_class(board)
+    except BadPuzzleError:
+        return None
+    nogoods = SudokuNogoods() if learn_nogoods else None
+    if search(sp, guess_strategy=guess_strategy, nogoods=nogoods, dead_states=dead_states):
+        return sp.get_board()
+    return None
+
+
+def count_solutions(board, limit=2, puzzle_class=SudokuBitPuzzle, cache=None):
+    """
+    Counts the solutions of the board, stopping as soon as limit solutions have been found.
+    count_solutions(board, 2) == 1 checks that the board has a unique solution.
+    :param board: A 2D-matrix containing known values
+    :param limit: The number of solutions after which to stop counting. None to count every solution
+    :param puzzle_class: The SudokuPuzzle class used to store the board
+    :param cache: A SudokuTranspositionTable from (zobrist_hash, limit) to the count, so boards with the same
+    candidates are only counted once. None to not cache counts
+    :return: The number of solutions of the board, at most limit
+    """
+    try:
+        sp = puzzle_class(board)
+    except BadPuzzleError:
+        return 0
+    if cache is not None:
+        key = (sp.zobrist_hash, limit)
+        count = cache.get(key)
+        if count is not None:
+            return count
+    count = 0
+    for _ in iterate_solutions(sp, limit):
+        count += 1
+    if cache is not None:
+        cache.put(key, count)
+    return count
+
+
+def iterate_solutions(sudoku_puzzle, max_count=None, deadline=None):
+    """
+    Lazily enumerates the solutions of the puzzle. Only the current branch of the guess tree is kept in memory.
+    The puzzle is left in the state of the last solution yielded.
+    :param sudoku_puzzle: The SudokuPuzzle to solve
+    :param max_count: The maximum number of solutions to yield. None for no limit
+    :param deadline: The time.time() after which to stop searching. None for no deadline
+    :return: A generator yielding each solution of the puzzle as a 2D-matrix
+    """
+    count = 0
+    while max_count is None or count < max_count:
+        if not search(sudoku_puzzle, deadline):
+            return
+        yield sudoku_puzzle.get_board()
+        count += 1
+        if sudoku_puzzle.guess is None:
+            return
+        # Reverting the last guess removes its candidate, so the search continues with the next branch
+        sudoku_puzzle.pop_guess()
+
+
+def search(sudoku_puzzle, deadline=None, guess_strategy=None, nogoods=None, dead_states=None):
+    """
+    Propagates and guesses until the puzzle is solved or every guess has been reverted.
+    Reverting a guess removes its candidate from the cell, so the next guess in the cell is tried by propagation.
+    :param sudoku_puzzle: The SudokuPuzzle to solve
+    :param deadline: The time.time() after which to stop searching. None for no deadline
+    :param guess_strategy: The SudokuGuessStrategy choosing the guesses. None for MRV
+    :param nogoods: The SudokuNogoods analysing every contradiction. None to revert the last guess instead
+    :param dead_states: A SudokuTranspositionTable of the zobrist_hash of the states known to have no solution.
+    The state right after a guess is recorded when the guess is reverted, and a guess reaching a recorded state is
+    reverted right away. None to not record dead states
+    :return: True if the puzzle was solved. False if it has no solution. None if the deadline passed
+    """
+    if guess_strategy is None:
+        guess_strategy = SudokuGuessStrategy()
+    while True:
+        if deadline is not None and time.time() > deadline:
+            return None
+        if sudoku_puzzle.propagate() if nogoods is None else nogoods.propagate(sudoku_puzzle):
+            if sudoku_puzzle.num_filled == 81:
+                return True
+            (cell_id, candidate) = guess_strategy.next_guess(sudoku_puzzle)
+            previous_guess = sudoku_puzzle.guess
+            if nogoods is None:
+                sudoku_puzzle.push_guess(cell_id, candidate)
+            else:
+                nogoods.push_guess(sudoku_puzzle, cell_id, candidate)
+            if dead_states is not None and sudoku_puzzle.guess is not previous_guess and \
+                    sudoku_puzzle.zobrist_hash in dead_states:
+                if nogoods is None:
+                    sudoku_puzzle.pop_guess()
+                else:
+                    nogoods.pop_guess(sudoku_puzzle)
+                guess_strategy.record_backtrack()
+        elif sudoku_puzzle.guess is None:
+            return False
+        elif nogoods is None:
+            if dead_states is not None:
+                dead_states.put(sudoku_puzzle.guess.zobrist_hash)
+            sudoku_puzzle.pop_guess()
+            guess_strategy.record_backtrack()
+        else:
+            guess = nogoods.backjump(sudoku_puzzle)
+            if guess is None:
+                return False
+            if dead_states is not None:
+                dead_states.put(guess.zobrist_hash)
+            guess_strategy.record_backtrack()
@@ -0,0 +1,133 @@
+from SudokuHelper import all_cell_ids
+from SudokuHelper import peers_by_cell_id
+from SudokuHelper import units_by_cell_id
+
+__author__ = 'william'
+
+
+class SudokuGuessStrategy:
+    """
+    Chooses the guesses made when no technique applies. A strategy selects the cell to guess in and the order in which
+    its candidates are tried, and counts the guesses and backtracks made with it.
+    The base strategy is MRV: the first empty cell with the fewest possibilities, guessing its lowest candidate.
+    Subclasses override select_cell_id and/or order_candidates.
+    """
+
+    name = 'mrv'
+
+    def __init__(self):
+        # The number of guesses made with this strategy
+        self.num_guesses = 0
+        # The number of guesses reverted because they led to a contradiction
+        self.num_backtracks = 0
+
+    def select_cell_id(self, sudoku_puzzle):
+        """
+        :param sudoku_puzzle: The SudokuPuzzle to guess in
+        :return: The id of the empty cell with the fewest (but at least 2) possibilities, or None if there is none
+        """
+        best_cell_id = None
+        best_count = 10
+        for cell_id in all_cell_ids:
+            count = sudoku_puzzle.count_cell_possibilities(cell_id)
+            if 2 <= count < best_count and sudoku_puzzle.cell_vals[cell_id] is None:
+                best_cell_id = cell_id
+                best_count = count
+                if count == 2:
+                    break
+        return best_cell_id
+
+    def order_candidates(self, sudoku_puzzle, cell_id):
+        """
+        :param sudoku_puzzle: The SudokuPuzzle to guess in
+        :param cell_id: The id of the cell to guess in
+        :return: A tuple with the possibilities of the cell in the order they should be guessed
+        """
+        return sudoku_puzzle.get_cell_possibility_tuple(cell_id)
+
+    def next_guess(self, sudoku_puzzle):
+        """
+        :param sudoku_puzzle: The SudokuPuzzle to guess in
+        :return: (cell_id, candidate) of the next guess, or None if no cell can be guessed in
+        Reverting a guess removes its candidate from the cell, so the next call tries the next candidate in order
+        """
+        cell_id = self.select_cell_id(sudoku_puzzle)
+        if cell_id is None:
+            return None
+        self.num_guesses += 1
+        return cell_id, self.order_candidates(sudoku_puzzle, cell_id)[0]
+
+    def record_backtrack(self):
+        self.num_backtracks += 1
+
+    def to_json(self):
+        return {
+            'name': self.name,
+            'num_guesses': self.num_guesses,
+            'num_backtracks': self.num_backtracks
+        }
+
+
+class MRVDegreeGuessStrategy(SudokuGuessStrategy):
+    """
+    MRV where ties are broken by the number of empty peers (the degree heuristic), so the guess constrains the most
+    cells. Ties in degree are broken by the lowest cell id.
+    """
+
+    name = 'mrv_degree'
+
+    def select_cell_id(self, sudoku_puzzle):
+        cell_vals = sudoku_puzzle.cell_vals
+        best_cell_id = None
+        best_key = None
+        for cell_id in all_cell_ids:
+            count = sudoku_puzzle.count_cell_possibilities(cell_id)
+            if count >= 2 and cell_vals[cell_id] is None:
+                degree = sum(1 for peer_id in peers_by_cell_id[cell_id] if cell_vals[peer_id] is None)
+                key = (count, -degree)
+                if best_key is None or key < best_key:
+                    best_cell_id = cell_id
+                    best_key = key
+        return best_cell_id
+
+
+class LeastConstrainingValueGuessStrategy(SudokuGuessStrategy):
+    """
+    MRV which first guesses the candidate removing the fewest possibilities from the peers of the cell
+    """
+
+    name = 'lcv'
+
+    def order_candidates(self, sudoku_puzzle, cell_id):
+        num_peers_by_val = {}
+        for peer_id in peers_by_cell_id[cell_id]:
+            if sudoku_puzzle.cell_vals[peer_id] is None:
+                for val in sudoku_puzzle.get_cell_possibility_tuple(peer_id):
+                    num_peers_by_val[val] = num_peers_by_val.get(val, 0) + 1
+        return tuple(sorted(sudoku_puzzle.get_cell_possibility_tuple(cell_id),
+                            key=lambda val: (num_peers_by_val.get(val, 0), val)))
+
+
+class FrequencyGuessStrategy(SudokuGuessStrategy):
+    """
+    MRV which first guesses the candidate with the fewest locs left in the units of the cell, i.e. the candidate
+    closest to being a unique candidate
+    """
+
+    name = 'frequency'
+
+    def order_candidates(self, sudoku_puzzle, cell_id):
+        unit_nums = units_by_cell_id[cell_id]
+        num_locs_left = sudoku_puzzle.num_locs_left
+
+        def frequency(val):
+            counts = [num_locs_left[unit_num][val] for unit_num in unit_nums]
+            return min(counts), sum(counts), val
+
+        return tuple(sorted(sudoku_puzzle.get_cell_possibility_tuple(cell_id), key=frequency))
+
+
+# A dictionary from strategy name to the SudokuGuessStrategy class
+guess_strategies = {strategy.name: strategy for strategy in [SudokuGuessStrategy, MRVDegreeGuessStrategy,
+                                                             LeastConstrainingValueGuessStrategy,
+                                                             FrequencyGuessStrategy]}
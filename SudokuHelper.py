@@ -1,9 +1,28 @@
+import functools
+import itertools
+import operator
+import random
+
 __author__ = 'william'
 
 all_possibilities = {1, 2, 3, 4, 5, 6, 7, 8, 9}
 all_locs = [i for i in range(0, 9)]
 cell_locs = [i for i in range(0, 3)]
 
+# Bitmask candidates: the candidate val is stored in bit (val - 1) of a 9-bit int
+all_possibilities_mask = 0x1ff
+# val_to_bit[val] contains the bit for the candidate val. val_to_bit[0] is unused
+val_to_bit = [0] + [1 << (val - 1) for val in range(1, 10)]
+# bit_count[mask] contains the number of candidates in the mask
+bit_count = [bin(mask).count('1') for mask in range(0, 512)]
+# bit_to_vals[mask] contains a tuple with the candidates in the mask, listed in order
+bit_to_vals = [tuple(val for val in range(1, 10) if mask & val_to_bit[val]) for mask in range(0, 512)]
+# Bitmask locs: the offset loc within a row/col/block is stored in bit loc of a 9-bit int
+# loc_to_bit[loc] contains the bit for the offset loc
+loc_to_bit = [1 << loc for loc in all_locs]
+# bit_to_locs[mask] contains a tuple with the offsets in the mask, listed in order
+bit_to_locs = [tuple(loc for loc in all_locs if mask & loc_to_bit[loc]) for mask in range(0, 512)]
+
 
 def loc_to_block_num(y, x):
     """
@@ -85,4 +104,212 @@ def cell_name_to_loc(cell_name):
     :param cell_name: A cell name in the form 'cYXB' where Y is y-coord, X is x-coord, B is block num
     :return: (y, x) location of the cell
     """
-    return int(cell_name[1]), int(cell_name[2])
\ No newline at end of file
+    return int(cell_name[1]), int(cell_name[2])
+
+
+def vals_to_mask(vals):
+    """
+    :param vals: An enumerable containing candidates. Precondition: 1 <= val <= 9 for val in vals
+    :return: The 9-bit mask containing the candidates
+    """
+    mask = 0
+    for val in vals:
+        mask |= val_to_bit[val]
+    return mask
+
+
+def locs_to_mask(locs):
+    """
+    :param locs: An enumerable containing offsets within a row/col/block. Precondition: 0 <= loc < 9 for loc in locs
+    :return: The 9-bit mask containing the offsets
+    """
+    mask = 0
+    for loc in locs:
+        mask |= loc_to_bit[loc]
+    return mask
+
+
+def mask_to_vals(mask):
+    """
+    :param mask: A 9-bit candidate mask. Precondition: 0 <= mask < 512
+    :return: A set containing the candidates in the mask. It is copied from all_possibilities, so it is printed in
+    ascending order like the possibilities of a cell
+    """
+    vals = set(all_possibilities)
+    vals.difference_update(bit_to_vals[all_possibilities_mask & ~mask])
+    return vals
+
+
+# The largest naked or hidden subsets found by the solver
+max_subset_size = 4
+
+
+def find_subsets(masks, max_size):
+    """
+    Finds every subset of 2 to max_size items whose masks have at most as many bits between them as there are items,
+    such as the cells of a naked tuple or the vals of a hidden subset. The combinations are extended in order and a
+    combination is not extended once its mask has more than max_size bits.
+    :param masks: A list where masks[i] contains the 9-bit mask of item i, or None to leave the item out
+    :param max_size: The largest number of items in a subset
+    :return: A list where [n] contains a list of the (items, mask) tuples for the subsets of n items, in the order of
+    itertools.combinations. items is a tuple of the item indices and mask is the union of their masks
+    """
+    subsets = [[] for _ in range(0, max_size + 1)]
+    items = [i for (i, mask) in enumerate(masks) if mask is not None and bit_count[mask] <= max_size]
+    num_items = len(items)
+
+    def extend(start, combination, combination_mask):
+        size = len(combination) + 1
+        for k in range(start, num_items):
+            item = items[k]
+            mask = combination_mask | masks[item]
+            num_bits = bit_count[mask]
+            if num_bits > max_size:
+                continue
+            extended_combination = combination + (item,)
+            if size >= 2 and num_bits <= size:
+                subsets[size].append((extended_combination, mask))
+            if size < max_size:
+                extend(k + 1, extended_combination, mask)
+
+    extend(0, (), 0)
+    return subsets
+
+
+def loc_to_cell_id(y, x):
+    """
+    :param y: The y location of the cell. Precondition: 0 <= y < 9
+    :param x: The x location of the cell. Precondition: 0 <= x < 9
+    :return: The id of the cell. Cells are numbered 0 to 80 from left to right, top to bottom
+    """
+    return 9 * y + x
+
+
+def cell_id_to_loc(cell_id):
+    """
+    :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+    :return: (y, x) location of the cell
+    """
+    return int(cell_id / 9), cell_id % 9
+
+
+def loc_to_cell_name(y, x):
+    """
+    :param y: The y location of the cell. Precondition: 0 <= y < 9
+    :param x: The x location of the cell. Precondition: 0 <= x < 9
+    :return: The cell name in the form 'cYXB' where Y is y-coord, X is x-coord, B is block num
+    """
+    return 'c' + str(y) + str(x) + str(loc_to_block_num(y, x))
+
+
+# Cell id tables. Each table is indexed by cell id (see loc_to_cell_id)
+all_cell_ids = [i for i in range(0, 81)]
+y_by_cell_id = [cell_id_to_loc(cell_id)[0] for cell_id in all_cell_ids]
+x_by_cell_id = [cell_id_to_loc(cell_id)[1] for cell_id in all_cell_ids]
+block_by_cell_id = [loc_to_block_num(*cell_id_to_loc(cell_id)) for cell_id in all_cell_ids]
+block_cell_num_by_cell_id = [loc_to_block_cell_num(*cell_id_to_loc(cell_id)) for cell_id in all_cell_ids]
+name_by_cell_id = [loc_to_cell_name(*cell_id_to_loc(cell_id)) for cell_id in all_cell_ids]
+cell_id_by_name = {name: cell_id for (cell_id, name) in enumerate(name_by_cell_id)}
+# y_cell_ids[n] contains the ids for each cell in row n, listed in order
+y_cell_ids = [[loc_to_cell_id(y, x) for x in all_locs] for y in all_locs]
+# x_cell_ids[n] contains the ids for each cell in col n, listed in order
+x_cell_ids = [[loc_to_cell_id(y, x) for y in all_locs] for x in all_locs]
+# block_cell_ids[n] contains the ids for each cell in block n, listed in order of block cell num
+block_cell_ids = [[loc_to_cell_id(*block_num_and_cell_num_to_offsets(block_num, cell_num)) for cell_num in all_locs]
+                  for block_num in all_locs]
+
+# Unit tables. Units 0-8 are the rows, 9-17 are the cols and 18-26 are the blocks
+all_unit_nums = [i for i in range(0, 27)]
+row_unit_nums = [i for i in range(0, 9)]
+col_unit_nums = [i for i in range(9, 18)]
+line_unit_nums = row_unit_nums + col_unit_nums
+# unit_cell_ids[u] contains the ids for each cell in unit u
+unit_cell_ids = y_cell_ids + x_cell_ids + block_cell_ids
+# units_by_cell_id[cell_id] contains the (row, col, block) unit numbers of the cell
+units_by_cell_id = [(y_by_cell_id[cell_id], 9 + x_by_cell_id[cell_id], 18 + block_by_cell_id[cell_id])
+                    for cell_id in all_cell_ids]
+# peers_by_cell_id[cell_id] contains the ids of the 20 other cells sharing a row, col or block with the cell
+peers_by_cell_id = [tuple(sorted({other_id for unit_num in units_by_cell_id[cell_id]
+                                  for other_id in unit_cell_ids[unit_num]}.difference({cell_id})))
+                    for cell_id in all_cell_ids]
+# common_peers_by_cell_ids[id_1][id_2] contains the ids of the cells seen by both cells, excluding the two cells
+common_peers_by_cell_ids = [[tuple(sorted(set(peers_by_cell_id[id_1]).intersection(peers_by_cell_id[id_2])
+                                          .difference({id_1, id_2})))
+                             for id_2 in all_cell_ids] for id_1 in all_cell_ids]
+# unit_loc_bits_by_cell_id[cell_id] contains the (unit number, loc bit) of the cell in its row, col and block
+unit_loc_bits_by_cell_id = [((y_by_cell_id[cell_id], loc_to_bit[x_by_cell_id[cell_id]]),
+                             (9 + x_by_cell_id[cell_id], loc_to_bit[y_by_cell_id[cell_id]]),
+                             (18 + block_by_cell_id[cell_id], loc_to_bit[block_cell_num_by_cell_id[cell_id]]))
+                            for cell_id in all_cell_ids]
+
+# Bitboards: an 81-bit int with bit cell_id set for each cell of a set of cells, such as the cells where a val is
+# possible. cell_bits[cell_id] contains the bit of the cell
+cell_bits = [1 << cell_id for cell_id in all_cell_ids]
+all_cells_bitboard = (1 << 81) - 1
+# unit_bitboards[u] contains the bitboard of the cells in unit u
+unit_bitboards = [functools.reduce(operator.or_, [cell_bits[cell_id] for cell_id in unit_cell_ids[unit_num]])
+                  for unit_num in all_unit_nums]
+# peer_bitboards[cell_id] contains the bitboard of the peers of the cell
+peer_bitboards = [functools.reduce(operator.or_, [cell_bits[other_id] for other_id in peers_by_cell_id[cell_id]])
+                  for cell_id in all_cell_ids]
+
+
+def bitboard_to_cell_ids(bitboard):
+    """
+    :param bitboard: An 81-bit bitboard
+    :return: A list of the ids of the cells in the bitboard, in increasing order
+    """
+    cell_ids = []
+    while bitboard:
+        low_bit = bitboard & -bitboard
+        cell_ids.append(low_bit.bit_length() - 1)
+        bitboard ^= low_bit
+    return cell_ids
+
+
+# Templates: a template is one of the 46,656 placements of a val once in every row, col and block. A template is made
+# of one band template per band (rows 3 * band to 3 * band + 2), placing the val once in each row and block of the
+# band. Band templates from different bands combine into a template when their cols don't overlap
+
+
+def get_band_templates(band):
+    """
+    :param band: The band number. Precondition: 0 <= band < 3
+    :return: A list of the (bitboard, cols mask) tuples for the 162 band templates of the band
+    """
+    band_templates = []
+    for stacks in itertools.permutations(cell_locs):
+        for col_offsets in itertools.product(cell_locs, repeat=3):
+            xs = [3 * stacks[i] + col_offsets[i] for i in cell_locs]
+            bitboard = functools.reduce(operator.or_, [cell_bits[loc_to_cell_id(3 * band + i, xs[i])]
+                                                       for i in cell_locs])
+            band_templates.append((bitboard, locs_to_mask(xs)))
+    return band_templates
+
+
+# band_templates[band] contains the (bitboard, cols mask) tuples of the band templates of the band
+band_templates = [get_band_templates(band) for band in cell_locs]
+
+
+def get_template_cols_masks():
+    """
+    :return: A list of the (cols mask of band 0, cols mask of band 1, cols mask of band 2) tuples splitting the cols
+    between the band templates of a template
+    """
+    all_cols_mask = locs_to_mask(all_locs)
+    cols_masks = sorted({cols_mask for (bitboard, cols_mask) in band_templates[0]})
+    return [(cols_mask_0, cols_mask_1, all_cols_mask & ~(cols_mask_0 | cols_mask_1))
+            for cols_mask_0 in cols_masks for cols_mask_1 in cols_masks
+            if not cols_mask_0 & cols_mask_1 and all_cols_mask & ~(cols_mask_0 | cols_mask_1) in cols_masks]
+
+
+template_cols_masks = get_template_cols_masks()
+
+
+# Zobrist hashing: zobrist_keys[10 * cell_id + val] contains a random 64-bit key for val being possible in the cell
+# The hash of a candidate state is the xor of the keys of every (cell, val) possibility. A fixed seed keeps the
+# hashes the same across processes, so they can be used as fingerprints
+zobrist_random = random.Random(81)
+zobrist_keys = [zobrist_random.getrandbits(64) if val else 0 for cell_id in all_cell_ids for val in range(0, 10)]
+# The hash of a puzzle where every val is possible in every cell
+all_possibilities_zobrist_hash = functools.reduce(operator.xor, zobrist_keys, 0)
@@ -0,0 +1,190 @@
+import heapq
+from SudokuHelper import all_cell_ids
+from SudokuHelper import all_possibilities
+from SudokuHelper import all_unit_nums
+from SudokuHelper import bit_to_locs
+from SudokuHelper import cell_id_by_name
+from SudokuHelper import unit_cell_ids
+
+__author__ = 'william'
+
+
+class SudokuNogoods:
+    """
+    Conflict analysis for the search in SudokuFastSolver.
+    Every placement and removal made while guessing is labelled with a mask of the guess depths it follows from:
+        * a guess at depth d is labelled 1 << d
+        * a removal caused by a placement has the label of the placement
+        * a sole candidate has the labels of the removals of the other vals in its cell
+        * a unique candidate has the labels of the removals and placements which excluded the other cells of its unit
+    When propagation reaches a contradiction, the label of the contradiction gives the guesses it actually follows
+    from. Together they are a nogood: a set of (cell_id, val) placements which cannot all be part of a solution.
+    The search jumps back to the deepest of those guesses instead of the last one, and the nogood prunes the same
+    guess wherever the other placements of the nogood are made again.
+    """
+
+    def __init__(self, max_nogoods=10000):
+        """
+        :param max_nogoods: The maximum number of nogoods recorded
+        """
+        # removal_labels[10 * cell_id + val] contains the label of the last removal of val from the cell
+        self.removal_labels = [0 for _ in range(0, 810)]
+        # placement_labels[cell_id] contains the label of the last placement in the cell
+        self.placement_labels = [0 for _ in all_cell_ids]
+        self.max_nogoods = max_nogoods
+        # A set of the nogoods recorded, each a frozenset of (cell_id, val) placements
+        self.nogoods = set()
+        # nogoods_by_placement[(cell_id, val)] contains a list of the nogoods containing the placement
+        self.nogoods_by_placement = {}
+        # The number of guesses pruned because of a nogood
+        self.num_pruned = 0
+        # The number of guesses reverted without trying the rest of their candidates
+        self.num_jumped = 0
+
+    # region Labels
+    def place_val(self, sudoku_puzzle, cell_id, val, label):
+        """
+        Places val in the cell and labels the placement and the removals it causes
+        """
+        self.placement_labels[cell_id] = label
+        removal_labels = self.removal_labels
+        for other_id in sudoku_puzzle.place_val(cell_id, val):
+            removal_labels[10 * other_id + val] = label
+
+    def remove_possibility(self, sudoku_puzzle, cell_id, val, label):
+        """
+        Removes val from the possibilities of the cell and labels the removal
+        """
+        if sudoku_puzzle.remove_possibility_from_puzzle_by_cell_id(cell_id, val):
+            self.removal_labels[10 * cell_id + val] = label
+
+    def get_cell_label(self, cell_id, excluded_val):
+        """
+        :return: The label of the removals of every val other than excluded_val from the cell
+        """
+        label = 0
+        for val in all_possibilities:
+            if val != excluded_val:
+                label |= self.removal_labels[10 * cell_id + val]
+        return label
+
+    def get_unit_label(self, sudoku_puzzle, unit_num, val, excluded_cell_id):
+        """
+        :return: The label of the placements and removals which exclude val from the cells of the unit, except
+        excluded_cell_id
+        """
+        label = 0
+        for cell_id in unit_cell_ids[unit_num]:
+            if cell_id != excluded_cell_id:
+                if sudoku_puzzle.cell_vals[cell_id] is not None:
+                    label |= self.placement_labels[cell_id]
+                else:
+                    label |= self.removal_labels[10 * cell_id + val]
+        return label
+
+    def get_contradiction_label(self, sudoku_puzzle):
+        """
+        :param sudoku_puzzle: A SudokuPuzzle with a contradiction
+        :return: The smallest label of an empty cell without possibilities or a unit where a val has no locs left
+        """
+        labels = [self.get_cell_label(cell_id, None) for cell_id in all_cell_ids
+                  if sudoku_puzzle.cell_vals[cell_id] is None and sudoku_puzzle.count_cell_possibilities(cell_id) == 0]
+        labels += [self.get_unit_label(sudoku_puzzle, unit_num, val, None)
+                   for unit_num in all_unit_nums for val in all_possibilities
+                   if sudoku_puzzle.num_locs_left[unit_num][val] == 0]
+        return min(labels)
+    # endregion
+
+    def propagate(self, sudoku_puzzle):
+        """
+        Same as SudokuPuzzle.propagate, but labels every placement and removal
+        :return: False if the puzzle has a contradiction. True otherwise
+        """
+        sp = sudoku_puzzle
+        sole_candidate_queue = sp.sole_candidate_queue
+        unique_candidate_queue = sp.unique_candidate_queue
+        while not sp.num_contradictions:
+            if sole_candidate_queue:
+                cell_id = heapq.heappop(sole_candidate_queue)
+                if sp.is_sole_candidate(cell_id):
+                    val = sp.get_cell_possibility_tuple(cell_id)[0]
+                    self.place_val(sp, cell_id, val, self.get_cell_label(cell_id, val))
+            elif unique_candidate_queue:
+                (unit_num, val) = heapq.heappop(unique_candidate_queue)
+                if sp.is_unique_candidate(unit_num, val):
+                    cell_id = unit_cell_ids[unit_num][bit_to_locs[sp.locs_left_masks[unit_num][val]][0]]
+                    self.place_val(sp, cell_id, val, self.get_unit_label(sp, unit_num, val, cell_id))
+            else:
+                return True
+        return False
+
+    def push_guess(self, sudoku_puzzle, cell_id, candidate):
+        """
+        Guesses the candidate into the cell, unless a nogood shows the guess fails, in which case it is removed
+        """
+        nogood = self.find_nogood(sudoku_puzzle, cell_id, candidate)
+        if nogood is None:
+            label = 1 << ((sudoku_puzzle.guess.depth if sudoku_puzzle.guess is not None else 0) + 1)
+            self.placement_labels[cell_id] = label
+            for other_id in sudoku_puzzle.push_guess(cell_id, candidate):
+                self.removal_labels[10 * other_id + candidate] = label
+        else:
+            self.num_pruned += 1
+            label = 0
+            for (other_id, other_val) in nogood:
+                if other_id != cell_id:
+                    label |= self.placement_labels[other_id]
+            self.remove_possibility(sudoku_puzzle, cell_id, candidate, label)
+
+    def find_nogood(self, sudoku_puzzle, cell_id, val):
+        """
+        :return: A nogood completed by placing val in the cell, or None if there is none
+        """
+        cell_vals = sudoku_puzzle.cell_vals
+        for nogood in self.nogoods_by_placement.get((cell_id, val), ()):
+            if all(cell_vals[other_id] == other_val for (other_id, other_val) in nogood if other_id != cell_id):
+                return nogood
+        return None
+
+    def pop_guess(self, sudoku_puzzle):
+        """
+        Reverts the current guess without a contradiction to analyse, so its removal follows from every other guess
+        Precondition: sudoku_puzzle.guess is not None
+        """
+        guess = sudoku_puzzle.pop_guess()
+        self.removal_labels[10 * cell_id_by_name[guess.guess_cell_name] + guess.guess_candidate] = \
+            (1 << guess.depth) - 2
+
+    def backjump(self, sudoku_puzzle):
+        """
+        Records the nogood of the contradiction and reverts the deepest guess it follows from, removing its candidate
+        :param sudoku_puzzle: A SudokuPuzzle with a contradiction
+        :return: The reverted SudokuGuess, or None if the contradiction does not follow from any guess, so the puzzle
+        has no solution
+        """
+        label = self.get_contradiction_label(sudoku_puzzle)
+        if label == 0:
+            return None
+        depth = label.bit_length() - 1
+        guesses = {}
+        guess = sudoku_puzzle.guess
+        while guess is not None:
+            guesses[guess.depth] = guess
+            guess = guess.previous_guess
+        self.num_jumped += sudoku_puzzle.guess.depth - depth
+        self.record_nogood(frozenset((cell_id_by_name[guesses[d].guess_cell_name], guesses[d].guess_candidate)
+                                     for d in guesses if label & (1 << d)))
+        guess = guesses[depth]
+        # Reverting the guess at depth also reverts every deeper guess
+        sudoku_puzzle.guess = guess
+        sudoku_puzzle.pop_guess()
+        self.removal_labels[10 * cell_id_by_name[guess.guess_cell_name] + guess.guess_candidate] = \
+            label & ~(1 << depth)
+        return guess
+
+    def record_nogood(self, nogood):
+        if len(self.nogoods) >= self.max_nogoods or nogood in self.nogoods:
+            return
+        self.nogoods.add(nogood)
+        for placement in nogood:
+            self.nogoods_by_placement.setdefault(placement, []).append(nogood)
@@ -0,0 +1,65 @@
+import functools
+import multiprocessing
+from SudokuBitPuzzle import SudokuBitPuzzle
+from SudokuError import BadPuzzleError
+from SudokuFastSolver import solve_fast
+from SudokuGuessStrategy import SudokuGuessStrategy
+
+__author__ = 'william'
+
+
+def solve_parallel(board, processes=None, split_depth=2, puzzle_class=SudokuBitPuzzle):
+    """
+    Solves the board by splitting its guess tree at the first split_depth guesses and solving every subtree with
+    solve_fast in a process pool. The first solution found is returned and the other workers are terminated.
+    This only pays off for boards needing a lot of guessing; other boards are faster to solve with solve_fast.
+    :param board: A 2D-matrix containing known values
+    :param processes: The number of worker processes. None for the number of CPUs
+    :param split_depth: The number of guesses made before handing a subtree to a worker
+    :param puzzle_class: The SudokuPuzzle class used to store the board
+    :return: The solved board, or None if the board has no solution
+    """
+    try:
+        sp = puzzle_class(board)
+    except BadPuzzleError:
+        return None
+    subtree_boards = split_into_subtrees(sp, split_depth)
+    if processes == 1 or len(subtree_boards) <= 1:
+        for subtree_board in subtree_boards:
+            solution = solve_fast(subtree_board, puzzle_class)
+            if solution is not None:
+                return solution
+        return None
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for solution in pool.imap_unordered(functools.partial(solve_fast, puzzle_class=puzzle_class), subtree_boards):
+            if solution is not None:
+                return solution
+        return None
+    finally:
+        # Stops the workers still searching the other subtrees
+        pool.terminate()
+        pool.join()
+
+
+def split_into_subtrees(sudoku_puzzle, split_depth):
+    """
+    Propagates and then guesses every candidate of the MRV cell, recursively up to split_depth guesses deep.
+    The guesses of different subtrees differ in at least one cell, so every solution is in exactly one subtree.
+    :param sudoku_puzzle: The SudokuPuzzle to split
+    :param split_depth: The number of guesses made before a subtree is returned
+    :return: A list with the board of each subtree which propagation did not prove to be a contradiction
+    """
+    if not sudoku_puzzle.propagate():
+        return []
+    if split_depth == 0 or sudoku_puzzle.num_filled == 81:
+        return [sudoku_puzzle.get_board()]
+    cell_id = SudokuGuessStrategy().select_cell_id(sudoku_puzzle)
+    subtree_boards = []
+    for candidate in sudoku_puzzle.get_cell_possibility_tuple(cell_id):
+        sudoku_puzzle.push_guess(cell_id, candidate)
+        subtree_boards += split_into_subtrees(sudoku_puzzle, split_depth - 1)
+        # Removes the candidate, so the following subtrees are propagated knowing it is not in the cell
+        sudoku_puzzle.pop_guess()
+    return subtree_boards
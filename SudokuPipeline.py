@@ -0,0 +1,230 @@
+import time
+from SudokuTechniqueStats import SudokuTechniqueStats
+
+__author__ = 'william'
+
+
+# The optional techniques tried after the sole and unique candidates, in order
+ordered_optional_states = ['Naked_Pair', 'Hidden_Pair', 'Naked_Tuple_3', 'Naked_Tuple_4',
+                           'Block_RC_Interaction', 'Block_Block_Interaction',
+                           'Hidden_Subset_3', 'Hidden_Subset_4', 'Basic_Fish', 'Fish_3', 'Fish_4',
+                           'Skyscraper', 'Kite', 'XY_Wing', 'XYZ_Wing', 'W_Wing', 'Simple_Coloring', 'X_Chain',
+                           'Templates']
+
+# optional_state_map[state] contains the name of the SudokuSolver method performing the technique of the state
+optional_state_map = {
+    'Naked_Pair': 'naked_pair',
+    'Naked_Tuple_3': 'naked_tuple_3',
+    'Naked_Tuple_4': 'naked_tuple_4',
+    'Block_RC_Interaction': 'block_rc_interaction',
+    'Block_Block_Interaction': 'block_block_interaction',
+    'Hidden_Pair': 'hidden_subset_2',
+    'Hidden_Subset_3': 'hidden_subset_3',
+    'Hidden_Subset_4': 'hidden_subset_4',
+    'Basic_Fish': 'basic_fish',
+    'Fish_3': 'fish_3',
+    'Fish_4': 'fish_4',
+    'Skyscraper': 'skyscraper',
+    'Kite': 'kite',
+    'XY_Wing': 'xy_wing',
+    'XYZ_Wing': 'xyz_wing',
+    'W_Wing': 'w_wing',
+    'Simple_Coloring': 'simple_coloring',
+    'X_Chain': 'x_chain',
+    'Templates': 'templates'
+}
+
+
+class SudokuPipeline:
+    """
+    The ordered techniques a SudokuSolver steps through:
+        Ready -> Sole_Candidate -> Unique_Candidate -> optional states... -> Make_Guess -> Sole_Candidate
+    Each technique returns True if it found nothing, in which case the solver moves to the next state. Otherwise the
+    solver restarts from Sole_Candidate. The transitions are plain dict lookups, so a pipeline is built once and
+    shared by every solver.
+    The faithful mode always tries the techniques in the canonical order, so the steps can be used as explanations.
+    """
+
+    mode = 'faithful'
+
+    def __init__(self, ordered_optional_states=ordered_optional_states):
+        """
+        :param ordered_optional_states: The optional states tried after the unique candidates, in order. Each must
+        be a key of optional_state_map
+        """
+        self.ordered_optional_states = list(ordered_optional_states)
+        self.states = ['Ready', 'Sole_Candidate', 'Unique_Candidate'] + self.ordered_optional_states + \
+            ['Make_Guess', 'Done', 'Not_Complete']
+        # steps[state] contains the name of the technique of the state and the state to move to if it finds nothing
+        self.steps = {}
+        self.link_optional_states(self.ordered_optional_states)
+
+    def __str__(self):
+        names = [name for (name, states) in technique_profiles.items() if states == self.ordered_optional_states]
+        return (names[0] if names else 'custom') + ' ' + self.mode
+
+    def link_optional_states(self, optional_states):
+        """
+        Chains the singles, then the optional states in order, then Make_Guess.
+        The optional states of the pipeline which are left out move straight to Make_Guess if they find nothing.
+        :param optional_states: A list of some of the optional states of the pipeline
+        """
+        technique_states = ['Sole_Candidate', 'Unique_Candidate'] + optional_states
+        technique_names = ['fill_sole_candidate', 'fill_unique_candidate'] + \
+            [optional_state_map[state] for state in optional_states]
+        steps = {state: (optional_state_map[state], 'Make_Guess') for state in self.ordered_optional_states}
+        for n in range(0, len(technique_states)):
+            next_state = technique_states[n + 1] if n + 1 < len(technique_states) else 'Make_Guess'
+            steps[technique_states[n]] = (technique_names[n], next_state)
+        self.steps = steps
+
+    def perform_step(self, sudoku_solver):
+        """
+        Performs the step of the solver's state and moves the solver to the next state
+        """
+        step = self.steps.get(sudoku_solver.state)
+        if step is not None:
+            (technique_name, next_state) = step
+            sudoku_solver.state = next_state if getattr(sudoku_solver, technique_name)() else 'Sole_Candidate'
+        elif sudoku_solver.state == 'Ready':
+            sudoku_solver.log_initial_puzzle()
+            sudoku_solver.state = 'Sole_Candidate'
+        elif sudoku_solver.state == 'Make_Guess':
+            sudoku_solver.make_guess()
+            sudoku_solver.state = 'Sole_Candidate'
+        else:
+            sudoku_solver.state = 'Sole_Candidate'
+
+
+class SudokuAdaptivePipeline(SudokuPipeline):
+    """
+    A SudokuPipeline for throughput rather than explanations. It keeps live statistics of its optional techniques
+    across every solver using it. Every reorder_interval calls, the optional techniques are reordered by decreasing
+    eliminations per ms, and the ones below min_eliminations_per_ms after min_calls calls are skipped. The skipped
+    techniques are tried again every explore_interval reorders, so their statistics stay live.
+    Make_Guess still follows the last technique, so the order changes the steps taken but not the solution found.
+    """
+
+    mode = 'adaptive'
+
+    def __init__(self, ordered_optional_states=ordered_optional_states, min_calls=20, min_eliminations_per_ms=1.0,
+                 reorder_interval=100, explore_interval=10):
+        """
+        :param ordered_optional_states: The optional states tried after the unique candidates, in their initial order
+        :param min_calls: The number of calls of a technique before it can be skipped
+        :param min_eliminations_per_ms: The eliminations per ms below which a technique is skipped
+        :param reorder_interval: The number of calls of the optional techniques between reorders
+        :param explore_interval: The number of reorders between the ones which try the skipped techniques again
+        """
+        SudokuPipeline.__init__(self, ordered_optional_states)
+        self.min_calls = min_calls
+        self.min_eliminations_per_ms = min_eliminations_per_ms
+        self.reorder_interval = reorder_interval
+        self.explore_interval = explore_interval
+        # stats[state] contains the SudokuTechniqueStats of the technique of the optional state
+        self.stats = {state: SudokuTechniqueStats(optional_state_map[state]) for state in self.ordered_optional_states}
+        self.num_calls = 0
+        self.num_reorders = 0
+        # The optional states currently tried, in order
+        self.active_states = list(self.ordered_optional_states)
+
+    def perform_step(self, sudoku_solver):
+        """
+        Same as SudokuPipeline.perform_step, but records the statistics of the optional techniques
+        """
+        stats = self.stats.get(sudoku_solver.state)
+        if stats is None:
+            SudokuPipeline.perform_step(self, sudoku_solver)
+            return
+        (technique_name, next_state) = self.steps[sudoku_solver.state]
+        sp = sudoku_solver.sudoku_puzzle
+        num_possibilities = sp.num_possibilities
+        start = time.perf_counter()
+        found_nothing = getattr(sudoku_solver, technique_name)()
+        # A reverted guess adds possibilities back, which are not counted against the technique
+        stats.record(not found_nothing, max(0, num_possibilities - sp.num_possibilities), time.perf_counter() - start)
+        sudoku_solver.state = next_state if found_nothing else 'Sole_Candidate'
+        self.num_calls += 1
+        if self.num_calls % self.reorder_interval == 0:
+            self.reorder()
+
+    def get_expected_rate(self, state):
+        """
+        :return: The eliminations per ms of the technique of the state, or None if it was not called min_calls times
+        """
+        stats = self.stats[state]
+        if stats.num_calls < self.min_calls:
+            return None
+        rate = stats.get_eliminations_per_ms()
+        return rate if rate is not None else 0.0
+
+    def reorder(self):
+        """
+        Reorders the optional states by decreasing eliminations per ms and skips the ones which remove too little.
+        States without enough calls to tell keep their place at the front, so they get called
+        """
+        self.num_reorders += 1
+        explore = self.num_reorders % self.explore_interval == 0
+        rates = {state: self.get_expected_rate(state) for state in self.ordered_optional_states}
+        active_states = [state for state in self.ordered_optional_states
+                         if explore or rates[state] is None or rates[state] >= self.min_eliminations_per_ms]
+        active_states.sort(key=lambda state: 0 if rates[state] is None else 1 / (1 + rates[state]))
+        self.active_states = active_states
+        self.link_optional_states(active_states)
+
+    def get_stats(self):
+        """
+        :return: A list of the SudokuTechniqueStats of the optional techniques, in their canonical order
+        """
+        return [self.stats[state] for state in self.ordered_optional_states]
+
+
+# technique_profiles[name] contains the optional states of the named profile:
+#   * singles+search fills the sole and unique candidates and guesses, for throughput
+#   * full tries every technique, for explanations
+technique_profiles = {
+    'singles+search': [],
+    'full': ordered_optional_states
+}
+
+pipeline_classes_by_mode = {
+    SudokuPipeline.mode: SudokuPipeline,
+    SudokuAdaptivePipeline.mode: SudokuAdaptivePipeline
+}
+
+# pipelines[(optional states, mode)] contains the pipeline built for them, shared by every solver asking for them
+pipelines = {}
+
+
+def get_pipeline(techniques=None, mode=None):
+    """
+    :param techniques: The name of a profile in technique_profiles, or a list of optional states for a custom profile.
+    None for 'full'
+    :param mode: A mode in pipeline_classes_by_mode. None for 'faithful'
+    :return: The SudokuPipeline of the techniques in the mode. It is built the first time it is asked for and reused
+    :raises ValueError: If the profile, a state or the mode is unknown
+    """
+    if techniques is None:
+        techniques = 'full'
+    if mode is None:
+        mode = SudokuPipeline.mode
+    if isinstance(techniques, str):
+        if techniques not in technique_profiles:
+            raise ValueError("Unknown technique profile " + techniques)
+        techniques = technique_profiles[techniques]
+    for state in techniques:
+        if state not in optional_state_map:
+            raise ValueError("Unknown technique " + str(state))
+    if mode not in pipeline_classes_by_mode:
+        raise ValueError("Unknown pipeline mode " + str(mode))
+    key = (tuple(techniques), mode)
+    pipeline = pipelines.get(key)
+    if pipeline is None:
+        pipeline = pipeline_classes_by_mode[mode](techniques)
+        pipelines[key] = pipeline
+    return pipeline
+
+
+# The pipelines of every technique, shared by the solvers which do not ask for another one
+default_pipeline = get_pipeline()
+adaptive_pipeline = get_pipeline(mode=SudokuAdaptivePipeline.mode)
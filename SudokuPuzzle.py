@@ -1,13 +1,50 @@
-from collections import defaultdict
 import copy
+import heapq
 import itertools
 from SudokuError import BadGuessError
 from SudokuError import BadPuzzleError
 from SudokuCell import SudokuCell
 from SudokuGuess import SudokuGuess
+from SudokuGuessStrategy import SudokuGuessStrategy
+from SudokuHelper import all_cell_ids
+from SudokuHelper import all_unit_nums
+from SudokuHelper import bit_count
+from SudokuHelper import bit_to_locs
+from SudokuHelper import bit_to_vals
 from SudokuHelper import all_locs
+from SudokuHelper import all_cells_bitboard
+from SudokuHelper import all_possibilities_mask
+from SudokuHelper import all_possibilities_zobrist_hash
 from SudokuHelper import cell_locs
 from SudokuHelper import all_possibilities
+from SudokuHelper import block_by_cell_id
+from SudokuHelper import block_cell_ids
+from SudokuHelper import band_templates
+from SudokuHelper import bitboard_to_cell_ids
+from SudokuHelper import cell_bits
+from SudokuHelper import cell_id_by_name
+from SudokuHelper import find_subsets
+from SudokuHelper import col_unit_nums
+from SudokuHelper import common_peers_by_cell_ids
+from SudokuHelper import line_unit_nums
+from SudokuHelper import loc_to_bit
+from SudokuHelper import mask_to_vals
+from SudokuHelper import max_subset_size
+from SudokuHelper import name_by_cell_id
+from SudokuHelper import peer_bitboards
+from SudokuHelper import peers_by_cell_id
+from SudokuHelper import row_unit_nums
+from SudokuHelper import template_cols_masks
+from SudokuHelper import unit_bitboards
+from SudokuHelper import unit_cell_ids
+from SudokuHelper import unit_loc_bits_by_cell_id
+from SudokuHelper import val_to_bit
+from SudokuHelper import vals_to_mask
+from SudokuHelper import x_by_cell_id
+from SudokuHelper import x_cell_ids
+from SudokuHelper import y_by_cell_id
+from SudokuHelper import y_cell_ids
+from SudokuHelper import zobrist_keys
 from SudokuStep import SudokuStep
 import SudokuHelper
 
@@ -19,49 +56,243 @@ class SudokuPuzzle:
     def __init__(self, board=None):
         # Static variables
         # A 2D-matrix containing cell names
-        self.board = [[None for x in all_locs] for y in all_locs]
-        # y_cell_list[n] contains a set with the names for each cell in row n
-        self.y_cell_list = [set() for _ in all_locs]
-        # x_cell_list[n] contains a set with the names for each cell in col n
-        self.x_cell_list = [set() for _ in all_locs]
-        # block_cell_list[n] contains a set with the names for each cell in block n
-        self.block_cell_list = [set() for _ in all_locs]
+        self.board = [[SudokuHelper.loc_to_cell_name(y, x) for x in all_locs] for y in all_locs]
+        # cells[cell_id] contains the SudokuCell view of the cell
+        self.cells = [SudokuCell(self, cell_id) for cell_id in all_cell_ids]
+        # A dictionary from cell name to the SudokuCell view of the cell
+        self.cells_dict = {cell.name: cell for cell in self.cells}
 
         # Instance variables
-        # A dictionary from cell name to the SudokuCell object
-        self.cells_dict = {}
+        # cell_vals[cell_id] contains the filled in value of the cell or None
+        self.cell_vals = [None for _ in all_cell_ids]
+        # cell_possibilities[cell_id] contains the possibilities of the cell. See new_cell_possibilities
+        self.cell_possibilities = [self.new_cell_possibilities() for _ in all_cell_ids]
         # remaining_in_y[n] contains the remaining values in row n
         self.remaining_in_y = [copy.deepcopy(all_possibilities) for _ in all_locs]
         # remaining_in_x[n] contains the remaining values in col n
         self.remaining_in_x = [copy.deepcopy(all_possibilities) for _ in all_locs]
         # remaining_in_blocks[n] contains the remaining values in block n
         self.remaining_in_blocks = [copy.deepcopy(all_possibilities) for _ in all_locs]
-        # locs_left_by_y[y][val] contains a set with all the possible x-offsets of val in row y
-        self.locs_left_by_y = [defaultdict(set) for y in all_locs]
-        # locs_left_by_x[x][val] contains a set with all the possible y-offsets of val in col x
-        self.locs_left_by_x = [defaultdict(set) for x in all_locs]
-        # locs_left_by_block[b][val] contains a set with all the possible block cell nums of val in block b
-        self.locs_left_by_block = [defaultdict(set) for block_num in all_locs]
+        # locs_left_masks[u][val] contains a 9-bit mask of the offsets in unit u where val is possible or placed
+        # Units 0-8 are the rows, 9-17 are the cols and 18-26 are the blocks (see SudokuHelper.unit_cell_ids)
+        # The offsets are the x-offsets in a row, the y-offsets in a col and the block cell nums in a block
+        self.locs_left_masks = [[0] + [all_possibilities_mask for _ in all_possibilities] for _ in all_unit_nums]
+        # num_locs_left[u][val] contains the number of offsets in locs_left_masks[u][val]
+        self.num_locs_left = [[0] + [9 for _ in all_possibilities] for _ in all_unit_nums]
+        # val_bitboards[val] contains the bitboard of the cells in the locs left for val. See SudokuHelper.cell_bits
+        self.val_bitboards = [0] + [all_cells_bitboard for _ in all_possibilities]
+        # strong_link_units[val] contains a 27-bit mask of the units where val has exactly two locs left, which are
+        # the strong links (conjugate pairs) of val. See get_strong_links
+        self.strong_link_units = [0 for _ in range(0, 10)]
+        # The number of empty cells without possibilities plus the number of (unit, val) pairs without locs left
+        # The puzzle cannot be solved from its current state unless this is 0
+        self.num_contradictions = 0
         # guess contains a None or a SudokuGuess object
         self.guess = None
+        # trail contains the changes made since the first guess, in order. See undo_trail
+        self.trail = []
+        # sole_candidate_queue is a heap of the ids of cells which may have a single possibility left
+        self.sole_candidate_queue = []
+        # unique_candidate_queue is a heap of (unit_num, val) pairs where val may have a single loc left in the unit
+        self.unique_candidate_queue = []
+        # version is incremented on every change. unit_versions[u] contains the version of the last change to unit u
+        self.version = 0
+        self.unit_versions = [0 for _ in all_unit_nums]
+        # clean_versions[technique key] contains the version when the technique last ran without finding anything
+        self.clean_versions = {}
+        # unit_subsets[u] contains a (version, naked subsets, hidden subsets) tuple for unit u. See get_unit_subsets
+        self.unit_subsets = [None for _ in all_unit_nums]
+        # strong_link_graphs[val] contains a [version, strong links, graph] list for val, where the graph is None until
+        # it is asked for. See get_strong_links and get_strong_link_graph
+        self.strong_link_graphs = [None for _ in range(0, 10)]
+        # The xor of zobrist_keys[10 * cell_id + val] for every possibility val of every cell. See SudokuHelper
+        self.zobrist_hash = all_possibilities_zobrist_hash
+        # The number of (cell, val) pairs in the locs left, counting the val of a filled cell as its only possibility
+        self.num_possibilities = 729
         # The number of cells with filled in values
         self.num_filled = 0
 
         if board is not None:
             self.initialize_new_puzzle(board)
 
-    def determine_next_guess(self):
+    # region Locs Left
+    def get_locs_left_by(self, first_unit_num):
+        """
+        :param first_unit_num: 0 for the rows, 9 for the cols or 18 for the blocks
+        :return: A list where [n][val] contains a set with all the offsets of val in the nth row/col/block
+        """
+        return [{val: set(bit_to_locs[self.locs_left_masks[unit_num][val]]) for val in all_possibilities}
+                for unit_num in range(first_unit_num, first_unit_num + 9)]
+
+    @property
+    def locs_left_by_y(self):
+        """
+        :return: locs_left_by_y[y][val] contains a set with all the possible x-offsets of val in row y
+        """
+        return self.get_locs_left_by(0)
+
+    @property
+    def locs_left_by_x(self):
+        """
+        :return: locs_left_by_x[x][val] contains a set with all the possible y-offsets of val in col x
+        """
+        return self.get_locs_left_by(9)
+
+    @property
+    def locs_left_by_block(self):
+        """
+        :return: locs_left_by_block[b][val] contains a set with all the possible block cell nums of val in block b
+        """
+        return self.get_locs_left_by(18)
+
+    def remove_loc_left(self, cell_id, val):
+        """
+        Removes the cell from the locs left for val in its row, col and block
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :param val: The value. Precondition: The cell is in locs_left_masks for val
+        """
+        self.num_possibilities -= 1
+        self.val_bitboards[val] &= ~cell_bits[cell_id]
+        for (unit_num, bit) in unit_loc_bits_by_cell_id[cell_id]:
+            self.locs_left_masks[unit_num][val] &= ~bit
+            num_locs_left = self.num_locs_left[unit_num]
+            num_locs_left[val] -= 1
+            if num_locs_left[val] == 2:
+                self.strong_link_units[val] |= 1 << unit_num
+            elif num_locs_left[val] == 1:
+                self.strong_link_units[val] &= ~(1 << unit_num)
+                heapq.heappush(self.unique_candidate_queue, (unit_num, val))
+            elif num_locs_left[val] == 0:
+                self.num_contradictions += 1
+
+    def add_loc_left(self, cell_id, val):
+        """
+        Adds the cell to the locs left for val in its row, col and block
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :param val: The value. Precondition: The cell is not in locs_left_masks for val
+        """
+        self.num_possibilities += 1
+        self.val_bitboards[val] |= cell_bits[cell_id]
+        for (unit_num, bit) in unit_loc_bits_by_cell_id[cell_id]:
+            self.locs_left_masks[unit_num][val] |= bit
+            num_locs_left = self.num_locs_left[unit_num]
+            num_locs_left[val] += 1
+            if num_locs_left[val] == 1:
+                self.num_contradictions -= 1
+            elif num_locs_left[val] == 2:
+                self.strong_link_units[val] |= 1 << unit_num
+            elif num_locs_left[val] == 3:
+                self.strong_link_units[val] &= ~(1 << unit_num)
+    # endregion
+
+    # region Dirty Units
+    def touch_units(self, cell_id):
+        """
+        Marks the row, col and block of the cell as changed
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        """
+        self.version += 1
+        (y, x, block) = (y_by_cell_id[cell_id], x_by_cell_id[cell_id], block_by_cell_id[cell_id])
+        self.unit_versions[y] = self.version
+        self.unit_versions[9 + x] = self.version
+        self.unit_versions[18 + block] = self.version
+
+    def perform_on_dirty_units(self, unit_nums, technique, *args):
+        """
+        Runs technique(*args) unless it found nothing the last time it ran with args and the units have not changed
+        :param unit_nums: The units the result of the technique depends on. Precondition: 0 <= u < 27 for u in unit_nums
+        :param technique: A method of the puzzle returning a SudokuStep or None
+        :return: The result of the technique, or None if it was skipped
+        """
+        key = (technique.__name__,) + tuple(frozenset(arg) if isinstance(arg, set) else arg for arg in args)
+        clean_version = self.clean_versions.get(key)
+        if clean_version is not None and all(self.unit_versions[u] <= clean_version for u in unit_nums):
+            return None
+        version = self.version
+        ss = technique(*args)
+        if not ss:
+            self.clean_versions[key] = version
+        return ss
+    # endregion
+
+    # region Cell Possibilities
+    # The possibilities of a cell are stored as a set. Subclasses may override these methods to store them differently.
+    # set_cell_possibilities_to_val must replace the stored possibilities, since the trail keeps the previous ones
+    def new_cell_possibilities(self):
+        """
+        :return: The possibilities of a cell without any possibilities removed
+        """
+        return copy.deepcopy(all_possibilities)
+
+    def get_cell_possibilities(self, cell_id):
+        """
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :return: A set containing the possibilities of the cell
+        """
+        return self.cell_possibilities[cell_id]
+
+    def get_cell_possibility_tuple(self, cell_id):
+        """
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :return: A tuple containing the possibilities of the cell. Safe to iterate while removing possibilities
+        """
+        return tuple(self.cell_possibilities[cell_id])
+
+    def count_cell_possibilities(self, cell_id):
+        """
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :return: The number of possibilities of the cell
+        """
+        return len(self.cell_possibilities[cell_id])
+
+    def get_cell_possibility_mask(self, cell_id):
+        """
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :return: The 9-bit mask of the possibilities of the cell
+        """
+        return vals_to_mask(self.cell_possibilities[cell_id])
+
+    def discard_cell_possibility(self, cell_id, val):
+        """
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :param val: The value to discard. Precondition: 1 <= val <= 9
+        :return: True if the val was a possibility of the cell. False otherwise
+        """
+        possibilities = self.cell_possibilities[cell_id]
+        if val in possibilities:
+            possibilities.discard(val)
+            return True
+        return False
+
+    def add_cell_possibility(self, cell_id, val):
+        """
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :param val: The value to add back. Precondition: 1 <= val <= 9
+        """
+        self.cell_possibilities[cell_id].add(val)
+
+    def set_cell_possibilities_to_val(self, cell_id, val):
+        """
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :param val: The only remaining possibility of the cell. Precondition: 1 <= val <= 9
+        """
+        self.cell_possibilities[cell_id] = {val}
+    # endregion
+
+    def determine_next_guess(self, guess_strategy=None):
         """
         Finds a reasonable next guess
+        :param guess_strategy: The SudokuGuessStrategy choosing the guess. None for MRV
         :return: (cell_name, candidate) corresponding to a reasonable next guess
-        If a reasonable guess cannot be found, return None
+        If a reasonable guess cannot be found, return (None, None)
         """
-        for n in range(2, 9):
-            for (cell_name, cell) in self.cells_dict.items():
-                if len(cell.possibilities) == n:
-                    candidate = next(iter(cell.possibilities))
-                    return cell_name, candidate
-        return None, None
+        if guess_strategy is None:
+            guess_strategy = SudokuGuessStrategy()
+        next_guess = guess_strategy.next_guess(self)
+        if next_guess is None:
+            return None, None
+        (cell_id, candidate) = next_guess
+        return name_by_cell_id[cell_id], candidate
 
     def make_guess(self, cell_name, candidate):
         """
@@ -71,8 +302,8 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * filled_cell = (cell_name, candidate) of the guess
         """
-        self.guess = SudokuGuess(candidate, cell_name, self.cells_dict, self.guess, self.num_filled)
-        updated_cells = self.set_val_in_puzzle_by_cell_name(cell_name, candidate)
+        updated_cells = {(name_by_cell_id[other_id], candidate)
+                         for other_id in self.push_guess(cell_id_by_name[cell_name], candidate)}
         return SudokuStep((cell_name, candidate), updated_cells, "Guessing " + str(candidate) + " into " + cell_name)
 
     def revert_guess(self):
@@ -82,16 +313,69 @@ class SudokuPuzzle:
                 * updated_cells = {(cell name, removed possibility)} corresponding to the reverted guess
         """
         if self.guess:
-            self.cells_dict = self.guess.previous_cells_dict
-            cell_name = self.guess.guess_cell_name
-            candidate = self.guess.guess_candidate
-            self.remove_possibility_from_puzzle_by_cell_name(cell_name, candidate)
-            self.num_filled = self.guess.num_filled
-            self.guess = self.guess.previous_guess
-            self.recalculate_fields()
+            guess = self.pop_guess()
+            cell_name = guess.guess_cell_name
+            candidate = guess.guess_candidate
             return SudokuStep(None, {(cell_name, candidate)},
                               "Reverting Guess of " + str(candidate) + " into " + cell_name)
 
+    def push_guess(self, cell_id, candidate):
+        """
+        Guesses the candidate into the cell. See make_guess
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :param candidate: The candidate which is thought to be in the cell
+        :return: A list with the ids of the cells which had the candidate removed from their possibilities
+        """
+        self.guess = SudokuGuess(candidate, name_by_cell_id[cell_id], len(self.trail), self.guess, self.num_filled)
+        updated_cell_ids = self.place_val(cell_id, candidate)
+        self.guess.zobrist_hash = self.zobrist_hash
+        return updated_cell_ids
+
+    def pop_guess(self):
+        """
+        Reverts the current guess and removes its candidate from its cell. See revert_guess
+        Precondition: self.guess is not None
+        :return: The reverted SudokuGuess
+        """
+        guess = self.guess
+        self.undo_trail(guess.trail_length)
+        self.guess = guess.previous_guess
+        self.seed_propagation_queues()
+        # Recorded in the trail of the previous guess, so reverting that guess also restores the candidate
+        self.remove_possibility_from_puzzle_by_cell_name(guess.guess_cell_name, guess.guess_candidate)
+        return guess
+
+    def undo_trail(self, trail_length):
+        """
+        Undoes the changes in the trail, most recent first, until only trail_length changes remain
+        Each change is a (cell_id, val, previous_possibilities) tuple where:
+            * previous_possibilities is None if val was removed from the cell's possibilities
+            * otherwise the cell was set to val and previous_possibilities are the possibilities it had before
+        :param trail_length: The number of changes to keep. Precondition: 0 <= trail_length <= len(self.trail)
+        """
+        trail = self.trail
+        while len(trail) > trail_length:
+            (cell_id, val, previous_possibilities) = trail.pop()
+            self.touch_units(cell_id)
+            if previous_possibilities is None:
+                self.add_cell_possibility(cell_id, val)
+                self.zobrist_hash ^= zobrist_keys[10 * cell_id + val]
+                if self.count_cell_possibilities(cell_id) == 1:
+                    self.num_contradictions -= 1
+                self.add_loc_left(cell_id, val)
+            else:
+                (y, x, block) = (y_by_cell_id[cell_id], x_by_cell_id[cell_id], block_by_cell_id[cell_id])
+                self.remaining_in_y[y].add(val)
+                self.remaining_in_x[x].add(val)
+                self.remaining_in_blocks[block].add(val)
+                self.cell_vals[cell_id] = None
+                self.cell_possibilities[cell_id] = previous_possibilities
+                for p in self.get_cell_possibility_tuple(cell_id):
+                    if p != val:
+                        self.add_loc_left(cell_id, p)
+                        self.zobrist_hash ^= zobrist_keys[10 * cell_id + p]
+                self.num_filled -= 1
+
     def validate_updated_cells_ignoring_newly_set_val(self, updated_cells, cell_name):
         """
         :param updated_cells: A list of (other_name, val) tuples set by the previous method
@@ -99,20 +383,21 @@ class SudokuPuzzle:
         However, it ignores any errors coming from the cell which was just set (cell_name)
         i.e. A candidate can no longer be placed in every row/col/block or a cell has an empty set for possibilities
         """
-        cell = self.cells_dict[cell_name]
+        cell_id = cell_id_by_name[cell_name]
+        (y, x, block) = (y_by_cell_id[cell_id], x_by_cell_id[cell_id], block_by_cell_id[cell_id])
         for (other_name, val) in updated_cells:
-            other_cell = self.cells_dict[other_name]
-            if other_cell.possibilities is None or len(other_cell.possibilities) == 0:
+            other_id = cell_id_by_name[other_name]
+            other_y = y_by_cell_id[other_id]
+            other_x = x_by_cell_id[other_id]
+            other_block = block_by_cell_id[other_id]
+            if self.count_cell_possibilities(other_id) == 0:
                 raise BadGuessError(other_name, val, "No more possibilities for cell " + other_name)
-            if cell.y != other_cell.y and (self.locs_left_by_y[other_cell.y][val] is None or len(
-                    self.locs_left_by_y[other_cell.y][val]) == 0):
-                raise BadGuessError(other_name, val, "Can't place " + str(val) + " in row " + str(other_cell.y))
-            if cell.x != other_cell.x and (self.locs_left_by_x[other_cell.x][val] is None or len(
-                    self.locs_left_by_x[other_cell.x][val]) == 0):
-                raise BadGuessError(other_name, val, "Can't place " + str(val) + " in col " + str(other_cell.x))
-            if cell.block != other_cell.block and (self.locs_left_by_block[other_cell.block][val] is None or len(
-                    self.locs_left_by_block[other_cell.block][val]) == 0):
-                raise BadGuessError(other_name, val, "Can't place " + str(val) + " in block " + str(other_cell.block))
+            if y != other_y and self.num_locs_left[other_y][val] == 0:
+                raise BadGuessError(other_name, val, "Can't place " + str(val) + " in row " + str(other_y))
+            if x != other_x and self.num_locs_left[9 + other_x][val] == 0:
+                raise BadGuessError(other_name, val, "Can't place " + str(val) + " in col " + str(other_x))
+            if block != other_block and self.num_locs_left[18 + other_block][val] == 0:
+                raise BadGuessError(other_name, val, "Can't place " + str(val) + " in block " + str(other_block))
 
     def validate_updated_cells(self, updated_cells):
         """
@@ -121,31 +406,22 @@ class SudokuPuzzle:
         i.e. A candidate can no longer be placed in every row/col/block or a cell has an empty set for possibilities
         """
         for (cell_name, val) in updated_cells:
-            cell = self.cells_dict[cell_name]
-            if cell.possibilities is None or len(cell.possibilities) == 0:
+            cell_id = cell_id_by_name[cell_name]
+            (y, x, block) = (y_by_cell_id[cell_id], x_by_cell_id[cell_id], block_by_cell_id[cell_id])
+            if self.count_cell_possibilities(cell_id) == 0:
                 raise BadGuessError(cell_name, val, "No more possibilities for cell " + cell_name)
-            if self.locs_left_by_y[cell.y][val] is None or len(self.locs_left_by_y[cell.y][val]) == 0:
-                raise BadGuessError(cell_name, val, "Can't place " + str(val) + " in row " + str(cell.y))
-            if self.locs_left_by_x[cell.x][val] is None or len(self.locs_left_by_x[cell.x][val]) == 0:
-                raise BadGuessError(cell_name, val, "Can't place " + str(val) + " in col " + str(cell.x))
-            if self.locs_left_by_block[cell.block][val] is None or len(self.locs_left_by_block[cell.block][val]) == 0:
-                raise BadGuessError(cell_name, val, "Can't place " + str(val) + " in block " + str(cell.block))
+            if self.num_locs_left[y][val] == 0:
+                raise BadGuessError(cell_name, val, "Can't place " + str(val) + " in row " + str(y))
+            if self.num_locs_left[9 + x][val] == 0:
+                raise BadGuessError(cell_name, val, "Can't place " + str(val) + " in col " + str(x))
+            if self.num_locs_left[18 + block][val] == 0:
+                raise BadGuessError(cell_name, val, "Can't place " + str(val) + " in block " + str(block))
 
     def initialize_new_puzzle(self, board):
         """
         Used when initializing a new puzzle
         :param board: A 2D-matrix containing known values
         """
-        # For every location create a SudokuCell object and add it to the appropriate cell lists
-        for y in all_locs:
-            for x in all_locs:
-                c = SudokuCell(y, x)
-                self.cells_dict[c.name] = c
-                self.board[y][x] = c.name
-                self.y_cell_list[c.y].add(c.name)
-                self.x_cell_list[c.x].add(c.name)
-                self.block_cell_list[c.block].add(c.name)
-
         # Set all the known values
         for y in all_locs:
             for x in all_locs:
@@ -157,102 +433,218 @@ class SudokuPuzzle:
         if illegal_cells:
             raise BadPuzzleError(illegal_cells)
 
-        # Calculate remaining_in and locs_left_by fields
+        # Calculate remaining_in and locs_left fields
         self.recalculate_fields()
 
     def recalculate_fields(self):
         """
-        Recalculate the remaining_in and locs_left_by fields based on the cells_dict
+        Recalculate the remaining_in and locs_left fields based on the cell_vals and cell_possibilities
         """
         self.remaining_in_y = [copy.deepcopy(all_possibilities) for _ in all_locs]
         self.remaining_in_x = [copy.deepcopy(all_possibilities) for _ in all_locs]
         self.remaining_in_blocks = [copy.deepcopy(all_possibilities) for _ in all_locs]
-
-        for cell_name in self.cells_dict.keys():
-            cell = self.cells_dict[cell_name]
-            if cell.val:
-                self.remaining_in_y[cell.y].discard(cell.val)
-                self.remaining_in_x[cell.x].discard(cell.val)
-                self.remaining_in_blocks[cell.block].discard(cell.val)
-            possibilities = cell.possibilities
-            for p in possibilities:
-                self.locs_left_by_y[cell.y][p].add(cell.x)
-                self.locs_left_by_x[cell.x][p].add(cell.y)
-                self.locs_left_by_block[cell.block][p].add(cell.block_cell_num)
+        self.locs_left_masks = [[0 for _ in range(0, 10)] for _ in all_unit_nums]
+        self.num_locs_left = [[0 for _ in range(0, 10)] for _ in all_unit_nums]
+        self.val_bitboards = [0 for _ in range(0, 10)]
+        self.strong_link_units = [0 for _ in range(0, 10)]
+        self.clean_versions = {}
+        self.unit_subsets = [None for _ in all_unit_nums]
+        self.strong_link_graphs = [None for _ in range(0, 10)]
+        self.zobrist_hash = 0
+        self.num_possibilities = 0
+
+        for cell_id in all_cell_ids:
+            (y, x, block) = (y_by_cell_id[cell_id], x_by_cell_id[cell_id], block_by_cell_id[cell_id])
+            val = self.cell_vals[cell_id]
+            if val:
+                self.remaining_in_y[y].discard(val)
+                self.remaining_in_x[x].discard(val)
+                self.remaining_in_blocks[block].discard(val)
+            for p in self.get_cell_possibility_tuple(cell_id):
+                self.add_loc_left(cell_id, p)
+                self.zobrist_hash ^= zobrist_keys[10 * cell_id + p]
+        self.num_contradictions = len([c for c in all_cell_ids if self.count_cell_possibilities(c) == 0])
+        self.num_contradictions += len([val for unit_num in all_unit_nums for val in all_possibilities
+                                        if self.num_locs_left[unit_num][val] == 0])
+        self.seed_propagation_queues()
+
+    # region Propagation Queues
+    def get_remaining_in_unit(self, unit_num):
+        """
+        :param unit_num: The unit number. Precondition: 0 <= unit_num < 27
+        :return: The remaining_in set for the row, col or block of the unit
+        """
+        if unit_num < 9:
+            return self.remaining_in_y[unit_num]
+        if unit_num < 18:
+            return self.remaining_in_x[unit_num - 9]
+        return self.remaining_in_blocks[unit_num - 18]
+
+    def is_sole_candidate(self, cell_id):
+        """
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :return: True if the cell is empty and has a single possibility left. False otherwise
+        """
+        return self.cell_vals[cell_id] is None and self.count_cell_possibilities(cell_id) == 1
+
+    def is_unique_candidate(self, unit_num, val):
+        """
+        :param unit_num: The unit number. Precondition: 0 <= unit_num < 27
+        :param val: The candidate. Precondition: 1 <= val <= 9
+        :return: True if the val is not placed in the unit and has a single loc left in it. False otherwise
+        """
+        return self.num_locs_left[unit_num][val] == 1 and val in self.get_remaining_in_unit(unit_num)
+
+    def seed_propagation_queues(self):
+        """
+        Rebuilds the sole and unique candidate queues by scanning every cell and every unit
+        Used whenever the puzzle changes without going through remove_possibility_from_puzzle_by_cell_id
+        """
+        self.sole_candidate_queue = [cell_id for cell_id in all_cell_ids if self.is_sole_candidate(cell_id)]
+        self.unique_candidate_queue = [(unit_num, val) for unit_num in all_unit_nums for val in all_possibilities
+                                       if self.is_unique_candidate(unit_num, val)]
+        heapq.heapify(self.sole_candidate_queue)
+        heapq.heapify(self.unique_candidate_queue)
+
+    def propagate(self):
+        """
+        Fills in sole and unique candidates until neither queue has any left or the puzzle has a contradiction
+        Unlike propagate_singles, no SudokuSteps are created
+        :return: False if the puzzle has a contradiction. True otherwise
+        """
+        sole_candidate_queue = self.sole_candidate_queue
+        unique_candidate_queue = self.unique_candidate_queue
+        while not self.num_contradictions:
+            if sole_candidate_queue:
+                cell_id = heapq.heappop(sole_candidate_queue)
+                if self.is_sole_candidate(cell_id):
+                    self.place_val(cell_id, self.get_cell_possibility_tuple(cell_id)[0])
+            elif unique_candidate_queue:
+                (unit_num, val) = heapq.heappop(unique_candidate_queue)
+                if self.is_unique_candidate(unit_num, val):
+                    self.place_val(unit_cell_ids[unit_num][bit_to_locs[self.locs_left_masks[unit_num][val]][0]], val)
+            else:
+                return True
+        return False
+
+    def propagate_singles(self):
+        """
+        Fills in sole and unique candidates until neither queue has any left
+        :return: A list of the SudokuSteps taken, in order
+        """
+        steps = []
+        ss = self.fill_sole_candidate() or self.fill_unique_candidate()
+        while ss:
+            steps.append(ss)
+            ss = self.fill_sole_candidate() or self.fill_unique_candidate()
+        return steps
+    # endregion
 
     def set_val_in_puzzle(self, y, x, val):
         """
         Sets the cell at position (y,x) to the val.
-        Removes possibilities from remaining_in and locs_left_by fields
+        Removes possibilities from remaining_in and locs_left fields
         :param y: The y location of the cell. Precondition: 0 <= y < 9
         :param x: The x location of the cell. Precondition: 0 <= x < 9
         :param val: The value to set. Precondition: 1 <= val <= 9
         :return: A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
-        cell_name = self.board[y][x]
-        return self.set_val_in_puzzle_by_cell_name(cell_name, val)
+        return self.set_val_in_puzzle_by_cell_id(SudokuHelper.loc_to_cell_id(y, x), val)
 
     def set_val_in_puzzle_by_cell_name(self, cell_name, val):
         """
         Sets the cell with the provided cell_name to the val.
-        Removes possibilities from remaining_in and locs_left_by fields
+        Removes possibilities from remaining_in and locs_left fields
         :param cell_name: The cell_name of the cell.
         :param val: The value to set. Precondition: 1 <= val <= 9
         :return: A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
-        updated_cells = set()
-        c = self.cells_dict[cell_name]
-        self.remaining_in_y[c.y].discard(val)
-        self.remaining_in_x[c.x].discard(val)
-        self.remaining_in_blocks[c.block].discard(val)
-        self.locs_left_by_y[c.y][val].discard(c.x)
-        self.locs_left_by_x[c.x][val].discard(c.y)
-        self.locs_left_by_block[c.block][val].discard(c.block_cell_num)
-        c.set_val(val)
+        return self.set_val_in_puzzle_by_cell_id(cell_id_by_name[cell_name], val)
+
+    def set_val_in_puzzle_by_cell_id(self, cell_id, val):
+        """
+        Sets the cell with the provided cell_id to the val.
+        Removes possibilities from remaining_in and locs_left fields
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :param val: The value to set. Precondition: 1 <= val <= 9
+        :return: A set of (cell name, removed possibility) tuples for the cells with possibilities removed
+        """
+        return {(name_by_cell_id[other_id], val) for other_id in self.place_val(cell_id, val)}
+
+    def place_val(self, cell_id, val):
+        """
+        Sets the cell with the provided cell_id to the val. See set_val_in_puzzle_by_cell_id
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :param val: The value to set. Precondition: 1 <= val <= 9
+        :return: A list with the ids of the cells which had val removed from their possibilities
+        """
+        updated_cell_ids = []
+        (y, x, block) = (y_by_cell_id[cell_id], x_by_cell_id[cell_id], block_by_cell_id[cell_id])
+        self.remaining_in_y[y].discard(val)
+        self.remaining_in_x[x].discard(val)
+        self.remaining_in_blocks[block].discard(val)
+        self.touch_units(cell_id)
+        # The filled cell stays the only loc left for val in its row, col and block
+        for p in self.get_cell_possibility_tuple(cell_id):
+            if p != val:
+                self.remove_loc_left(cell_id, p)
+                self.zobrist_hash ^= zobrist_keys[10 * cell_id + p]
+        if self.guess is not None:
+            self.trail.append((cell_id, val, self.cell_possibilities[cell_id]))
+        self.cell_vals[cell_id] = val
+        self.set_cell_possibilities_to_val(cell_id, val)
         self.num_filled += 1
 
-        # Remove possibilities from row, col, block
-        for other_name in self.y_cell_list[c.y]:
-            if self.remove_possibility_from_puzzle_by_cell_name(other_name, val):
-                updated_cells.add((other_name, val))
-        for other_name in self.x_cell_list[c.x]:
-            if self.remove_possibility_from_puzzle_by_cell_name(other_name, val):
-                updated_cells.add((other_name, val))
-        for other_name in self.block_cell_list[c.block]:
-            if self.remove_possibility_from_puzzle_by_cell_name(other_name, val):
-                updated_cells.add((other_name, val))
-        return updated_cells
+        # Remove possibilities from the peers in the row, col, block
+        for other_id in peers_by_cell_id[cell_id]:
+            if self.remove_possibility_from_puzzle_by_cell_id(other_id, val):
+                updated_cell_ids.append(other_id)
+        return updated_cell_ids
 
     # region Remove Possibilities
     # region Remove Single Possibility from puzzle
     def remove_possibility_from_puzzle_by_loc(self, y, x, val):
         """
         Removes the val from the cell at position (y,x)'s possibilities.
-        Also removes the val from the locs_left_by dicts
+        Also removes the val from the locs_left fields
         :param y: The y location of the cell. Precondition: 0 <= y < 9
         :param x: The x location of the cell. Precondition: 0 <= x < 9
         :param val: The value to remove. Precondition: 1 <= val <= 9
         :return True if the possibility was removed. False otherwise
         """
-        cell_name = self.board[y][x]
-        return self.remove_possibility_from_puzzle_by_cell_name(cell_name, val)
+        return self.remove_possibility_from_puzzle_by_cell_id(SudokuHelper.loc_to_cell_id(y, x), val)
 
     def remove_possibility_from_puzzle_by_cell_name(self, cell_name, val):
         """
         Removes the val from the cell's possibilities.
-        Also removes the val from the locs_left_by dicts
+        Also removes the val from the locs_left fields
         :param cell_name: The name of the cell
         :param val: The value to remove. Precondition: 1 <= val <= 9
         :return True if the possibility was actually removed. False otherwise
         """
-        cell = self.cells_dict[cell_name]
-        val_removed = False
-        if cell.val is None:
-            val_removed = cell.remove_possibility(val)
-            self.locs_left_by_y[cell.y][val].discard(cell.x)
-            self.locs_left_by_x[cell.x][val].discard(cell.y)
-            self.locs_left_by_block[cell.block][val].discard(cell.block_cell_num)
-        return val_removed
+        return self.remove_possibility_from_puzzle_by_cell_id(cell_id_by_name[cell_name], val)
+
+    def remove_possibility_from_puzzle_by_cell_id(self, cell_id, val):
+        """
+        Removes the val from the cell's possibilities.
+        Also removes the val from the locs_left fields
+        :param cell_id: The id of the cell. Precondition: 0 <= cell_id < 81
+        :param val: The value to remove. Precondition: 1 <= val <= 9
+        :return True if the possibility was actually removed. False otherwise
+        """
+        if self.cell_vals[cell_id] is not None or not self.discard_cell_possibility(cell_id, val):
+            return False
+        self.touch_units(cell_id)
+        self.remove_loc_left(cell_id, val)
+        self.zobrist_hash ^= zobrist_keys[10 * cell_id + val]
+        num_possibilities = self.count_cell_possibilities(cell_id)
+        if num_possibilities == 1:
+            heapq.heappush(self.sole_candidate_queue, cell_id)
+        elif num_possibilities == 0:
+            self.num_contradictions += 1
+        if self.guess is not None:
+            self.trail.append((cell_id, val, None))
+        return True
     # endregion
 
     # region Eliminate Possibilities from Row/Col/Block (except excluded)
@@ -265,14 +657,8 @@ class SudokuPuzzle:
         Eliminates vals from the possibilities of all cells in the row except the ones with x-offsets in x_to_exclude.
         :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
-        updated_cells = set()
-        for cell_name in self.y_cell_list[y]:
-            cell = self.cells_dict[cell_name]
-            if cell.x not in x_to_exclude:
-                for val in vals:
-                    if self.remove_possibility_from_puzzle_by_cell_name(cell_name, val):
-                        updated_cells.add((cell_name, val))
-        return updated_cells
+        return self.eliminate_possibilities_from_cells(
+            [cell_id for (x, cell_id) in enumerate(y_cell_ids[y]) if x not in x_to_exclude], vals)
 
     def eliminate_possibilities_from_col(self, x, vals, y_to_exclude):
         """
@@ -283,13 +669,21 @@ class SudokuPuzzle:
         Eliminates vals from the possibilities of all cells in the col except the ones with y-offsets in y_to_exclude.
         :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
+        return self.eliminate_possibilities_from_cells(
+            [cell_id for (y, cell_id) in enumerate(x_cell_ids[x]) if y not in y_to_exclude], vals)
+
+    def eliminate_possibilities_from_cells(self, cell_ids, vals):
+        """
+        :param cell_ids: An enumerable containing the ids of the cells. Precondition: 0 <= cell_id < 81
+        :param vals: A set containing the values to eliminate. Precondition: 1 <= val <= 9 for val in vals
+        Eliminates vals from the possibilities of all the cells
+        :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
+        """
         updated_cells = set()
-        for cell_name in self.x_cell_list[x]:
-            cell = self.cells_dict[cell_name]
-            if cell.y not in y_to_exclude:
-                for val in vals:
-                    if self.remove_possibility_from_puzzle_by_cell_name(cell_name, val):
-                        updated_cells.add((cell_name, val))
+        for cell_id in cell_ids:
+            for val in vals:
+                if self.remove_possibility_from_puzzle_by_cell_id(cell_id, val):
+                    updated_cells.add((name_by_cell_id[cell_id], val))
         return updated_cells
     # endregion
 
@@ -303,15 +697,7 @@ class SudokuPuzzle:
         Eliminates candidates not in excluded_vals from the possibilities of cells in the row with offset in offsets
         :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
-        updated_cells = set()
-        for cell_name in self.y_cell_list[y]:
-            cell = self.cells_dict[cell_name]
-            if cell.x in offsets:
-                possibilities_to_remove = cell.possibilities.difference(excluded_vals)
-                for candidate in possibilities_to_remove:
-                    if self.remove_possibility_from_puzzle_by_cell_name(cell_name, candidate):
-                        updated_cells.add((cell_name, candidate))
-        return updated_cells
+        return self.eliminate_other_possibilities_from_cells([y_cell_ids[y][x] for x in offsets], excluded_vals)
 
     def eliminate_other_possibilities_from_cells_in_col(self, x, excluded_vals, offsets):
         """
@@ -322,15 +708,7 @@ class SudokuPuzzle:
         Eliminates candidates not in excluded_vals from the possibilities of cells in the col with offset in offsets
         :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
-        updated_cells = set()
-        for cell_name in self.x_cell_list[x]:
-            cell = self.cells_dict[cell_name]
-            if cell.y in offsets:
-                possibilities_to_remove = cell.possibilities.difference(excluded_vals)
-                for candidate in possibilities_to_remove:
-                    if self.remove_possibility_from_puzzle_by_cell_name(cell_name, candidate):
-                        updated_cells.add((cell_name, candidate))
-        return updated_cells
+        return self.eliminate_other_possibilities_from_cells([x_cell_ids[x][y] for y in offsets], excluded_vals)
 
     def eliminate_other_possibilities_from_cells_in_block(self, block_num, excluded_vals, offsets):
         """
@@ -342,14 +720,23 @@ class SudokuPuzzle:
         block-cell-nums
         :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
+        return self.eliminate_other_possibilities_from_cells([block_cell_ids[block_num][n] for n in offsets],
+                                                             excluded_vals)
+
+    def eliminate_other_possibilities_from_cells(self, cell_ids, excluded_vals):
+        """
+        :param cell_ids: An enumerable containing the ids of the cells. Precondition: 0 <= cell_id < 81
+        :param excluded_vals: A set containing the values to keep. Precondition: 1 <= val <= 9 for val in excluded_vals
+        Eliminates candidates not in excluded_vals from the possibilities of the cells
+        :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
+        """
         updated_cells = set()
-        for cell_name in self.block_cell_list[block_num]:
-            cell = self.cells_dict[cell_name]
-            if cell.block_cell_num in offsets:
-                possibilities_to_remove = cell.possibilities.difference(excluded_vals)
-                for candidate in possibilities_to_remove:
-                    if self.remove_possibility_from_puzzle_by_cell_name(cell_name, candidate):
-                        updated_cells.add((cell_name, candidate))
+        for cell_id in cell_ids:
+            for candidate in self.get_cell_possibility_tuple(cell_id):
+                if candidate in excluded_vals:
+                    continue
+                if self.remove_possibility_from_puzzle_by_cell_id(cell_id, candidate):
+                    updated_cells.add((name_by_cell_id[cell_id], candidate))
         return updated_cells
 
     def eliminate_other_possibilities_from_other_cells_in_block(self, block_num, excluded_vals, other_block_cell_nums):
@@ -362,14 +749,9 @@ class SudokuPuzzle:
         Eliminates all possibilities from the the cells in other_block_cell_nums except for the ones in excluded_vals.
         :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
-        updated_cells = set()
-        for cell_name in self.block_cell_list[block_num]:
-            cell = self.cells_dict[cell_name]
-            if cell.block_cell_num not in other_block_cell_nums:
-                for val in excluded_vals:
-                    if self.remove_possibility_from_puzzle_by_cell_name(cell_name, val):
-                        updated_cells.add((cell_name, val))
-        return updated_cells
+        return self.eliminate_possibilities_from_cells(
+            [cell_id for (n, cell_id) in enumerate(block_cell_ids[block_num]) if n not in other_block_cell_nums],
+            excluded_vals)
 
     # endregion
 
@@ -384,14 +766,10 @@ class SudokuPuzzle:
         :param val: The val to find. Precondition: 1 <= val <= 9
         :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
-        updated_cells = set()
         y_block, x_block = SudokuHelper.block_num_to_block_offsets(block_num)
         y = y_block + y_offset
-        for cell_name in self.y_cell_list[y]:
-            if self.cells_dict[cell_name].block != block_num:
-                if self.remove_possibility_from_puzzle_by_cell_name(cell_name, val):
-                    updated_cells.add((cell_name, val))
-        return updated_cells
+        return self.eliminate_possibilities_from_cells(
+            [cell_id for cell_id in y_cell_ids[y] if block_by_cell_id[cell_id] != block_num], {val})
 
     def remove_possibility_not_in_block_with_x_offset(self, block_num, x_offset, val):
         """
@@ -403,14 +781,10 @@ class SudokuPuzzle:
         :param val: The val to find. Precondition: 1 <= val <= 9
         :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
-        updated_cells = set()
         y_block, x_block = SudokuHelper.block_num_to_block_offsets(block_num)
         x = x_block + x_offset
-        for cell_name in self.x_cell_list[x]:
-            if self.cells_dict[cell_name].block != block_num:
-                if self.remove_possibility_from_puzzle_by_cell_name(cell_name, val):
-                    updated_cells.add((cell_name, val))
-        return updated_cells
+        return self.eliminate_possibilities_from_cells(
+            [cell_id for cell_id in x_cell_ids[x] if block_by_cell_id[cell_id] != block_num], {val})
     # endregion
 
     # region Eliminate possibilities in Block not in Row/Col
@@ -422,14 +796,8 @@ class SudokuPuzzle:
         :param possibilities: The possibilities to remove. Precondition: 1 <= val <= 9 for val in possibilities
         :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
-        updated_cells = set()
-        for cell_name in self.block_cell_list[block_num]:
-            cell = self.cells_dict[cell_name]
-            if cell.y != y:
-                for val in possibilities:
-                    if self.remove_possibility_from_puzzle_by_cell_name(cell_name, val):
-                        updated_cells.add((cell_name, val))
-        return updated_cells
+        return self.eliminate_possibilities_from_cells(
+            [cell_id for cell_id in block_cell_ids[block_num] if y_by_cell_id[cell_id] != y], possibilities)
 
     def remove_possibilities_in_block_not_in_col(self, block_num, x, possibilities):
         """
@@ -439,14 +807,8 @@ class SudokuPuzzle:
         :param possibilities: The possibilities to remove. Precondition: 1 <= val <= 9 for val in possibilities
         :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
-        updated_cells = set()
-        for cell_name in self.block_cell_list[block_num]:
-            cell = self.cells_dict[cell_name]
-            if cell.x != x:
-                for val in possibilities:
-                    if self.remove_possibility_from_puzzle_by_cell_name(cell_name, val):
-                        updated_cells.add((cell_name, val))
-        return updated_cells
+        return self.eliminate_possibilities_from_cells(
+            [cell_id for cell_id in block_cell_ids[block_num] if x_by_cell_id[cell_id] != x], possibilities)
     # endregion
     # endregion
 
@@ -454,13 +816,13 @@ class SudokuPuzzle:
         """
         :return: A 2D-matrix of possibilities for the puzzle
         """
-        return [[self.cells_dict[self.board[y][x]].possibilities for x in all_locs] for y in all_locs]
+        return [[self.get_cell_possibilities(cell_id) for cell_id in y_cell_ids[y]] for y in all_locs]
 
     def get_board(self):
         """
         :return: A 2D-matrix of filled in values for the puzzle
         """
-        return [[self.cells_dict[self.board[y][x]].val for x in all_locs] for y in all_locs]
+        return [[self.cell_vals[cell_id] for cell_id in y_cell_ids[y]] for y in all_locs]
 
     # region Sole Candidates
     def fill_sole_candidate(self):
@@ -471,11 +833,13 @@ class SudokuPuzzle:
                 * filled_cell = (cell_name, candidate) tuple set by this method
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        for cell_name in self.cells_dict.keys():
-            cell = self.cells_dict[cell_name]
-            if cell.val is None and len(cell.possibilities) == 1:
-                val = next(iter(cell.possibilities))
-                updated_cells = (self.set_val_in_puzzle_by_cell_name(cell_name, val))
+        queue = self.sole_candidate_queue
+        while queue:
+            cell_id = heapq.heappop(queue)
+            if self.is_sole_candidate(cell_id):
+                val = self.get_cell_possibility_tuple(cell_id)[0]
+                cell_name = name_by_cell_id[cell_id]
+                updated_cells = self.set_val_in_puzzle_by_cell_id(cell_id, val)
                 description = "Sole Candidate: " + str(val) + " is the last candidate for " + str(cell_name)
                 return SudokuStep((cell_name, val), updated_cells, description)
         return None
@@ -491,15 +855,9 @@ class SudokuPuzzle:
                 * filled_cell = (cell_name, candidate) tuple set by this method
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        y_locs_left = self.locs_left_by_y[y]
-        y_possibilities = self.remaining_in_y[y]
-        for val in copy.deepcopy(y_possibilities):
-            if len(y_locs_left[val]) == 1:
-                cell_name = self.board[y][next(iter(y_locs_left[val]))]
-                updated_cells = self.set_val_in_puzzle_by_cell_name(cell_name, val)
-                description = "Unique Candidate: " + cell_name + " is the only remaining location for " + str(val) +\
-                              " in row " + str(y)
-                return SudokuStep((cell_name, val), updated_cells, description)
+        for val in copy.deepcopy(self.remaining_in_y[y]):
+            if self.num_locs_left[y][val] == 1:
+                return self.fill_unique_candidate_in_unit(y, val)
         return None
 
     def fill_unique_candidate_x(self, x):
@@ -511,15 +869,9 @@ class SudokuPuzzle:
                 * filled_cell = (cell_name, candidate) tuple set by this method
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        x_locs_left = self.locs_left_by_x[x]
-        x_possibilities = self.remaining_in_x[x]
-        for val in copy.deepcopy(x_possibilities):
-            if len(x_locs_left[val]) == 1:
-                cell_name = self.board[next(iter(x_locs_left[val]))][x]
-                updated_cells = self.set_val_in_puzzle_by_cell_name(cell_name, val)
-                description = "Unique Candidate: " + cell_name + " was the only remaining location for " + str(val) +\
-                              " in col " + str(x)
-                return SudokuStep((cell_name, val), updated_cells, description)
+        for val in copy.deepcopy(self.remaining_in_x[x]):
+            if self.num_locs_left[9 + x][val] == 1:
+                return self.fill_unique_candidate_in_unit(9 + x, val)
         return None
 
     def fill_unique_candidate_block(self, block_num):
@@ -531,17 +883,9 @@ class SudokuPuzzle:
                 * filled_cell = (cell_name, candidate) tuple set by this method
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        block_locs_left = self.locs_left_by_block[block_num]
-        block_possibilities = self.remaining_in_blocks[block_num]
-        for val in copy.deepcopy(block_possibilities):
-            if len(block_locs_left[val]) == 1:
-                (y, x) = SudokuHelper.block_num_and_cell_num_to_offsets(
-                    block_num, next(iter(block_locs_left[val])))
-                cell_name = self.board[y][x]
-                updated_cells = self.set_val_in_puzzle_by_cell_name(cell_name, val)
-                description = "Unique Candidate: " + cell_name + " was the only remaining location for " + str(val) +\
-                              " in block " + str(block_num)
-                return SudokuStep((cell_name, val), updated_cells, description)
+        for val in copy.deepcopy(self.remaining_in_blocks[block_num]):
+            if self.num_locs_left[18 + block_num][val] == 1:
+                return self.fill_unique_candidate_in_unit(18 + block_num, val)
         return None
 
     def fill_unique_candidate(self):
@@ -552,19 +896,32 @@ class SudokuPuzzle:
                 * filled_cell = (cell_name, candidate) tuple set by this method
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        for y in all_locs:
-            ss = self.fill_unique_candidate_y(y)
-            if ss:
-                return ss
-        for x in all_locs:
-            ss = self.fill_unique_candidate_x(x)
-            if ss:
-                return ss
-        for block_num in all_locs:
-            ss = self.fill_unique_candidate_block(block_num)
-            if ss:
-                return ss
+        queue = self.unique_candidate_queue
+        while queue:
+            (unit_num, val) = heapq.heappop(queue)
+            if self.is_unique_candidate(unit_num, val):
+                return self.fill_unique_candidate_in_unit(unit_num, val)
         return None
+
+    def fill_unique_candidate_in_unit(self, unit_num, val):
+        """
+        :param unit_num: The unit number. Precondition: 0 <= unit_num < 27
+        :param val: The candidate. Precondition: self.is_unique_candidate(unit_num, val)
+        Fills the val into its only remaining location in the row/col/block
+        :return A SudokuStep corresponding to the guess where:
+                * filled_cell = (cell_name, candidate) tuple set by this method
+                * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
+        """
+        cell_id = unit_cell_ids[unit_num][bit_to_locs[self.locs_left_masks[unit_num][val]][0]]
+        cell_name = name_by_cell_id[cell_id]
+        updated_cells = self.set_val_in_puzzle_by_cell_id(cell_id, val)
+        if unit_num < 9:
+            location = " is the only remaining location for " + str(val) + " in row " + str(unit_num)
+        elif unit_num < 18:
+            location = " was the only remaining location for " + str(val) + " in col " + str(unit_num - 9)
+        else:
+            location = " was the only remaining location for " + str(val) + " in block " + str(unit_num - 18)
+        return SudokuStep((cell_name, val), updated_cells, "Unique Candidate: " + cell_name + location)
     # endregion
 
     @staticmethod
@@ -593,7 +950,7 @@ class SudokuPuzzle:
         """
         for val in copy.deepcopy(self.remaining_in_blocks[block_num]):
             (y_block, x_block) = SudokuHelper.block_num_to_block_offsets(block_num)
-            cell_nums = self.locs_left_by_block[block_num][val]
+            cell_nums = bit_to_locs[self.locs_left_masks[18 + block_num][val]]
             y_offsets, x_offsets = SudokuPuzzle.find_unique_offsets_for_cell_nums(cell_nums)
             if len(y_offsets) == 1:
                 y_offset = next(iter(y_offsets))
@@ -618,7 +975,7 @@ class SudokuPuzzle:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
         for block_num in all_locs:
-            ss = self.block_rc_interaction(block_num)
+            ss = self.perform_on_dirty_units([18 + block_num], self.block_rc_interaction, block_num)
             if ss:
                 return ss
         return None
@@ -640,10 +997,9 @@ class SudokuPuzzle:
             row_possibilities = self.remaining_in_y[y]
             possibilities = excluded_block_possibilities.intersection(row_possibilities)
             # Only keep the possibilities that are in the row and only found in the excluded block
-            for cell_name in self.y_cell_list[y]:
-                cell = self.cells_dict[cell_name]
-                if cell.block != excluded_block_num:
-                    possibilities.difference_update(cell.possibilities)
+            for cell_id in y_cell_ids[y]:
+                if block_by_cell_id[cell_id] != excluded_block_num:
+                    possibilities.difference_update(self.get_cell_possibility_tuple(cell_id))
             if possibilities:
                 # Remove the possibilities from the cells in the block which are not in the row
                 updated_cells = self.remove_possibilities_in_block_not_in_row(excluded_block_num, y, possibilities)
@@ -668,10 +1024,9 @@ class SudokuPuzzle:
             col_possibilities = self.remaining_in_x[x]
             possibilities = excluded_block_possibilities.intersection(col_possibilities)
             # Only keep the possibilities that are in the col and only found in the excluded block
-            for cell_name in self.x_cell_list[x]:
-                cell = self.cells_dict[cell_name]
-                if cell.block != excluded_block_num:
-                    possibilities.difference_update(cell.possibilities)
+            for cell_id in x_cell_ids[x]:
+                if block_by_cell_id[cell_id] != excluded_block_num:
+                    possibilities.difference_update(self.get_cell_possibility_tuple(cell_id))
             if possibilities:
                 # Remove the possibilities from the cells in the block which are not in the row
                 updated_cells = self.remove_possibilities_in_block_not_in_col(excluded_block_num, x, possibilities)
@@ -687,11 +1042,15 @@ class SudokuPuzzle:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
         for block_num in all_locs:
-            ss = self.block_block_interaction_horizontal(block_num)
+            y_block = SudokuHelper.block_num_to_block_offsets(block_num)[0]
+            ss = self.perform_on_dirty_units([y_block + y_offset for y_offset in cell_locs],
+                                             self.block_block_interaction_horizontal, block_num)
             if ss:
                 return ss
         for block_num in all_locs:
-            ss = self.block_block_interaction_vertical(block_num)
+            x_block = SudokuHelper.block_num_to_block_offsets(block_num)[1]
+            ss = self.perform_on_dirty_units([9 + x_block + x_offset for x_offset in cell_locs],
+                                             self.block_block_interaction_vertical, block_num)
             if ss:
                 return ss
         return None
@@ -745,6 +1104,61 @@ class SudokuPuzzle:
                 naked_tuples_vals.append((offset_tuple, combined_possibilities))
         return naked_tuples_vals
 
+    # region Subsets
+    def get_unit_subsets(self, unit_num, n):
+        """
+        Finds the naked and hidden subsets of every size up to max_subset_size in the unit in a single pass, and
+        reuses them until the unit changes, so the naked pair, naked tuple and hidden subset techniques share the work
+        :param unit_num: The unit number. Precondition: 0 <= unit_num < 27
+        :param n: The number of cells or vals in a subset. Precondition: 2 <= n
+        :return: A (naked subsets, hidden subsets) tuple with the subsets which remove at least one possibility where:
+                * naked subsets is a list of (offsets, vals mask) tuples for n cells with n possibilities between them
+                * hidden subsets is a list of (vals, locs mask) tuples for n vals with n locs left between them
+        """
+        if n > max_subset_size:
+            (naked_subsets, hidden_subsets) = self.find_unit_subsets(unit_num, n)
+            return naked_subsets[n], hidden_subsets[n]
+        unit_subsets = self.unit_subsets[unit_num]
+        if unit_subsets is None or self.unit_versions[unit_num] > unit_subsets[0]:
+            unit_subsets = (self.version,) + self.find_unit_subsets(unit_num, max_subset_size)
+            self.unit_subsets[unit_num] = unit_subsets
+        return unit_subsets[1][n], unit_subsets[2][n]
+
+    def find_unit_subsets(self, unit_num, max_size):
+        """
+        :param unit_num: The unit number. Precondition: 0 <= unit_num < 27
+        :param max_size: The largest number of cells or vals in a subset
+        :return: The naked subsets of the cells with possibilities and the hidden subsets of the remaining vals of the
+        unit which remove at least one possibility. See SudokuHelper.find_subsets
+        """
+        cell_ids = unit_cell_ids[unit_num]
+        cell_masks = [self.get_cell_possibility_mask(cell_id) for cell_id in cell_ids]
+        # Possibilities are only removed from the empty cells
+        empty_masks = [0 if self.cell_vals[cell_id] is not None else mask
+                       for (cell_id, mask) in zip(cell_ids, cell_masks)]
+        remaining = self.get_remaining_in_unit(unit_num)
+        locs_left_masks = self.locs_left_masks[unit_num]
+        val_masks = [locs_left_masks[val] if val in remaining else None for val in range(0, 10)]
+        naked_subsets = [[(offsets, vals_mask) for (offsets, vals_mask) in subsets
+                          if any(empty_masks[offset] & vals_mask for offset in all_locs if offset not in offsets)]
+                         for subsets in find_subsets([mask if mask else None for mask in cell_masks], max_size)]
+        hidden_subsets = [[(vals, locs_mask) for (vals, locs_mask) in subsets
+                           if any(empty_masks[loc] & ~vals_to_mask(vals) for loc in bit_to_locs[locs_mask])]
+                          for subsets in find_subsets(val_masks, max_size)]
+        return naked_subsets, hidden_subsets
+
+    def get_naked_pairs(self, unit_num):
+        """
+        :param unit_num: The unit number. Precondition: 0 <= unit_num < 27
+        :return: A list of (offsets, vals) tuples for the pairs of cells in the unit with the same two possibilities
+        """
+        cell_ids = unit_cell_ids[unit_num]
+        return [(offset_pair, mask_to_vals(vals_mask))
+                for (offset_pair, vals_mask) in self.get_unit_subsets(unit_num, 2)[0]
+                if self.count_cell_possibilities(cell_ids[offset_pair[0]]) == 2 and
+                self.count_cell_possibilities(cell_ids[offset_pair[1]]) == 2]
+    # endregion
+
     # region Naked Tuples
     def naked_pair_y(self, y):
         """
@@ -753,10 +1167,7 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        row_possibilities = self.enumerate_row_possibilities(y)
-        row_dict = SudokuPuzzle.possibilities_to_dict_with_len_constraint(row_possibilities, lambda l: l == 2)
-        naked_offset_pairs = SudokuPuzzle.get_naked_pair_vals_in_possibilities_dict(row_dict)
-        for (offset_pair, vals) in naked_offset_pairs:
+        for (offset_pair, vals) in self.get_naked_pairs(y):
             updated_cells = self.eliminate_possibilities_from_row(y, vals, offset_pair)
             if updated_cells:
                 description = "Naked Pair Row : In row " + str(y) + ", " + str(vals) \
@@ -772,10 +1183,7 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        col_possibilities = self.enumerate_col_possibilities(x)
-        col_dict = SudokuPuzzle.possibilities_to_dict_with_len_constraint(col_possibilities, lambda l: l == 2)
-        naked_offset_pairs = SudokuPuzzle.get_naked_pair_vals_in_possibilities_dict(col_dict)
-        for (offset_pair, vals) in naked_offset_pairs:
+        for (offset_pair, vals) in self.get_naked_pairs(9 + x):
             updated_cells = self.eliminate_possibilities_from_col(x, vals, offset_pair)
             if updated_cells:
                 description = "Naked Pair Col : In col " + str(x) + ", " + str(vals) \
@@ -791,10 +1199,7 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        block_possibilities = self.enumerate_block_possibilities(block_num)
-        block_dict = SudokuPuzzle.possibilities_to_dict_with_len_constraint(block_possibilities, lambda l: l == 2)
-        naked_offset_pairs = SudokuPuzzle.get_naked_pair_vals_in_possibilities_dict(block_dict)
-        for (offset_pair, vals) in naked_offset_pairs:
+        for (offset_pair, vals) in self.get_naked_pairs(18 + block_num):
             updated_cells = self.eliminate_other_possibilities_from_other_cells_in_block(
                 block_num, vals, offset_pair)
             if updated_cells:
@@ -811,15 +1216,15 @@ class SudokuPuzzle:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
         for y in all_locs:
-            ss = self.naked_pair_y(y)
+            ss = self.perform_on_dirty_units([y], self.naked_pair_y, y)
             if ss:
                 return ss
         for x in all_locs:
-            ss = self.naked_pair_x(x)
+            ss = self.perform_on_dirty_units([9 + x], self.naked_pair_x, x)
             if ss:
                 return ss
         for block_num in all_locs:
-            ss = self.naked_pair_block(block_num)
+            ss = self.perform_on_dirty_units([18 + block_num], self.naked_pair_block, block_num)
             if ss:
                 return ss
         return None
@@ -834,10 +1239,8 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        row_possibilities = self.enumerate_row_possibilities(y)
-        row_dict = SudokuPuzzle.possibilities_to_dict_with_len_constraint(row_possibilities, lambda l: 0 < l <= n)
-        naked_offset_tuples = SudokuPuzzle.get_naked_tuple_vals_in_possibilities_dict(row_dict, n)
-        for (offset_tuple, vals) in naked_offset_tuples:
+        for (offset_tuple, vals_mask) in self.get_unit_subsets(y, n)[0]:
+            vals = mask_to_vals(vals_mask)
             updated_cells = self.eliminate_possibilities_from_row(y, vals, offset_tuple)
             if updated_cells:
                 description = "Naked Tuple Row " + str(n) + ": In row " + str(y) + ", " + str(vals) \
@@ -854,10 +1257,8 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        col_possibilities = self.enumerate_col_possibilities(x)
-        col_dict = SudokuPuzzle.possibilities_to_dict_with_len_constraint(col_possibilities, lambda l: 0 < l <= n)
-        naked_offset_tuples = SudokuPuzzle.get_naked_tuple_vals_in_possibilities_dict(col_dict, n)
-        for (offset_tuple, vals) in naked_offset_tuples:
+        for (offset_tuple, vals_mask) in self.get_unit_subsets(9 + x, n)[0]:
+            vals = mask_to_vals(vals_mask)
             updated_cells = self.eliminate_possibilities_from_col(x, vals, offset_tuple)
             if updated_cells:
                 description = "Naked Tuple Col " + str(n) + ": In col " + str(x) + ", " + str(vals) \
@@ -874,10 +1275,8 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        block_possibilities = self.enumerate_block_possibilities(block_num)
-        block_dict = SudokuPuzzle.possibilities_to_dict_with_len_constraint(block_possibilities, lambda l: 0 < l <= n)
-        naked_offset_tuples = SudokuPuzzle.get_naked_tuple_vals_in_possibilities_dict(block_dict, n)
-        for (offset_tuple, vals) in naked_offset_tuples:
+        for (offset_tuple, vals_mask) in self.get_unit_subsets(18 + block_num, n)[0]:
+            vals = mask_to_vals(vals_mask)
             updated_cells = self.eliminate_other_possibilities_from_other_cells_in_block(
                 block_num, vals, offset_tuple)
             if updated_cells:
@@ -896,15 +1295,15 @@ class SudokuPuzzle:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
         for y in all_locs:
-            ss = self.naked_tuple_y(y, n)
+            ss = self.perform_on_dirty_units([y], self.naked_tuple_y, y, n)
             if ss:
                 return ss
         for x in all_locs:
-            ss = self.naked_tuple_x(x, n)
+            ss = self.perform_on_dirty_units([9 + x], self.naked_tuple_x, x, n)
             if ss:
                 return ss
         for block_num in all_locs:
-            ss = self.naked_tuple_block(block_num, n)
+            ss = self.perform_on_dirty_units([18 + block_num], self.naked_tuple_block, block_num, n)
             if ss:
                 return ss
         return None
@@ -930,25 +1329,15 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        possibilities = self.remaining_in_y[y]
-        locs_left = self.locs_left_by_y[y]
-        for possibilities_tuple in itertools.combinations(possibilities, n):
-            locations = set()
-            hidden_subset_found = True
-            for candidate in possibilities_tuple:
-                locations.update(locs_left[candidate])
-                if len(locations) > n:
-                    hidden_subset_found = False
-                    break
-            if hidden_subset_found:
-                excluded_vals = set(possibilities_tuple)
-                updated_cells = self.eliminate_other_possibilities_from_cells_in_row(
-                    y, excluded_vals, locations)
-                if updated_cells:
-                    description = "Hidden Subset Row " + str(n) + ": In row " + str(y) + ", " + str(excluded_vals) \
+        for (possibilities_tuple, locations_mask) in self.get_unit_subsets(y, n)[1]:
+            locations = set(bit_to_locs[locations_mask])
+            excluded_vals = set(possibilities_tuple)
+            updated_cells = self.eliminate_other_possibilities_from_cells_in_row(y, excluded_vals, locations)
+            if updated_cells:
+                description = "Hidden Subset Row " + str(n) + ": In row " + str(y) + ", " + str(excluded_vals) \
                               + " can only be placed in cells with x-offsets of " + str(locations) \
                               + ".\nEliminating all other candidates for those cells."
-                    return SudokuStep(None, updated_cells, description)
+                return SudokuStep(None, updated_cells, description)
         return None
 
     def hidden_subset_col(self, x, n):
@@ -959,25 +1348,15 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        possibilities = self.remaining_in_x[x]
-        locs_left = self.locs_left_by_x[x]
-        for possibilities_tuple in itertools.combinations(possibilities, n):
-            locations = set()
-            hidden_subset_found = True
-            for candidate in possibilities_tuple:
-                locations.update(locs_left[candidate])
-                if len(locations) > n:
-                    hidden_subset_found = False
-                    break
-            if hidden_subset_found:
-                excluded_vals = set(possibilities_tuple)
-                updated_cells = self.eliminate_other_possibilities_from_cells_in_col(
-                    x, excluded_vals, locations)
-                if updated_cells:
-                    description = "Hidden Subset Col " + str(n) + ": In col " + str(x) + ", " + str(excluded_vals) \
+        for (possibilities_tuple, locations_mask) in self.get_unit_subsets(9 + x, n)[1]:
+            locations = set(bit_to_locs[locations_mask])
+            excluded_vals = set(possibilities_tuple)
+            updated_cells = self.eliminate_other_possibilities_from_cells_in_col(x, excluded_vals, locations)
+            if updated_cells:
+                description = "Hidden Subset Col " + str(n) + ": In col " + str(x) + ", " + str(excluded_vals) \
                               + " can only be placed in cells with y-offsets of " + str(locations) \
                               + ".\nEliminating all other candidates for those cells."
-                    return SudokuStep(None, updated_cells, description)
+                return SudokuStep(None, updated_cells, description)
         return None
 
     def hidden_subset_block(self, block_num, n):
@@ -988,25 +1367,15 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        possibilities = self.remaining_in_blocks[block_num]
-        locs_left = self.locs_left_by_block[block_num]
-        for possibilities_tuple in itertools.combinations(possibilities, n):
-            locations = set()
-            hidden_subset_found = True
-            for candidate in possibilities_tuple:
-                locations.update(locs_left[candidate])
-                if len(locations) > n:
-                    hidden_subset_found = False
-                    break
-            if hidden_subset_found:
-                excluded_vals = set(possibilities_tuple)
-                updated_cells = self.eliminate_other_possibilities_from_cells_in_block(
-                        block_num, set(possibilities_tuple), locations)
-                if updated_cells:
-                    description = "Hidden Subset Block " + str(n) + ": In block " + str(block_num) + ", " \
-                                  + str(excluded_vals) + " can only be placed in cells with block-cell-offsets of " \
-                                  + str(locations) + ".\nEliminating all other candidates for those cells."
-                    return SudokuStep(None, updated_cells, description)
+        for (possibilities_tuple, locations_mask) in self.get_unit_subsets(18 + block_num, n)[1]:
+            locations = set(bit_to_locs[locations_mask])
+            excluded_vals = set(possibilities_tuple)
+            updated_cells = self.eliminate_other_possibilities_from_cells_in_block(block_num, excluded_vals, locations)
+            if updated_cells:
+                description = "Hidden Subset Block " + str(n) + ": In block " + str(block_num) + ", " \
+                              + str(excluded_vals) + " can only be placed in cells with block-cell-offsets of " \
+                              + str(locations) + ".\nEliminating all other candidates for those cells."
+                return SudokuStep(None, updated_cells, description)
         return None
 
     def perform_hidden_subset(self, n):
@@ -1017,15 +1386,15 @@ class SudokuPuzzle:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
         for y in all_locs:
-            ss = self.hidden_subset_row(y, n)
+            ss = self.perform_on_dirty_units([y], self.hidden_subset_row, y, n)
             if ss:
                 return ss
         for x in all_locs:
-            ss = self.hidden_subset_row(x, n)
+            ss = self.perform_on_dirty_units([9 + x], self.hidden_subset_col, x, n)
             if ss:
                 return ss
         for block_num in all_locs:
-            ss = self.hidden_subset_block(block_num, n)
+            ss = self.perform_on_dirty_units([18 + block_num], self.hidden_subset_block, block_num, n)
             if ss:
                 return ss
         return None
@@ -1033,6 +1402,32 @@ class SudokuPuzzle:
     # endregion
 
     # region Fish
+    def get_fish_line_masks(self, first_unit_num, n):
+        """
+        :param first_unit_num: 0 for the rows or 9 for the cols
+        :param n: The number of rows/cols of the fish
+        :return: A list where [val] contains a 9-bit mask of the rows/cols where val is remaining with at most n locs
+        left, so they can be part of a fish of size n for val
+        """
+        line_masks = [0 for _ in range(0, 10)]
+        for loc in all_locs:
+            unit_num = first_unit_num + loc
+            num_locs_left = self.num_locs_left[unit_num]
+            for val in self.get_remaining_in_unit(unit_num):
+                if num_locs_left[val] <= n:
+                    line_masks[val] |= loc_to_bit[loc]
+        return line_masks
+
+    def get_fish_line_combinations(self, first_unit_num, n):
+        """
+        :param first_unit_num: 0 for the rows or 9 for the cols
+        :param n: The number of rows/cols of the fish
+        :return: A sorted list of the combinations of n rows/cols which can contain a fish for some val
+        """
+        line_masks = self.get_fish_line_masks(first_unit_num, n)
+        return sorted({locs for line_mask in line_masks if bit_count[line_mask] >= n
+                       for locs in itertools.combinations(bit_to_locs[line_mask], n)})
+
     def basic_fish_in_rows(self, y1, y2):
         """
         :param y1: The 1st row number. Precondition: 0 <= y1 < 9
@@ -1043,15 +1438,18 @@ class SudokuPuzzle:
         """
         updated_cells = set()
         candidates = self.remaining_in_y[y1].intersection(self.remaining_in_y[y2])
-        y1_locs_left = self.locs_left_by_y[y1]
-        y2_locs_left = self.locs_left_by_y[y2]
+        y1_locs_left_masks = self.locs_left_masks[y1]
+        y2_locs_left_masks = self.locs_left_masks[y2]
+        rows_bitboard = unit_bitboards[y1] | unit_bitboards[y2]
         for candidate in candidates:
-            possible_locs = y1_locs_left[candidate]
-            if possible_locs == y2_locs_left[candidate] and len(possible_locs) == 2:
+            possible_locs_mask = y1_locs_left_masks[candidate]
+            if possible_locs_mask == y2_locs_left_masks[candidate] and bit_count[possible_locs_mask] == 2:
+                possible_locs = set(bit_to_locs[possible_locs_mask])
+                eliminations = self.val_bitboards[candidate] & ~rows_bitboard
                 for x in possible_locs:
-                    # Make sure there is a candidate worth eliminating
-                    if len(self.locs_left_by_x[x][candidate]) > 2:
-                        updated_cells = self.eliminate_possibilities_from_col(x, {candidate}, {y1, y2})
+                    for cell_id in bitboard_to_cell_ids(eliminations & unit_bitboards[9 + x]):
+                        if self.remove_possibility_from_puzzle_by_cell_id(cell_id, candidate):
+                            updated_cells.add((name_by_cell_id[cell_id], candidate))
                 if updated_cells:
                     description = "Basic Fish in Rows: In rows " + str({y1, y2}) + ", candidate " \
                                   + str(candidate) + " can only be placed in cols " + str(possible_locs) \
@@ -1069,15 +1467,18 @@ class SudokuPuzzle:
         """
         updated_cells = set()
         candidates = self.remaining_in_x[x1].intersection(self.remaining_in_x[x2])
-        x1_locs_left = self.locs_left_by_x[x1]
-        x2_locs_left = self.locs_left_by_x[x2]
+        x1_locs_left_masks = self.locs_left_masks[9 + x1]
+        x2_locs_left_masks = self.locs_left_masks[9 + x2]
+        cols_bitboard = unit_bitboards[9 + x1] | unit_bitboards[9 + x2]
         for candidate in candidates:
-            possible_locs = x1_locs_left[candidate]
-            if possible_locs == x2_locs_left[candidate] and len(possible_locs) == 2:
+            possible_locs_mask = x1_locs_left_masks[candidate]
+            if possible_locs_mask == x2_locs_left_masks[candidate] and bit_count[possible_locs_mask] == 2:
+                possible_locs = set(bit_to_locs[possible_locs_mask])
+                eliminations = self.val_bitboards[candidate] & ~cols_bitboard
                 for y in possible_locs:
-                    # Make sure there is a candidate worth eliminating
-                    if len(self.locs_left_by_y[y][candidate]) > 2:
-                        updated_cells.update(self.eliminate_possibilities_from_row(y, {candidate}, {x1, x2}))
+                    for cell_id in bitboard_to_cell_ids(eliminations & unit_bitboards[y]):
+                        if self.remove_possibility_from_puzzle_by_cell_id(cell_id, candidate):
+                            updated_cells.add((name_by_cell_id[cell_id], candidate))
                 if updated_cells:
                     description = "Basic Fish in Cols: In cols " + str({x1, x2}) + ", candidate " \
                                   + str(candidate) + " can only be placed in rows " + str(possible_locs) \
@@ -1091,16 +1492,48 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        for (y1, y2) in itertools.combinations(all_locs, 2):
-            ss = self.basic_fish_in_rows(y1, y2)
+        for (y1, y2) in self.get_fish_line_combinations(0, 2):
+            ss = self.perform_on_dirty_units([y1, y2], self.basic_fish_in_rows, y1, y2)
             if ss:
                 return ss
-        for (x1, x2) in itertools.combinations(all_locs, 2):
-            ss = self.basic_fish_in_cols(x1, x2)
+        for (x1, x2) in self.get_fish_line_combinations(9, 2):
+            ss = self.perform_on_dirty_units([9 + x1, 9 + x2], self.basic_fish_in_cols, x1, x2)
             if ss:
                 return ss
         return None
 
+    def fish_in_lines(self, first_unit_num, locs):
+        """
+        :param first_unit_num: 0 to find a fish in the rows locs or 9 to find a fish in the cols locs
+        :param locs: The row/col numbers. Precondition: 0 <= loc < 9 for loc in locs
+        Finds a fish in the rows/cols and eliminates the candidate from the other cells of the cols/rows covering it
+        :return: A (candidate, cover locs, updated_cells) tuple for the first fish removing possibilities, or None
+        """
+        n = len(locs)
+        cover_unit_num = 9 - first_unit_num
+        lines_bitboard = 0
+        for loc in locs:
+            lines_bitboard |= unit_bitboards[first_unit_num + loc]
+        for candidate in all_possibilities:
+            possible_locs_mask = 0
+            for loc in locs:
+                unit_num = first_unit_num + loc
+                if candidate not in self.get_remaining_in_unit(unit_num) or self.num_locs_left[unit_num][candidate] > n:
+                    break
+                possible_locs_mask |= self.locs_left_masks[unit_num][candidate]
+            else:
+                if bit_count[possible_locs_mask] == n:
+                    updated_cells = set()
+                    possible_locs = set(bit_to_locs[possible_locs_mask])
+                    eliminations = self.val_bitboards[candidate] & ~lines_bitboard
+                    for cover_loc in possible_locs:
+                        for cell_id in bitboard_to_cell_ids(eliminations & unit_bitboards[cover_unit_num + cover_loc]):
+                            if self.remove_possibility_from_puzzle_by_cell_id(cell_id, candidate):
+                                updated_cells.add((name_by_cell_id[cell_id], candidate))
+                    if updated_cells:
+                        return candidate, possible_locs, updated_cells
+        return None
+
     def fish_in_rows(self, ys):
         """
         :param ys: The row numbers. Precondition: 0 <= y < 9 for y in ys
@@ -1111,29 +1544,15 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        updated_cells = set()
         n = len(ys)
-        candidates = copy.deepcopy(all_possibilities)
-        for y in ys:
-            candidates.intersection_update(self.remaining_in_y[y])
-        for candidate in candidates:
-            possible_locs = set()
-            for y in ys:
-                possible_locs.update(self.locs_left_by_y[y][candidate])
-                if len(possible_locs) > n:
-                    break
-            if len(possible_locs) == n:
-                for x in possible_locs:
-                    for y_to_remove in self.locs_left_by_x[x][candidate].difference(ys):
-                        cell_name = self.board[y_to_remove][x]
-                        if self.remove_possibility_from_puzzle_by_cell_name(cell_name, candidate):
-                            updated_cells.add((cell_name, candidate))
-                if updated_cells:
-                    description = "Fish " + str(n) + " in Rows: In rows " + str(ys) + ", candidate " \
-                                  + str(candidate) + " can only be placed in cols " + str(possible_locs) \
-                                  + ".\nEliminating the candidates from other cells in those cols."
-                    return SudokuStep(None, updated_cells, description)
-        return None
+        fish = self.fish_in_lines(0, ys)
+        if fish is None:
+            return None
+        (candidate, possible_locs, updated_cells) = fish
+        description = "Fish " + str(n) + " in Rows: In rows " + str(ys) + ", candidate " \
+                      + str(candidate) + " can only be placed in cols " + str(possible_locs) \
+                      + ".\nEliminating the candidates from other cells in those cols."
+        return SudokuStep(None, updated_cells, description)
 
     def fish_in_cols(self, xs):
         """
@@ -1145,29 +1564,15 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        updated_cells = set()
         n = len(xs)
-        candidates = copy.deepcopy(all_possibilities)
-        for x in xs:
-            candidates.intersection_update(self.remaining_in_x[x])
-        for candidate in candidates:
-            possible_locs = set()
-            for x in xs:
-                possible_locs.update(self.locs_left_by_x[x][candidate])
-                if len(possible_locs) > n:
-                    break
-            if len(possible_locs) == n:
-                for y in possible_locs:
-                    for x_to_remove in self.locs_left_by_y[y][candidate].difference(xs):
-                        cell_name = self.board[y][x_to_remove]
-                        if self.remove_possibility_from_puzzle_by_cell_name(cell_name, candidate):
-                            updated_cells.add((cell_name, candidate))
-                if updated_cells:
-                    description = "Fish " + str(n) + " in Cols: In cols " + str(xs) + ", candidate " \
-                                  + str(candidate) + " can only be placed in rows " + str(possible_locs) \
-                                  + ".\nEliminating the candidates from other cells in those rows."
-                    return SudokuStep(None, updated_cells, description)
-        return updated_cells
+        fish = self.fish_in_lines(9, xs)
+        if fish is None:
+            return set()
+        (candidate, possible_locs, updated_cells) = fish
+        description = "Fish " + str(n) + " in Cols: In cols " + str(xs) + ", candidate " \
+                      + str(candidate) + " can only be placed in rows " + str(possible_locs) \
+                      + ".\nEliminating the candidates from other cells in those rows."
+        return SudokuStep(None, updated_cells, description)
 
     def perform_fish(self, n):
         """
@@ -1176,18 +1581,56 @@ class SudokuPuzzle:
         :return A SudokuStep corresponding to the guess where:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
-        for ys in itertools.combinations(all_locs, n):
-            ss = self.fish_in_rows(set(ys))
+        for ys in self.get_fish_line_combinations(0, n):
+            ss = self.perform_on_dirty_units(ys, self.fish_in_rows, set(ys))
             if ss:
                 return ss
-        for xs in itertools.combinations(all_locs, n):
-            ss = self.fish_in_cols(xs)
+        for xs in self.get_fish_line_combinations(9, n):
+            ss = self.perform_on_dirty_units([9 + x for x in xs], self.fish_in_cols, xs)
             if ss:
                 return ss
         return None
 
     # endregion
 
+    # region Strong Links
+    def get_strong_links(self, val):
+        """
+        :param val: The candidate. Precondition: 1 <= val <= 9
+        :return: A list of (unit_num, link bitboard) tuples, in order of unit number, for the units where val has
+        exactly two cells left. One of the two cells of each link must be val
+        """
+        entry = self.strong_link_graphs[val]
+        if entry is None or entry[0] != self.version:
+            val_bitboard = self.val_bitboards[val]
+            strong_links = []
+            units_mask = self.strong_link_units[val]
+            while units_mask:
+                unit_num = (units_mask & -units_mask).bit_length() - 1
+                units_mask &= units_mask - 1
+                strong_links.append((unit_num, val_bitboard & unit_bitboards[unit_num]))
+            entry = [self.version, strong_links, None]
+            self.strong_link_graphs[val] = entry
+        return entry[1]
+
+    def get_strong_link_graph(self, val):
+        """
+        :param val: The candidate. Precondition: 1 <= val <= 9
+        :return: A dictionary from the id of each cell in a strong link of val to a bitboard of the cells it is
+        strongly linked to. It is built from get_strong_links the first time it is asked for after a change
+        """
+        strong_links = self.get_strong_links(val)
+        entry = self.strong_link_graphs[val]
+        if entry[2] is None:
+            graph = {}
+            for (unit_num, link) in strong_links:
+                for cell_id in bitboard_to_cell_ids(link):
+                    graph[cell_id] = graph.get(cell_id, 0) | (link & ~cell_bits[cell_id])
+            entry[2] = graph
+        return entry[2]
+
+    # endregion
+
     # region Skyscraper
     def skyscraper_in_rows(self, val):
         """
@@ -1197,21 +1640,22 @@ class SudokuPuzzle:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
         updated_cells = set()
-        candidate_loc_dict = self.loc_dict_with_len_constraint_for_val(self.locs_left_by_x, val, lambda l: l == 2)
-        for (x1, x2) in itertools.combinations(candidate_loc_dict.keys(), 2):
-            locs_1 = candidate_loc_dict[x1]
-            locs_2 = candidate_loc_dict[x2]
-            locs_in_both = locs_1.intersection(locs_2)
-            if len(locs_in_both) == 1:
-                loc_in_both = next(iter(locs_in_both))
-                y1 = next(iter(locs_1.difference(locs_in_both)))
-                y2 = next(iter(locs_2.difference(locs_in_both)))
+        xs = [unit_num - 9 for (unit_num, link) in self.get_strong_links(val) if 9 <= unit_num < 18]
+        for (x1, x2) in itertools.combinations(xs, 2):
+            locs_mask_1 = self.locs_left_masks[9 + x1][val]
+            locs_mask_2 = self.locs_left_masks[9 + x2][val]
+            locs_in_both_mask = locs_mask_1 & locs_mask_2
+            if bit_count[locs_in_both_mask] == 1:
+                loc_in_both = bit_to_locs[locs_in_both_mask][0]
+                y1 = bit_to_locs[locs_mask_1 & ~locs_in_both_mask][0]
+                y2 = bit_to_locs[locs_mask_2 & ~locs_in_both_mask][0]
                 cell_name_1 = self.board[y1][x1]
                 cell_name_2 = self.board[y2][x2]
-                cells_seen_by_both = self.get_cell_names_seen_by_both_cells(cell_name_1, cell_name_2)
-                for cell_name in cells_seen_by_both:
-                    if self.remove_possibility_from_puzzle_by_cell_name(cell_name, val):
-                        updated_cells.add((cell_name, val))
+                eliminations = self.val_bitboards[val] & peer_bitboards[SudokuHelper.loc_to_cell_id(y1, x1)] & \
+                    peer_bitboards[SudokuHelper.loc_to_cell_id(y2, x2)]
+                for cell_id in bitboard_to_cell_ids(eliminations):
+                    if self.remove_possibility_from_puzzle_by_cell_id(cell_id, val):
+                        updated_cells.add((name_by_cell_id[cell_id], val))
                 if updated_cells:
                     base_cell_name_1 = self.board[loc_in_both][x1]
                     base_cell_name_2 = self.board[loc_in_both][x2]
@@ -1233,21 +1677,22 @@ class SudokuPuzzle:
                 * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
         """
         updated_cells = set()
-        candidate_loc_dict = self.loc_dict_with_len_constraint_for_val(self.locs_left_by_y, val, lambda l: l == 2)
-        for (y1, y2) in itertools.combinations(candidate_loc_dict.keys(), 2):
-            locs_1 = candidate_loc_dict[y1]
-            locs_2 = candidate_loc_dict[y2]
-            locs_in_both = locs_1.intersection(locs_2)
-            if len(locs_in_both) == 1:
-                loc_in_both = next(iter(locs_in_both))
-                x1 = next(iter(locs_1.difference(locs_in_both)))
-                x2 = next(iter(locs_2.difference(locs_in_both)))
+        ys = [unit_num for (unit_num, link) in self.get_strong_links(val) if unit_num < 9]
+        for (y1, y2) in itertools.combinations(ys, 2):
+            locs_mask_1 = self.locs_left_masks[y1][val]
+            locs_mask_2 = self.locs_left_masks[y2][val]
+            locs_in_both_mask = locs_mask_1 & locs_mask_2
+            if bit_count[locs_in_both_mask] == 1:
+                loc_in_both = bit_to_locs[locs_in_both_mask][0]
+                x1 = bit_to_locs[locs_mask_1 & ~locs_in_both_mask][0]
+                x2 = bit_to_locs[locs_mask_2 & ~locs_in_both_mask][0]
                 cell_name_1 = self.board[y1][x1]
                 cell_name_2 = self.board[y2][x2]
-                cells_seen_by_both = self.get_cell_names_seen_by_both_cells(cell_name_1, cell_name_2)
-                for cell_name in cells_seen_by_both:
-                    if self.remove_possibility_from_puzzle_by_cell_name(cell_name, val):
-                        updated_cells.add((cell_name, val))
+                eliminations = self.val_bitboards[val] & peer_bitboards[SudokuHelper.loc_to_cell_id(y1, x1)] & \
+                    peer_bitboards[SudokuHelper.loc_to_cell_id(y2, x2)]
+                for cell_id in bitboard_to_cell_ids(eliminations):
+                    if self.remove_possibility_from_puzzle_by_cell_id(cell_id, val):
+                        updated_cells.add((name_by_cell_id[cell_id], val))
                 if updated_cells:
                     base_cell_name_1 = self.board[y1][loc_in_both]
                     base_cell_name_2 = self.board[y2][loc_in_both]
@@ -1263,51 +1708,24 @@ class SudokuPuzzle:
 
     def perform_skyscraper(self):
         for candidate in all_possibilities:
-            ss = self.skyscraper_in_rows(candidate)
+            ss = self.perform_on_dirty_units(col_unit_nums, self.skyscraper_in_rows, candidate)
             if ss:
                 return ss
         for candidate in all_possibilities:
-            ss = self.skyscraper_in_cols(candidate)
+            ss = self.perform_on_dirty_units(row_unit_nums, self.skyscraper_in_cols, candidate)
             if ss:
                 return ss
 
     # endregion
 
-    @staticmethod
-    def loc_dict_with_len_constraint_for_val(locs_left_by, val, len_lambda):
-        """
-        :param locs_left_by: locs_left_by[offset][val] should contain a set with all occurrences of val in the
-        Row/Col/Block
-        :param val: The candidate to find in locs_left_by. Precondition: 1 <= val <= 9
-        :param len_lambda: The lambda function to execute of the length of each possibility.
-        Should be a function that takes in a length and returns true/false
-        :return: A dictionary with:
-        Key: Offset within a row/col/block.
-        Value: A set containing all possible locs for that val
-        where the length of the set satisfies the supplied lambda
-        """
-        return {o: locs_left_by[o][val] for o in all_locs if len_lambda(len(locs_left_by[o][val]))}
-
     def get_cell_names_seen_by_both_cells(self, cell_name_1, cell_name_2):
         """
         :param cell_name_1: The name of the 1st cell
         :param cell_name_2: The name of the 2nd cell
         :return: The names of all cells that can be seen by both cells
         """
-        cell_1 = self.cells_dict[cell_name_1]
-        seen_by_1 = set()
-        seen_by_1.update(self.y_cell_list[cell_1.y])
-        seen_by_1.update(self.x_cell_list[cell_1.x])
-        seen_by_1.update(self.block_cell_list[cell_1.block])
-        cell_2 = self.cells_dict[cell_name_2]
-        seen_by_2 = set()
-        seen_by_2.update(self.y_cell_list[cell_2.y])
-        seen_by_2.update(self.x_cell_list[cell_2.x])
-        seen_by_2.update(self.block_cell_list[cell_2.block])
-        # Get the cells in the intersection of the cells seen by each
-        cells_seen_by_both = seen_by_1.intersection(seen_by_2)
-        cells_seen_by_both.difference_update({cell_name_1, cell_name_2})
-        return cells_seen_by_both
+        cell_ids_seen_by_both = common_peers_by_cell_ids[cell_id_by_name[cell_name_1]][cell_id_by_name[cell_name_2]]
+        return {name_by_cell_id[cell_id] for cell_id in cell_ids_seen_by_both}
 
     # region Kite
     def kite(self, val):
@@ -1317,38 +1735,37 @@ class SudokuPuzzle:
         :return A set of (cell name, removed possibility) tuples for the cells with possibilities removed
         """
         updated_cells = set()
-        candidate_loc_dict_y = self.loc_dict_with_len_constraint_for_val(self.locs_left_by_y, val, lambda l: l == 2)
-        candidate_loc_dict_x = self.loc_dict_with_len_constraint_for_val(self.locs_left_by_x, val, lambda l: l == 2)
-
-        y_block_num_cell_dict = defaultdict(set)
-        x_block_num_cell_dict = defaultdict(set)
-        for y, locs in candidate_loc_dict_y.items():
-            for x in locs:
-                cell = self.cells_dict[self.board[y][x]]
-                y_block_num_cell_dict[cell.block].add(cell)
-        for x, locs in candidate_loc_dict_x.items():
-            for y in locs:
-                cell = self.cells_dict[self.board[y][x]]
-                x_block_num_cell_dict[cell.block].add(cell)
-
-        # If any of the cells from the y_loc_dict are in the same block num as one from the x_loc_dict
-        shared_block_nums = set(y_block_num_cell_dict.keys()).intersection(set(x_block_num_cell_dict.keys()))
-        for block_num in shared_block_nums:
-            y_cells = y_block_num_cell_dict[block_num]
-            x_cells = x_block_num_cell_dict[block_num]
-            for y_cell in y_cells:
-                x = next(iter(candidate_loc_dict_y[y_cell.y].difference({y_cell.x})))
-                for x_cell in x_cells:
-                    if y_cell.y != x_cell.y and y_cell.x != x_cell.x:
-                        y = next(iter(candidate_loc_dict_x[x_cell.x].difference({x_cell.y})))
-                        cell_name = self.board[y][x]
-                        if self.remove_possibility_from_puzzle_by_cell_name(cell_name, val):
-                            updated_cells.add((cell_name, val))
-                            horizontal_kite = {self.board[y_cell.y][x], y_cell.name}
-                            vertical_kite = {self.board[y][x_cell.x], x_cell.name}
+        # The cells of the strong links of the candidate in the rows and in the cols
+        row_cells_bitboard = 0
+        col_cells_bitboard = 0
+        for (unit_num, link) in self.get_strong_links(val):
+            if unit_num < 9:
+                row_cells_bitboard |= link
+            elif unit_num < 18:
+                col_cells_bitboard |= link
+
+        # If any of the cells from the rows are in the same block num as one from the cols
+        for block_num in all_locs:
+            block_bitboard = unit_bitboards[18 + block_num]
+            if not (row_cells_bitboard & block_bitboard and col_cells_bitboard & block_bitboard):
+                continue
+            y_cell_ids_in_block = set(bitboard_to_cell_ids(row_cells_bitboard & block_bitboard))
+            x_cell_ids_in_block = set(bitboard_to_cell_ids(col_cells_bitboard & block_bitboard))
+            for y_cell_id in y_cell_ids_in_block:
+                (y_cell_y, y_cell_x) = (y_by_cell_id[y_cell_id], x_by_cell_id[y_cell_id])
+                x = bit_to_locs[self.locs_left_masks[y_cell_y][val] & ~loc_to_bit[y_cell_x]][0]
+                for x_cell_id in x_cell_ids_in_block:
+                    (x_cell_y, x_cell_x) = (y_by_cell_id[x_cell_id], x_by_cell_id[x_cell_id])
+                    if y_cell_y != x_cell_y and y_cell_x != x_cell_x:
+                        y = bit_to_locs[self.locs_left_masks[9 + x_cell_x][val] & ~loc_to_bit[x_cell_y]][0]
+                        cell_id = SudokuHelper.loc_to_cell_id(y, x)
+                        if self.remove_possibility_from_puzzle_by_cell_id(cell_id, val):
+                            updated_cells.add((name_by_cell_id[cell_id], val))
+                            horizontal_kite = {self.board[y_cell_y][x], name_by_cell_id[y_cell_id]}
+                            vertical_kite = {self.board[y][x_cell_x], name_by_cell_id[x_cell_id]}
                             description = "Kite: Candidate " + str(val) + " has two strings: " \
-                                          + "\nRow " + str(y_cell.y) + ": " + str(horizontal_kite) \
-                                          + "\nCol " + str(x_cell.x) + ": " + str(vertical_kite) \
+                                          + "\nRow " + str(y_cell_y) + ": " + str(horizontal_kite) \
+                                          + "\nCol " + str(x_cell_x) + ": " + str(vertical_kite) \
                                           + "\nThe bases of these strings share block " + str(block_num) \
                                           + ". Thus, we can eliminate the candidate from cells that see the other " \
                                             "two ends of the string."
@@ -1357,12 +1774,360 @@ class SudokuPuzzle:
 
     def perform_kite(self):
         for candidate in all_possibilities:
-            ss = self.kite(candidate)
+            ss = self.perform_on_dirty_units(line_unit_nums, self.kite, candidate)
             if ss:
                 return ss
 
     # endregion
 
+    # region Wings
+    def get_bivalue_cells(self):
+        """
+        :return: A (bitboard, masks) tuple where:
+                * bitboard contains the empty cells with exactly two possibilities left
+                * masks is a dictionary from the id of each of those cells to the mask of its possibilities
+        """
+        bitboard = 0
+        masks = {}
+        for cell_id in all_cell_ids:
+            if self.cell_vals[cell_id] is None and self.count_cell_possibilities(cell_id) == 2:
+                bitboard |= cell_bits[cell_id]
+                masks[cell_id] = self.get_cell_possibility_mask(cell_id)
+        return bitboard, masks
+
+    def eliminate_val_from_bitboard(self, val, bitboard):
+        """
+        :param val: The value to eliminate. Precondition: 1 <= val <= 9
+        :param bitboard: The bitboard of the cells to eliminate val from
+        :return: A set of (cell name, val) tuples for the cells with val removed
+        """
+        updated_cells = set()
+        for cell_id in bitboard_to_cell_ids(self.val_bitboards[val] & bitboard):
+            if self.remove_possibility_from_puzzle_by_cell_id(cell_id, val):
+                updated_cells.add((name_by_cell_id[cell_id], val))
+        return updated_cells
+
+    def xy_wing(self):
+        """
+        Finds an XY-Wing and eliminates possibilities accordingly.
+        An XY-Wing is a 'Pivot' cell with possibilities {x, y} which sees two 'Pincer' cells with possibilities {x, z}
+        and {y, z}. Whichever val is placed in the pivot, one of the pincers is z.
+        Thus, z can be eliminated from all cells seen by both pincers.
+        :return A SudokuStep corresponding to the guess where:
+                * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
+        """
+        (bivalue_bitboard, masks) = self.get_bivalue_cells()
+        for pivot_id in bitboard_to_cell_ids(bivalue_bitboard):
+            pivot_mask = masks[pivot_id]
+            pincer_ids = [cell_id for cell_id in bitboard_to_cell_ids(bivalue_bitboard & peer_bitboards[pivot_id])
+                          if bit_count[masks[cell_id] & pivot_mask] == 1]
+            for (pincer_id_1, pincer_id_2) in itertools.combinations(pincer_ids, 2):
+                z_mask = masks[pincer_id_1] & masks[pincer_id_2]
+                if bit_count[z_mask] == 1 and not z_mask & pivot_mask:
+                    z = bit_to_vals[z_mask][0]
+                    updated_cells = self.eliminate_val_from_bitboard(
+                        z, peer_bitboards[pincer_id_1] & peer_bitboards[pincer_id_2])
+                    if updated_cells:
+                        description = "XY-Wing: The 'Pivot' cell " + name_by_cell_id[pivot_id] + " with candidates " \
+                                      + str(mask_to_vals(pivot_mask)) + " sees the 'Pincer' cells " \
+                                      + str({name_by_cell_id[pincer_id_1], name_by_cell_id[pincer_id_2]}) \
+                                      + ".\nOne of the pincers must be " + str(z) \
+                                      + ". Thus, we can eliminate the candidate from all cells seen by both pincers."
+                        return SudokuStep(None, updated_cells, description)
+        return None
+
+    def xyz_wing(self):
+        """
+        Finds an XYZ-Wing and eliminates possibilities accordingly.
+        An XYZ-Wing is a 'Pivot' cell with possibilities {x, y, z} which sees two 'Pincer' cells with possibilities
+        {x, z} and {y, z}. One of the three cells is z.
+        Thus, z can be eliminated from all cells seen by the pivot and both pincers.
+        :return A SudokuStep corresponding to the guess where:
+                * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
+        """
+        (bivalue_bitboard, masks) = self.get_bivalue_cells()
+        for pivot_id in all_cell_ids:
+            if self.cell_vals[pivot_id] is not None or self.count_cell_possibilities(pivot_id) != 3:
+                continue
+            pivot_mask = self.get_cell_possibility_mask(pivot_id)
+            pincer_ids = [cell_id for cell_id in bitboard_to_cell_ids(bivalue_bitboard & peer_bitboards[pivot_id])
+                          if not masks[cell_id] & ~pivot_mask]
+            for (pincer_id_1, pincer_id_2) in itertools.combinations(pincer_ids, 2):
+                if masks[pincer_id_1] != masks[pincer_id_2]:
+                    z = bit_to_vals[masks[pincer_id_1] & masks[pincer_id_2]][0]
+                    updated_cells = self.eliminate_val_from_bitboard(
+                        z, peer_bitboards[pivot_id] & peer_bitboards[pincer_id_1] & peer_bitboards[pincer_id_2])
+                    if updated_cells:
+                        description = "XYZ-Wing: The 'Pivot' cell " + name_by_cell_id[pivot_id] \
+                                      + " with candidates " + str(mask_to_vals(pivot_mask)) + " sees the 'Pincer' " \
+                                      + "cells " + str({name_by_cell_id[pincer_id_1], name_by_cell_id[pincer_id_2]}) \
+                                      + ".\nOne of the three cells must be " + str(z) \
+                                      + ". Thus, we can eliminate the candidate from all cells seen by all three cells."
+                        return SudokuStep(None, updated_cells, description)
+        return None
+
+    def w_wing(self):
+        """
+        Finds a W-Wing and eliminates possibilities accordingly.
+        A W-Wing is two cells with the same possibilities {x, y} which don't see each other, connected by a strong link
+        on x: a unit where x only has two cells left, one seen by each of the two cells. One of the two cells is y.
+        Thus, y can be eliminated from all cells seen by both cells.
+        :return A SudokuStep corresponding to the guess where:
+                * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
+        """
+        (bivalue_bitboard, masks) = self.get_bivalue_cells()
+        for (cell_id_1, cell_id_2) in itertools.combinations(bitboard_to_cell_ids(bivalue_bitboard), 2):
+            mask = masks[cell_id_1]
+            if mask != masks[cell_id_2] or peer_bitboards[cell_id_1] & cell_bits[cell_id_2]:
+                continue
+            (peers_1, peers_2) = (peer_bitboards[cell_id_1], peer_bitboards[cell_id_2])
+            for x in bit_to_vals[mask]:
+                for (unit_num, link) in self.get_strong_links(x):
+                    (end_1, end_2) = (link & peers_1, link & peers_2)
+                    # Each cell sees a different end of the link
+                    if end_1 and end_2 and end_1 | end_2 == link:
+                        y = bit_to_vals[mask & ~val_to_bit[x]][0]
+                        updated_cells = self.eliminate_val_from_bitboard(y, peers_1 & peers_2)
+                        if updated_cells:
+                            link_cell_names = {name_by_cell_id[cell_id] for cell_id in bitboard_to_cell_ids(link)}
+                            description = "W-Wing: The cells " \
+                                          + str({name_by_cell_id[cell_id_1], name_by_cell_id[cell_id_2]}) \
+                                          + " both have candidates " + str(mask_to_vals(mask)) \
+                                          + " and are connected by a strong link on " + str(x) + ": " \
+                                          + str(link_cell_names) \
+                                          + ".\nOne of the cells must be " + str(y) \
+                                          + ". Thus, we can eliminate the candidate from all cells seen by both cells."
+                            return SudokuStep(None, updated_cells, description)
+        return None
+
+    def perform_xy_wing(self):
+        return self.perform_on_dirty_units(all_unit_nums, self.xy_wing)
+
+    def perform_xyz_wing(self):
+        return self.perform_on_dirty_units(all_unit_nums, self.xyz_wing)
+
+    def perform_w_wing(self):
+        return self.perform_on_dirty_units(all_unit_nums, self.w_wing)
+
+    # endregion
+
+    # region Coloring
+    def get_strong_link_colors(self, val, start_id):
+        """
+        Colors the cells of the strong link graph of val connected to start_id with two colors, alternating along
+        every strong link. One of the two colors is val in all of its cells.
+        :param val: The candidate. Precondition: 1 <= val <= 9
+        :param start_id: The id of a cell of the strong link graph of val
+        :return: A list of the two bitboards of the cells of each color. start_id has the first color
+        """
+        graph = self.get_strong_link_graph(val)
+        colors = [cell_bits[start_id], 0]
+        queue = [(start_id, 0)]
+        while queue:
+            (cell_id, color) = queue.pop()
+            for other_id in bitboard_to_cell_ids(graph[cell_id] & ~(colors[0] | colors[1])):
+                colors[1 - color] |= cell_bits[other_id]
+                queue.append((other_id, 1 - color))
+        return colors
+
+    def simple_coloring(self, val):
+        """
+        Finds a Color Wrap or a Color Trap of the candidate and eliminates possibilities accordingly.
+        The cells connected by strong links of the candidate are colored with two alternating colors. See
+        get_strong_link_colors. Either every cell of the first color is the candidate, or every cell of the second.
+            * Color Wrap: Two cells of the same color see each other, so that color can't be the candidate.
+            Thus, the candidate can be eliminated from all cells of that color.
+            * Color Trap: A cell which isn't colored sees cells of both colors.
+            Thus, the candidate can be eliminated from that cell.
+        :param val: The candidate. Precondition: 1 <= val <= 9
+        :return A SudokuStep corresponding to the guess where:
+                * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
+        """
+        colored_cells = 0
+        for start_id in sorted(self.get_strong_link_graph(val)):
+            if colored_cells & cell_bits[start_id]:
+                continue
+            colors = self.get_strong_link_colors(val, start_id)
+            component = colors[0] | colors[1]
+            colored_cells |= component
+            # seen_cells[color] contains the cells seen by a cell of the color
+            seen_cells = [0, 0]
+            for color in [0, 1]:
+                for cell_id in bitboard_to_cell_ids(colors[color]):
+                    seen_cells[color] |= peer_bitboards[cell_id]
+            color_names = [{name_by_cell_id[cell_id] for cell_id in bitboard_to_cell_ids(colors[color])}
+                           for color in [0, 1]]
+            for color in [0, 1]:
+                if seen_cells[color] & colors[color]:
+                    updated_cells = self.eliminate_val_from_bitboard(val, colors[color])
+                    if updated_cells:
+                        description = "Simple Coloring (Color Wrap): The strong links of candidate " + str(val) \
+                                      + " color the cells " + str(color_names[color]) + " and " \
+                                      + str(color_names[1 - color]) + ".\nTwo cells of the first color see each " \
+                                      + "other, so the second color must be the candidate." \
+                                      + "\nThus, we can eliminate the candidate from all cells of the first color."
+                        return SudokuStep(None, updated_cells, description)
+            updated_cells = self.eliminate_val_from_bitboard(val, seen_cells[0] & seen_cells[1] & ~component)
+            if updated_cells:
+                description = "Simple Coloring (Color Trap): The strong links of candidate " + str(val) \
+                              + " color the cells " + str(color_names[0]) + " and " + str(color_names[1]) \
+                              + ".\nOne of the two colors must be the candidate." \
+                              + "\nThus, we can eliminate the candidate from all cells which see both colors."
+                return SudokuStep(None, updated_cells, description)
+        return None
+
+    def perform_simple_coloring(self):
+        """
+        Finds a Color Wrap or a Color Trap of some candidate and eliminates possibilities accordingly
+        :return A SudokuStep corresponding to the guess where:
+                * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
+        """
+        for candidate in all_possibilities:
+            ss = self.perform_on_dirty_units(all_unit_nums, self.simple_coloring, candidate)
+            if ss:
+                return ss
+        return None
+
+    # endregion
+
+    # region X-Chain
+    def x_chain(self, val, max_strong_links=6):
+        """
+        Finds an X-Chain of the candidate and eliminates possibilities accordingly.
+        An X-Chain is a chain of cells of the candidate which alternates strong links and weak links (cells which see
+        each other), starting and ending with a strong link. If the first cell isn't the candidate, the second one is,
+        so the third one isn't, and so on until the last cell, which is the candidate. One of the two ends of the
+        chain is the candidate.
+        Thus, the candidate can be eliminated from all cells seen by both ends.
+        Skyscrapers and Kites are X-Chains with two strong links.
+        :param val: The candidate. Precondition: 1 <= val <= 9
+        :param max_strong_links: The maximum number of strong links in the chains tried
+        :return A SudokuStep corresponding to the guess where:
+                * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
+        """
+        graph = self.get_strong_link_graph(val)
+        graph_bitboard = 0
+        for cell_id in graph:
+            graph_bitboard |= cell_bits[cell_id]
+        for start_id in sorted(graph):
+            # off_parents[cell_id] contains the cell before the cell in the chain when the cell isn't the candidate.
+            # on_parents[cell_id] contains the cell before the cell in the chain when the cell is the candidate.
+            off_parents = {start_id: None}
+            on_parents = {}
+            off_ids = [start_id]
+            for num_strong_links in range(1, max_strong_links + 1):
+                on_ids = []
+                for off_id in off_ids:
+                    for on_id in bitboard_to_cell_ids(graph[off_id]):
+                        if on_id != start_id and on_id not in on_parents:
+                            on_parents[on_id] = off_id
+                            on_ids.append(on_id)
+                if num_strong_links > 1:
+                    for end_id in on_ids:
+                        updated_cells = self.eliminate_val_from_bitboard(
+                            val, peer_bitboards[start_id] & peer_bitboards[end_id])
+                        if updated_cells:
+                            chain = self.get_x_chain(end_id, on_parents, off_parents)
+                            chain_names = [name_by_cell_id[cell_id] for cell_id in chain]
+                            description = "X-Chain: Candidate " + str(val) + " alternates strong and weak links " \
+                                          + "along the chain " + " - ".join(chain_names) \
+                                          + ".\nOne of the two ends of the chain must be the candidate." \
+                                          + "\nThus, we can eliminate the candidate from all cells seen by both ends."
+                            return SudokuStep(None, updated_cells, description)
+                off_ids = []
+                for on_id in on_ids:
+                    for off_id in bitboard_to_cell_ids(graph_bitboard & peer_bitboards[on_id]):
+                        if off_id not in off_parents:
+                            off_parents[off_id] = on_id
+                            off_ids.append(off_id)
+        return None
+
+    @staticmethod
+    def get_x_chain(end_id, on_parents, off_parents):
+        """
+        :return: A list of the ids of the cells of the X-Chain ending in end_id, from its start to end_id.
+        See x_chain
+        """
+        chain = [end_id]
+        parent_id = on_parents[end_id]
+        is_on = False
+        while parent_id is not None:
+            chain.append(parent_id)
+            parent_id = on_parents[parent_id] if is_on else off_parents[parent_id]
+            is_on = not is_on
+        chain.reverse()
+        return chain
+
+    def perform_x_chain(self):
+        """
+        Finds an X-Chain of some candidate and eliminates possibilities accordingly
+        :return A SudokuStep corresponding to the guess where:
+                * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
+        """
+        for candidate in all_possibilities:
+            ss = self.perform_on_dirty_units(all_unit_nums, self.x_chain, candidate)
+            if ss:
+                return ss
+        return None
+
+    # endregion
+
+    # region Templates
+    def get_template_cells(self, val):
+        """
+        :param val: The candidate. Precondition: 1 <= val <= 9
+        :return: A bitboard of the cells of val in at least one template which only uses the locs left for val.
+        See SudokuHelper.band_templates
+        """
+        excluded_cells = all_cells_bitboard & ~self.val_bitboards[val]
+        # band_cells[band][cols mask] contains the cells of the band templates of the band with the cols
+        band_cells = []
+        for templates in band_templates:
+            cells_by_cols_mask = {}
+            for (bitboard, cols_mask) in templates:
+                if not bitboard & excluded_cells:
+                    cells_by_cols_mask[cols_mask] = cells_by_cols_mask.get(cols_mask, 0) | bitboard
+            band_cells.append(cells_by_cols_mask)
+        (cells_0, cells_1, cells_2) = band_cells
+        template_cells = 0
+        for (cols_mask_0, cols_mask_1, cols_mask_2) in template_cols_masks:
+            if cols_mask_0 in cells_0 and cols_mask_1 in cells_1 and cols_mask_2 in cells_2:
+                template_cells |= cells_0[cols_mask_0] | cells_1[cols_mask_1] | cells_2[cols_mask_2]
+        return template_cells
+
+    def templates_for_val(self, val):
+        """
+        :param val: The candidate. Precondition: 1 <= val <= 9
+        Eliminates the candidate from the cells which are not in any template of the candidate
+        :return A SudokuStep corresponding to the guess where:
+                * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
+        """
+        updated_cells = set()
+        for cell_id in bitboard_to_cell_ids(self.val_bitboards[val] & ~self.get_template_cells(val)):
+            if self.remove_possibility_from_puzzle_by_cell_id(cell_id, val):
+                updated_cells.add((name_by_cell_id[cell_id], val))
+        if updated_cells:
+            description = "Templates: Candidate " + str(val) + " can't be placed in cells " \
+                          + str({cell_name for (cell_name, _) in updated_cells}) \
+                          + " by any placement of the candidate once in every row, col and block." \
+                          + "\nEliminating the candidate from those cells."
+            return SudokuStep(None, updated_cells, description)
+        return None
+
+    def perform_templates(self):
+        """
+        Finds the candidates which are not in any template of their val and eliminates them
+        :return A SudokuStep corresponding to the guess where:
+                * updated_cells = A set of (cell name, candidate) tuples for the cells with possibilities removed
+        """
+        for candidate in all_possibilities:
+            ss = self.perform_on_dirty_units(all_unit_nums, self.templates_for_val, candidate)
+            if ss:
+                return ss
+        return None
+
+    # endregion
+
     # region Enumerate Possibilities
     def enumerate_row_possibilities(self, y):
         """
@@ -1371,7 +2136,7 @@ class SudokuPuzzle:
         """
         row_possibilities = []
         for x in all_locs:
-            row_possibilities.append(self.cells_dict[self.board[y][x]].possibilities)
+            row_possibilities.append(self.get_cell_possibilities(SudokuHelper.loc_to_cell_id(y, x)))
         return row_possibilities
 
     def enumerate_col_possibilities(self, x):
@@ -1381,7 +2146,7 @@ class SudokuPuzzle:
         """
         col_possibilities = []
         for y in all_locs:
-            col_possibilities.append(self.cells_dict[self.board[y][x]].possibilities)
+            col_possibilities.append(self.get_cell_possibilities(SudokuHelper.loc_to_cell_id(y, x)))
         return col_possibilities
 
     def enumerate_block_possibilities(self, block_num):
@@ -1390,11 +2155,8 @@ class SudokuPuzzle:
         :return: A list with all the possibilities in the block, listed in order
         """
         block_possibilities = []
-        y_block, x_block = SudokuHelper.block_num_to_block_offsets(block_num)
-        for y_offset in cell_locs:
-            for x_offset in cell_locs:
-                p = self.cells_dict[self.board[y_block + y_offset][x_block + x_offset]].possibilities
-                block_possibilities.append(p)
+        for cell_id in block_cell_ids[block_num]:
+            block_possibilities.append(self.get_cell_possibilities(cell_id))
         return block_possibilities
     # endregion
 
@@ -1454,18 +2216,18 @@ class SudokuPuzzle:
         """
         illegal_cells = set()
         # Check row condition
-        cell_names_by_candidate = {candidate: set() for candidate in all_possibilities}
-        for cell_name, cell in self.cells_dict.items():
-            if cell.val is not None:
-                cell_names_by_candidate[cell.val].add(cell_name)
+        cell_ids_by_candidate = {candidate: set() for candidate in all_possibilities}
+        for cell_id in all_cell_ids:
+            val = self.cell_vals[cell_id]
+            if val is not None:
+                cell_ids_by_candidate[val].add(cell_id)
 
         for candidate in all_possibilities:
-            for (c1, c2) in itertools.combinations(cell_names_by_candidate[candidate], 2):
-                cell_1 = self.cells_dict[c1]
-                cell_2 = self.cells_dict[c2]
-                if cell_1.y == cell_2.y or cell_1.x == cell_2.x or cell_1.block == cell_2.block:
-                    illegal_cells.add(c1)
-                    illegal_cells.add(c2)
+            for (c1, c2) in itertools.combinations(cell_ids_by_candidate[candidate], 2):
+                if y_by_cell_id[c1] == y_by_cell_id[c2] or x_by_cell_id[c1] == x_by_cell_id[c2] \
+                        or block_by_cell_id[c1] == block_by_cell_id[c2]:
+                    illegal_cells.add(name_by_cell_id[c1])
+                    illegal_cells.add(name_by_cell_id[c2])
         return illegal_cells
 
     # endregion
@@ -0,0 +1,34 @@
+__author__ = 'william'
+
+
+class SudokuResult:
+
+    def __init__(self, solved, reason, board, possibilities, num_steps, num_guesses, guess_depth):
+        # True if every cell is filled
+        self.solved = solved
+        # Why the solver stopped
+        self.reason = reason
+        # A 2D-matrix containing the values filled in when the solver stopped
+        self.board = board
+        # A 2D-matrix containing the possibilities of each cell when the solver stopped
+        self.possibilities = possibilities
+        # The number of steps logged
+        self.num_steps = num_steps
+        # The number of guesses made
+        self.num_guesses = num_guesses
+        # The number of guesses assumed when the solver stopped
+        self.guess_depth = guess_depth
+
+    def __str__(self):
+        return self.reason + " after " + str(self.num_steps) + " steps and " + str(self.num_guesses) + " guesses"
+
+    def to_json(self):
+        return {
+            'solved': self.solved,
+            'reason': self.reason,
+            'board': self.board,
+            'possibilities': [[sorted(ps) for ps in row] for row in self.possibilities],
+            'num_steps': self.num_steps,
+            'num_guesses': self.num_guesses,
+            'guess_depth': self.guess_depth
+        }
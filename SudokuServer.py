@@ -3,9 +3,12 @@ import os
 from flask import Flask, jsonify, request
 from flask.json import JSONEncoder
 from flask_restful import abort, Api
+from SudokuBudget import SudokuBudget
 from SudokuLogger import SudokuStepLog
 from SudokuPuzzle import SudokuPuzzle
+from SudokuResult import SudokuResult
 from SudokuSolver import SudokuSolver
+from SudokuTechniqueStats import SudokuTechniqueStats
 
 __author__ = 'william'
 
@@ -18,6 +21,10 @@ class MyJSONEncoder(JSONEncoder):
             return json.dumps(obj)
         if isinstance(obj, SudokuStepLog):
             return obj.to_json()
+        if isinstance(obj, SudokuResult):
+            return obj.to_json()
+        if isinstance(obj, SudokuTechniqueStats):
+            return obj.to_json()
         return super(MyJSONEncoder, self).default(obj)
 
 app = Flask(__name__, static_url_path='', static_folder='public')
@@ -26,6 +33,34 @@ app.json_encoder = MyJSONEncoder
 app.config['JSONIFY_PRETTYPRINT_REGULAR'] = False
 api = Api(app)
 
+# The number of seconds a request may spend solving unless it asks for less
+default_timeout = 10
+
+
+def get_budget(params):
+    """
+    :param params: The json body of the request, which may contain max_steps, max_guesses, max_guess_depth and timeout
+    :return: The SudokuBudget for the request. The timeout is capped at default_timeout
+    :raises ValueError: If the timeout is not a finite positive number or a limit is not a non-negative integer
+    """
+    timeout = SudokuBudget.parse_timeout(params.get('timeout'), default_timeout)
+    return SudokuBudget.from_timeout(timeout, *[SudokuBudget.parse_limit(name, params.get(name))
+                                                for name in ['max_steps', 'max_guesses', 'max_guess_depth']])
+
+
+def get_solver(params):
+    """
+    :param params: The json body of the request, which contains the board and may contain the budget (see get_budget),
+    techniques (a technique profile name or a list of states), mode ('faithful' or 'adaptive') and profile
+    :return: The SudokuSolver for the request. Its pipeline is shared with the other requests for the same techniques
+    """
+    sp = SudokuPuzzle(params['board'])
+    try:
+        return SudokuSolver(sp, budget=get_budget(params), profile=bool(params.get('profile')),
+                            techniques=params.get('techniques'), mode=params.get('mode'))
+    except ValueError as e:
+        abort(400, message=str(e))
+
 
 @app.route('/')
 @app.route('/index')
@@ -46,13 +81,12 @@ def calculate_possibilities():
 
 @app.route('/api/sudoku/solve_step', methods=['POST'])
 def solve_step():
-    board = request.json['board']
-    sp = SudokuPuzzle(board)
-    ss = SudokuSolver(sp)
+    ss = get_solver(request.json)
     ss.solve_next_step()
     log = ss.sudoku_logger.sudoku_log
     try:
-        return jsonify({'board': ss.sudoku_puzzle.get_board(), 'steps_log': log})
+        return jsonify({'board': ss.sudoku_puzzle.get_board(), 'steps_log': log, 'result': ss.get_result(),
+                        'profile': ss.get_profile()})
     except Exception as e:
         print(e)
 
@@ -63,13 +97,12 @@ def solve_puzzle():
     print(request.json['board'])
     # params = request.json.to_dict()
     # print(params)
-    board = request.json['board']
-    sp = SudokuPuzzle(board)
-    ss = SudokuSolver(sp)
-    ss.do_work()
+    ss = get_solver(request.json)
+    result = ss.do_work()
     log = ss.sudoku_logger.sudoku_log
     try:
-        return jsonify({'board': ss.sudoku_puzzle.get_board(), 'steps_log': log})
+        return jsonify({'board': ss.sudoku_puzzle.get_board(), 'steps_log': log, 'result': result,
+                        'profile': ss.get_profile()})
     except Exception as e:
         print(e)
 
@@ -1,82 +1,96 @@
-from transitions import Machine
+import time
 from SudokuError import BadGuessError
+from SudokuGuessStrategy import SudokuGuessStrategy
 from SudokuLogger import SudokuLogger
+from SudokuPipeline import get_pipeline
+from SudokuPipeline import optional_state_map
+from SudokuResult import SudokuResult
+from SudokuTechniqueStats import SudokuTechniqueStats
 
 __author__ = 'william'
 
 
-class SudokuSolver(Machine):
-
-    def __init__(self, sp):
+class SudokuSolver:
+
+    def __init__(self, sp, guess_strategy=None, budget=None, pipeline=None, profile=False, techniques=None,
+                 mode=None):
+        """
+        :param sp: The SudokuPuzzle to solve
+        :param guess_strategy: The SudokuGuessStrategy choosing the guesses. None for MRV
+        :param budget: The SudokuBudget limiting the work done. None for no limits
+        :param pipeline: The SudokuPipeline of techniques to step through. None to use techniques and mode
+        :param profile: True to record the SudokuTechniqueStats of every technique call. See get_profile
+        :param techniques: The name of a technique profile, such as 'singles+search' or 'full', or a list of optional
+        states. None for 'full'. See SudokuPipeline.get_pipeline
+        :param mode: 'faithful' to try the techniques in order or 'adaptive' to order them by hit rate. None for
+        'faithful'
+        :raises ValueError: If the technique profile or the mode is unknown
+        """
         self.sudoku_puzzle = sp
+        self.guess_strategy = guess_strategy if guess_strategy is not None else SudokuGuessStrategy()
+        self.budget = budget
+        # The reason the solver stopped before filling every cell, or None
+        self.stop_reason = None
         self.sudoku_logger = SudokuLogger()
         self.just_solved_step = False
-
-        states = ['Ready', 'Sole_Candidate', 'Unique_Candidate', 'Make_Guess', 'Done', 'Not_Complete']
-
-        # ordered_optional_states = []
-
-        ordered_optional_states = ['Naked_Pair', 'Hidden_Pair', 'Naked_Tuple_3', 'Naked_Tuple_4',
-                                   'Block_RC_Interaction', 'Block_Block_Interaction',
-                                   'Hidden_Subset_3', 'Hidden_Subset_4', 'Basic_Fish', 'Fish_3', 'Fish_4',
-                                   'Skyscraper', 'Kite']
-
-        optional_state_map = {
-            'Naked_Pair': 'naked_pair',
-            'Naked_Tuple_3': 'naked_tuple_3',
-            'Naked_Tuple_4': 'naked_tuple_4',
-            'Block_RC_Interaction': 'block_rc_interaction',
-            'Block_Block_Interaction': 'block_block_interaction',
-            'Hidden_Pair': 'hidden_subset_2',
-            'Hidden_Subset_3': 'hidden_subset_3',
-            'Hidden_Subset_4': 'hidden_subset_4',
-            'Basic_Fish': 'basic_fish',
-            'Fish_3': 'fish_3',
-            'Fish_4': 'fish_4',
-            'Skyscraper': 'skyscraper',
-            'Kite': 'kite'
-        }
-
-        states += ordered_optional_states
-
-        Machine.__init__(self, states=states, initial='Ready')
-
-        self.add_transition(trigger='perform_step', source='Ready', dest='Sole_Candidate',
-                            before='log_initial_puzzle')
-
-        self.add_transition(trigger='perform_step', source='Sole_Candidate', dest='Unique_Candidate',
-                            conditions='fill_sole_candidate')
-
-        if not ordered_optional_states:
-            self.add_transition(trigger='perform_step', source='Unique_Candidate', dest='Make_Guess',
-                                before='fill_unique_candidate')
-        else:
-            # Add the transitions from super basic technique to first optional
-            num_optional_states = len(ordered_optional_states)
-            self.add_transition(trigger='perform_step', source='Unique_Candidate', dest=ordered_optional_states[0],
-                                conditions='fill_unique_candidate')
-
-            # Add transitions from one optional technique to another
-            for n in range(0, num_optional_states - 1):
-                self.add_transition(trigger='perform_step',
-                                    source=ordered_optional_states[n],
-                                    dest=ordered_optional_states[n+1],
-                                    conditions=optional_state_map[ordered_optional_states[n]])
-
-            # Add mandatory transition from optional to guessing for the last optional state
-            self.add_transition(trigger='perform_step',
-                                source=ordered_optional_states[-1],
-                                dest='Make_Guess',
-                                conditions=optional_state_map[ordered_optional_states[-1]])
-
-        # Add the mandatory transitions
-        self.add_transition(trigger='perform_step', source='Make_Guess', dest='Sole_Candidate',
-                            before='make_guess')
-
-        self.add_transition(trigger='perform_step', source='*', dest='Sole_Candidate')
-
-        self.add_transition(trigger='done', source='*', dest='Done')
-        self.add_transition(trigger='not_complete', source='*', dest='Not_Complete')
+        self.pipeline = pipeline if pipeline is not None else get_pipeline(techniques, mode)
+        self.state = 'Ready'
+        # A list of the SudokuTechniqueStats of every technique, or None if the solver is not profiling
+        self.technique_stats = None
+        if profile:
+            self.technique_stats = [self.profile_technique(technique_name)
+                                    for technique_name in self.get_technique_names()]
+
+    def get_technique_names(self):
+        """
+        :return: The names of the methods performing the techniques of the pipeline, then make_guess and revert_guess
+        """
+        return ['fill_sole_candidate', 'fill_unique_candidate'] + \
+            [optional_state_map[state] for state in self.pipeline.ordered_optional_states] + \
+            ['make_guess', 'revert_guess']
+
+    def profile_technique(self, technique_name):
+        """
+        Replaces the method of the technique on this solver by one recording every call, so the solvers which are not
+        profiling call the methods directly
+        :param technique_name: The name of the method performing the technique
+        :return: The SudokuTechniqueStats of the technique
+        """
+        technique = getattr(self, technique_name)
+        stats = SudokuTechniqueStats(technique_name)
+
+        def profiled_technique():
+            sp = self.sudoku_puzzle
+            step_num = self.sudoku_logger.step_num
+            num_possibilities = sp.num_possibilities
+            start = time.perf_counter()
+            result = technique()
+            # A call succeeds if it logged a step. A reverted guess adds possibilities back, which are not counted
+            stats.record(self.sudoku_logger.step_num > step_num, max(0, num_possibilities - sp.num_possibilities),
+                         time.perf_counter() - start)
+            return result
+
+        setattr(self, technique_name, profiled_technique)
+        return stats
+
+    def get_profile(self):
+        """
+        :return: A list of the SudokuTechniqueStats of every technique in pipeline order, or None if the solver is not
+        profiling. The time of a technique includes the time of the guesses it reverted
+        """
+        return self.technique_stats
+
+    def perform_step(self):
+        """
+        Performs the step of the current state. See SudokuPipeline
+        """
+        self.pipeline.perform_step(self)
+
+    def done(self):
+        self.state = 'Done'
+
+    def not_complete(self):
+        self.state = 'Not_Complete'
 
     def validate_filled_cell(self, filled_cell, updated_cells):
         if filled_cell:
@@ -166,10 +180,46 @@ class SudokuSolver(Machine):
         self.assert_possibilities_are_non_empty()
         return self.validate_and_log_updated_cells_step(ss)
 
+    def xy_wing(self):
+        ss = self.sudoku_puzzle.perform_xy_wing()
+        return self.validate_and_log_updated_cells_step(ss)
+
+    def xyz_wing(self):
+        ss = self.sudoku_puzzle.perform_xyz_wing()
+        return self.validate_and_log_updated_cells_step(ss)
+
+    def w_wing(self):
+        ss = self.sudoku_puzzle.perform_w_wing()
+        return self.validate_and_log_updated_cells_step(ss)
+
+    def simple_coloring(self):
+        ss = self.sudoku_puzzle.perform_simple_coloring()
+        return self.validate_and_log_updated_cells_step(ss)
+
+    def x_chain(self):
+        ss = self.sudoku_puzzle.perform_x_chain()
+        return self.validate_and_log_updated_cells_step(ss)
+
+    def templates(self):
+        ss = self.sudoku_puzzle.perform_templates()
+        return self.validate_and_log_updated_cells_step(ss)
+
     def make_guess(self):
-        (cell_name, candidate) = self.sudoku_puzzle.determine_next_guess()
+        if self.sudoku_puzzle.guess is None and self.sudoku_puzzle.num_contradictions > 0:
+            self.stop_reason = "The puzzle has no solution"
+            return
+        if self.budget is not None:
+            self.stop_reason = self.budget.get_guess_exceeded_reason(self.guess_strategy.num_guesses,
+                                                                     self.get_guess_depth())
+            if self.stop_reason is not None:
+                return
+
+        (cell_name, candidate) = self.sudoku_puzzle.determine_next_guess(self.guess_strategy)
         if cell_name is None or candidate is None:
-            self.revert_guess()
+            if self.sudoku_puzzle.guess is None:
+                self.stop_reason = "The puzzle has no solution"
+            else:
+                self.revert_guess()
             return
 
         ss = self.sudoku_puzzle.make_guess(cell_name, candidate)
@@ -179,6 +229,7 @@ class SudokuSolver(Machine):
 
     def revert_guess(self):
         ss = self.sudoku_puzzle.revert_guess()
+        self.guess_strategy.record_backtrack()
         additional = "Guesses now: " + str(self.sudoku_puzzle.guess)
         self.sudoku_logger.log_step(ss.reason, ss.filled_cell, ss.updated_cells, self.sudoku_puzzle.get_board(),
                                     self.sudoku_puzzle.get_possibilities(), additional)
@@ -202,19 +253,53 @@ class SudokuSolver(Machine):
                                     self.sudoku_puzzle.get_possibilities(), "New puzzle...")
 
     def do_work(self):
-        while not self.sudoku_puzzle.num_filled == 81:
+        """
+        Solves steps until every cell is filled, the puzzle is found to have no solution or the budget runs out
+        :return: A SudokuResult with the board when the solver stopped
+        """
+        while not self.sudoku_puzzle.num_filled == 81 and not self.is_stopped():
             self.solve_next_step()
             self.assert_possibilities_are_non_empty()
         print('#########################################################################################')
         self.sudoku_logger.print_log()
+        if self.sudoku_puzzle.num_filled == 81:
+            self.done()
+        else:
+            self.not_complete()
+        return self.get_result()
 
     def solve_next_step(self):
         self.just_solved_step = False
-        while not self.just_solved_step:
+        while not self.just_solved_step and not self.is_stopped():
             self.perform_step()
 
+    def is_stopped(self):
+        """
+        :return: True if the puzzle has no solution or the budget ran out
+        """
+        if self.stop_reason is None and self.budget is not None:
+            self.stop_reason = self.budget.get_exceeded_reason(self.sudoku_logger.step_num)
+        return self.stop_reason is not None
+
+    def get_guess_depth(self):
+        return self.sudoku_puzzle.guess.depth if self.sudoku_puzzle.guess is not None else 0
+
+    def get_result(self):
+        """
+        :return: A SudokuResult with the current board, possibilities and the reason the solver stopped
+        """
+        solved = self.sudoku_puzzle.num_filled == 81
+        if solved:
+            reason = "Solved"
+        elif self.stop_reason is not None:
+            reason = self.stop_reason
+        else:
+            reason = "Not complete"
+        return SudokuResult(solved, reason, self.sudoku_puzzle.get_board(), self.sudoku_puzzle.get_possibilities(),
+                            self.sudoku_logger.step_num, self.guess_strategy.num_guesses, self.get_guess_depth())
+
     def assert_possibilities_are_non_empty(self):
         for (cell_name, cell) in self.sudoku_puzzle.cells_dict.items():
             if len(cell.possibilities) < 1:
-                print(cell_name, str(self.current_state.name))
+                print(cell_name, str(self.state))
                 break
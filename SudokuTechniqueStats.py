@@ -0,0 +1,60 @@
+__author__ = 'william'
+
+
+class SudokuTechniqueStats:
+    """
+    The statistics of the calls of a technique
+    """
+
+    def __init__(self, technique_name):
+        """
+        :param technique_name: The name of the SudokuSolver method performing the technique
+        """
+        self.technique_name = technique_name
+        # The number of times the technique was called
+        self.num_calls = 0
+        # The number of calls which filled a cell or removed possibilities
+        self.num_successes = 0
+        # The number of possibilities removed by the technique
+        self.num_eliminations = 0
+        # The time spent in the technique in seconds
+        self.time = 0.0
+
+    def record(self, succeeded, num_eliminations, elapsed):
+        """
+        Records a call of the technique
+        :param succeeded: True if the call filled a cell or removed possibilities
+        :param num_eliminations: The number of possibilities removed by the call
+        :param elapsed: The time spent in the call in seconds
+        """
+        self.num_calls += 1
+        if succeeded:
+            self.num_successes += 1
+        self.num_eliminations += num_eliminations
+        self.time += elapsed
+
+    def get_success_rate(self):
+        """
+        :return: The fraction of the calls which succeeded, or None if the technique was never called
+        """
+        return self.num_successes / self.num_calls if self.num_calls else None
+
+    def get_eliminations_per_ms(self):
+        """
+        :return: The number of possibilities removed per millisecond spent in the technique, or None if no time was
+        spent in it
+        """
+        return self.num_eliminations / (self.time * 1000) if self.time > 0 else None
+
+    def __str__(self):
+        return self.technique_name + ": " + str(self.num_successes) + "/" + str(self.num_calls) + " calls, " + \
+            str(self.num_eliminations) + " eliminations, " + str(round(self.time * 1000, 3)) + " ms"
+
+    def to_json(self):
+        return {
+            'technique_name': self.technique_name,
+            'num_calls': self.num_calls,
+            'num_successes': self.num_successes,
+            'num_eliminations': self.num_eliminations,
+            'time_ms': self.time * 1000
+        }
@@ -0,0 +1,52 @@
+from collections import OrderedDict
+
+__author__ = 'william'
+
+
+class SudokuTranspositionTable:
+    """
+    A bounded table from SudokuPuzzle.zobrist_hash to a value, such as the states known to have no solution.
+    When it is full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, max_size=100000):
+        """
+        :param max_size: The maximum number of entries kept
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        # The number of lookups which found an entry
+        self.num_hits = 0
+        # The number of entries evicted to make room for newer ones
+        self.num_evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, zobrist_hash):
+        """
+        :return: True if the hash has an entry. Marks the entry as recently used
+        """
+        if zobrist_hash in self.entries:
+            self.entries.move_to_end(zobrist_hash)
+            self.num_hits += 1
+            return True
+        return False
+
+    def get(self, zobrist_hash, default=None):
+        """
+        :return: The value stored for the hash, or default if there is none. Marks the entry as recently used
+        """
+        if zobrist_hash in self:
+            return self.entries[zobrist_hash]
+        return default
+
+    def put(self, zobrist_hash, value=True):
+        """
+        Stores the value for the hash, evicting the least recently used entry if the table is full
+        """
+        self.entries[zobrist_hash] = value
+        self.entries.move_to_end(zobrist_hash)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.num_evictions += 1
@@ -0,0 +1,76 @@
+import unittest
+from SudokuBitPuzzle import SudokuBitPuzzle
+from SudokuHelper import cell_id_by_name
+from SudokuPuzzle import SudokuPuzzle
+import TestSudokuPuzzle
+
+__author__ = 'william'
+
+
+class TestSudokuBitPuzzle(unittest.TestCase):
+
+    board_names = ['test_board', 'naked_triple_board', 'hidden_pair_board', 'fish_4_row_board',
+                   'skyscraper_row_board', 'kite_board', 'xy_wing_board', 'xyz_wing_board', 'w_wing_board',
+                   'color_trap_board', 'color_wrap_board', 'x_chain_board']
+    boards = [getattr(TestSudokuPuzzle.TestSudokuPuzzle, board_name) for board_name in board_names]
+
+    techniques = ['fill_sole_candidate', 'fill_unique_candidate', 'perform_naked_pair', 'perform_block_rc_interaction',
+                  'perform_block_block_interaction', 'perform_hidden_subset', 'perform_basic_fish', 'perform_fish',
+                  'perform_skyscraper', 'perform_kite', 'perform_xy_wing', 'perform_xyz_wing', 'perform_w_wing',
+                  'perform_simple_coloring', 'perform_x_chain', 'perform_templates']
+
+    def test_init_possibilities(self):
+        for board in self.boards:
+            sp = SudokuPuzzle([row[:] for row in board])
+            sbp = SudokuBitPuzzle([row[:] for row in board])
+            self.assertListEqual(sbp.get_board(), sp.get_board())
+            self.assertListEqual(sbp.get_possibilities(), sp.get_possibilities())
+            self.assertListEqual(sbp.remaining_in_y, sp.remaining_in_y)
+            self.assertListEqual(sbp.locs_left_by_block, sp.locs_left_by_block)
+
+    def test_techniques_match_set_puzzle(self):
+        for board in self.boards:
+            sp = SudokuPuzzle([row[:] for row in board])
+            sbp = SudokuBitPuzzle([row[:] for row in board])
+            for technique in self.techniques:
+                args = (3,) if technique in ['perform_hidden_subset', 'perform_fish'] else ()
+                ss = getattr(sp, technique)(*args)
+                sbs = getattr(sbp, technique)(*args)
+                self.assertEqual(bool(sbs), bool(ss))
+                if ss:
+                    self.assertEqual(sbs.filled_cell, ss.filled_cell)
+                    self.assertSetEqual(sbs.updated_cells, ss.updated_cells)
+                self.assertListEqual(sbp.get_possibilities(), sp.get_possibilities())
+
+    def test_make_and_revert_guess(self):
+        sp = SudokuPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.guess_board])
+        sbp = SudokuBitPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.guess_board])
+        self.assertEqual(sbp.determine_next_guess(), sp.determine_next_guess())
+        for (y, x, candidate) in [(0, 3, 4), (0, 4, 5), (1, 0, 7)]:
+            sp.make_guess(sp.board[y][x], candidate)
+            sbp.make_guess(sbp.board[y][x], candidate)
+            self.assertListEqual(sbp.get_possibilities(), sp.get_possibilities())
+        for _ in range(0, 3):
+            sp.revert_guess()
+            sbp.revert_guess()
+            self.assertListEqual(sbp.get_board(), sp.get_board())
+            self.assertListEqual(sbp.get_possibilities(), sp.get_possibilities())
+        self.assertIsNone(sbp.guess)
+
+    def test_zobrist_hash_matches_set_puzzle(self):
+        sp = SudokuPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.guess_board])
+        sbp = SudokuBitPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.guess_board])
+        hashes = [sbp.zobrist_hash]
+        self.assertEqual(sbp.zobrist_hash, sp.zobrist_hash)
+        for (cell_name, candidate) in [('c031', 4), ('c041', 5), ('c100', 7)]:
+            sp.push_guess(cell_id_by_name[cell_name], candidate)
+            sbp.push_guess(cell_id_by_name[cell_name], candidate)
+            sp.propagate()
+            sbp.propagate()
+            self.assertEqual(sbp.zobrist_hash, sp.zobrist_hash)
+            hashes.append(sbp.zobrist_hash)
+        zobrist_hash = sbp.zobrist_hash
+        sbp.recalculate_fields()
+        self.assertEqual(sbp.zobrist_hash, zobrist_hash)
+        sbp.undo_trail(0)
+        self.assertEqual(sbp.zobrist_hash, hashes[0])
@@ -0,0 +1,43 @@
+import unittest
+from SudokuDLX import SudokuDLX
+from SudokuDLX import solve_dlx
+from SudokuFastSolver import solve_fast
+from SudokuPuzzle import SudokuPuzzle
+import TestSudokuPuzzle
+
+__author__ = 'william'
+
+
+class TestSudokuDLX(unittest.TestCase):
+
+    board_names = ['test_board', 'naked_triple_board', 'fish_4_row_board', 'kite_board', 'skyscraper_row_board']
+
+    def get_board_copy(self, board_name):
+        return [row[:] for row in getattr(TestSudokuPuzzle.TestSudokuPuzzle, board_name)]
+
+    def test_solve_dlx(self):
+        for board_name in self.board_names:
+            board = self.get_board_copy(board_name)
+            solution = solve_dlx(board)
+            sp = SudokuPuzzle(solution)
+            self.assertEqual(sp.num_filled, 81)
+            self.assertSetEqual(sp.validate_board(), set())
+            # These boards have a unique solution
+            self.assertListEqual(solution, solve_fast(self.get_board_copy(board_name)))
+
+    def test_solve_dlx_no_solution(self):
+        self.assertIsNone(solve_dlx(self.get_board_copy('illegal_puzzle_board')))
+        board = self.get_board_copy('empty_board')
+        board[0] = [1, 2, 3, 4, 5, 6, 7, 8, None]
+        board[1][8] = 9
+        self.assertIsNone(solve_dlx(board))
+
+    def test_iterate_solutions(self):
+        dlx = SudokuDLX(self.get_board_copy('empty_board'))
+        solutions = list(dlx.iterate_solutions(20))
+        self.assertEqual(len(solutions), 20)
+        self.assertEqual(len(set(str(solution) for solution in solutions)), 20)
+        # Stopping early restores the links, so the search can be started again
+        self.assertListEqual(list(dlx.iterate_solutions(20)), solutions)
+        self.assertListEqual(list(SudokuDLX(self.get_board_copy('test_board')).iterate_solutions()),
+                             [solve_dlx(self.get_board_copy('test_board'))])
@@ -0,0 +1,87 @@
+import time
+import unittest
+from SudokuBitPuzzle import SudokuBitPuzzle
+from SudokuFastSolver import count_solutions
+from SudokuFastSolver import iterate_solutions
+from SudokuFastSolver import solve_fast
+from SudokuHelper import all_locs
+from SudokuPuzzle import SudokuPuzzle
+import TestSudokuPuzzle
+
+__author__ = 'william'
+
+
+class TestSudokuFastSolver(unittest.TestCase):
+
+    board_names = ['test_board', 'guess_board', 'empty_board', 'naked_triple_board', 'fish_4_row_board',
+                   'kite_board', 'skyscraper_row_board']
+
+    no_solution_board = [
+        [1, 2, 3, 4, 5, 6, 7, 8, None],
+        [None, None, None, None, None, None, None, None, 9],
+        [None, None, None, None, None, None, None, None, None],
+        [None, None, None, None, None, None, None, None, None],
+        [None, None, None, None, None, None, None, None, None],
+        [None, None, None, None, None, None, None, None, None],
+        [None, None, None, None, None, None, None, None, None],
+        [None, None, None, None, None, None, None, None, None],
+        [None, None, None, None, None, None, None, None, None]
+    ]
+
+    def assert_solves(self, board, solution):
+        self.assertIsNotNone(solution)
+        sp = SudokuPuzzle(solution)
+        self.assertEqual(sp.num_filled, 81)
+        self.assertSetEqual(sp.validate_board(), set())
+        for y in all_locs:
+            for x in all_locs:
+                if board[y][x] is not None:
+                    self.assertEqual(solution[y][x], board[y][x])
+
+    def test_solve_fast(self):
+        for board_name in self.board_names:
+            board = getattr(TestSudokuPuzzle.TestSudokuPuzzle, board_name)
+            for puzzle_class in [SudokuPuzzle, SudokuBitPuzzle]:
+                self.assert_solves(board, solve_fast([row[:] for row in board], puzzle_class))
+
+    def test_solve_fast_test_board(self):
+        solution = solve_fast([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.test_board])
+        sp = SudokuPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.test_board])
+        sp.propagate_singles()
+        self.assertListEqual(solution, sp.get_board())
+
+    def test_solve_fast_no_solution(self):
+        self.assertIsNone(solve_fast([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.illegal_puzzle_board]))
+        self.assertIsNone(solve_fast([row[:] for row in self.no_solution_board]))
+
+    def test_count_solutions(self):
+        boards = TestSudokuPuzzle.TestSudokuPuzzle
+        self.assertEqual(count_solutions([row[:] for row in boards.test_board]), 1)
+        self.assertEqual(count_solutions([row[:] for row in boards.kite_board]), 1)
+        self.assertEqual(count_solutions([row[:] for row in boards.guess_board]), 2)
+        self.assertEqual(count_solutions([row[:] for row in boards.naked_triple_board], None), 8)
+        self.assertEqual(count_solutions([row[:] for row in boards.naked_triple_board], 5), 5)
+        for puzzle_class in [SudokuPuzzle, SudokuBitPuzzle]:
+            self.assertEqual(count_solutions([row[:] for row in boards.empty_board], 20, puzzle_class), 20)
+
+    def test_count_solutions_no_solution(self):
+        self.assertEqual(count_solutions([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.illegal_puzzle_board]), 0)
+        self.assertEqual(count_solutions([row[:] for row in self.no_solution_board]), 0)
+        self.assertEqual(count_solutions([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.test_board], 0), 0)
+
+    def test_iterate_solutions(self):
+        board = TestSudokuPuzzle.TestSudokuPuzzle.naked_triple_board
+        solutions = list(iterate_solutions(SudokuBitPuzzle([row[:] for row in board])))
+        self.assertEqual(len(solutions), 8)
+        self.assertEqual(len(set(str(solution) for solution in solutions)), 8)
+        for solution in solutions:
+            self.assert_solves(board, solution)
+        self.assertListEqual(solutions[0], solve_fast([row[:] for row in board]))
+
+    def test_iterate_solutions_max_count_and_deadline(self):
+        board = TestSudokuPuzzle.TestSudokuPuzzle.empty_board
+        solutions = iterate_solutions(SudokuPuzzle([row[:] for row in board]), 3)
+        self.assertEqual(len(list(solutions)), 3)
+        solutions = iterate_solutions(SudokuPuzzle([row[:] for row in board]), deadline=time.time() - 1)
+        self.assertListEqual(list(solutions), [])
+        self.assertListEqual(list(iterate_solutions(SudokuPuzzle([row[:] for row in self.no_solution_board]))), [])
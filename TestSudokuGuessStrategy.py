@@ -0,0 +1,86 @@
+import contextlib
+import io
+import unittest
+from SudokuFastSolver import solve_fast
+from SudokuGuessStrategy import FrequencyGuessStrategy
+from SudokuGuessStrategy import LeastConstrainingValueGuessStrategy
+from SudokuGuessStrategy import MRVDegreeGuessStrategy
+from SudokuGuessStrategy import SudokuGuessStrategy
+from SudokuGuessStrategy import guess_strategies
+from SudokuHelper import cell_id_by_name
+from SudokuPuzzle import SudokuPuzzle
+from SudokuSolver import SudokuSolver
+import TestSudokuPuzzle
+
+__author__ = 'william'
+
+
+class TestSudokuGuessStrategy(unittest.TestCase):
+
+    board_names = ['test_board', 'guess_board', 'empty_board', 'naked_triple_board', 'fish_4_row_board',
+                   'kite_board', 'skyscraper_row_board']
+
+    def test_mrv(self):
+        sp = SudokuPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.guess_board])
+        cell_id = SudokuGuessStrategy().select_cell_id(sp)
+        min_count = min(sp.count_cell_possibilities(other_id) for other_id in range(0, 81)
+                        if sp.cell_vals[other_id] is None)
+        self.assertEqual(sp.count_cell_possibilities(cell_id), min_count)
+        candidate = min(sp.get_cell_possibilities(cell_id))
+        self.assertTupleEqual(sp.determine_next_guess(), (sp.cells[cell_id].name, candidate))
+
+    def test_mrv_empty_board(self):
+        sp = SudokuPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.empty_board])
+        self.assertTupleEqual(sp.determine_next_guess(), ('c000', 1))
+        self.assertEqual(MRVDegreeGuessStrategy().select_cell_id(sp), 0)
+
+    def test_mrv_degree(self):
+        board = [row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.empty_board]
+        board[0][1] = 1
+        board[1][0] = 2
+        board[0][5] = 2
+        sp = SudokuPuzzle(board)
+        # c000 and c031 both have 7 possibilities, but c000 has 3 filled peers and c031 only has 2
+        self.assertEqual(sp.count_cell_possibilities(cell_id_by_name['c000']), 7)
+        self.assertEqual(sp.count_cell_possibilities(cell_id_by_name['c031']), 7)
+        self.assertEqual(SudokuGuessStrategy().select_cell_id(sp), cell_id_by_name['c000'])
+        self.assertEqual(MRVDegreeGuessStrategy().select_cell_id(sp), cell_id_by_name['c031'])
+
+    def test_value_ordering(self):
+        board = [row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.empty_board]
+        board[1][4] = 1
+        board[4][2] = 1
+        sp = SudokuPuzzle(board)
+        cell_id = cell_id_by_name['c000']
+        # 1 is possible in 10 peers of c000 and the other candidates in all 20
+        self.assertTupleEqual(LeastConstrainingValueGuessStrategy().order_candidates(sp, cell_id),
+                              (1, 2, 3, 4, 5, 6, 7, 8, 9))
+        # 1 has 4 locs left in the first block and the other candidates have 9
+        self.assertTupleEqual(FrequencyGuessStrategy().order_candidates(sp, cell_id), (1, 2, 3, 4, 5, 6, 7, 8, 9))
+        self.assertTupleEqual(SudokuGuessStrategy().order_candidates(sp, cell_id_by_name['c182']),
+                              (2, 3, 4, 5, 6, 7, 8, 9))
+        self.assertTupleEqual(LeastConstrainingValueGuessStrategy().order_candidates(sp, cell_id_by_name['c182']),
+                              (2, 3, 4, 5, 6, 7, 8, 9))
+
+    def test_strategies_solve(self):
+        for (name, strategy_class) in guess_strategies.items():
+            strategy = strategy_class()
+            self.assertEqual(strategy.name, name)
+            for board_name in self.board_names:
+                board = getattr(TestSudokuPuzzle.TestSudokuPuzzle, board_name)
+                solution = solve_fast([row[:] for row in board], guess_strategy=strategy)
+                sp = SudokuPuzzle(solution)
+                self.assertEqual(sp.num_filled, 81)
+                self.assertSetEqual(sp.validate_board(), set())
+            self.assertGreater(strategy.num_guesses, 0)
+            self.assertGreaterEqual(strategy.num_guesses, strategy.num_backtracks)
+            self.assertDictEqual(strategy.to_json(), {'name': name, 'num_guesses': strategy.num_guesses,
+                                                      'num_backtracks': strategy.num_backtracks})
+
+    def test_solver_counts_guesses(self):
+        strategy = MRVDegreeGuessStrategy()
+        sp = SudokuPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.guess_board])
+        with contextlib.redirect_stdout(io.StringIO()):
+            SudokuSolver(sp, strategy).do_work()
+        self.assertEqual(sp.num_filled, 81)
+        self.assertGreater(strategy.num_guesses, 0)
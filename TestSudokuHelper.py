@@ -106,3 +106,112 @@ class TestSudokuHelper(unittest.TestCase):
         self.assertEqual(SudokuHelper.cell_name_to_loc('c455'), (4, 5))
         self.assertEqual(SudokuHelper.cell_name_to_loc('c688'), (6, 8))
         self.assertEqual(SudokuHelper.cell_name_to_loc('c757'), (7, 5))
+
+    def test_bit_tables(self):
+        self.assertEqual(SudokuHelper.val_to_bit[1], 1)
+        self.assertEqual(SudokuHelper.val_to_bit[9], 256)
+        self.assertEqual(SudokuHelper.bit_count[0], 0)
+        self.assertEqual(SudokuHelper.bit_count[0b101], 2)
+        self.assertEqual(SudokuHelper.bit_count[SudokuHelper.all_possibilities_mask], 9)
+        self.assertEqual(SudokuHelper.bit_to_vals[0], ())
+        self.assertEqual(SudokuHelper.bit_to_vals[0b100010001], (1, 5, 9))
+
+    def test_vals_to_mask(self):
+        self.assertEqual(SudokuHelper.vals_to_mask([]), 0)
+        self.assertEqual(SudokuHelper.vals_to_mask({1, 5, 9}), 0b100010001)
+        self.assertEqual(SudokuHelper.vals_to_mask(SudokuHelper.all_possibilities),
+                         SudokuHelper.all_possibilities_mask)
+
+    def test_mask_to_vals(self):
+        self.assertSetEqual(SudokuHelper.mask_to_vals(0), set())
+        self.assertSetEqual(SudokuHelper.mask_to_vals(0b100010001), {1, 5, 9})
+        self.assertSetEqual(SudokuHelper.mask_to_vals(SudokuHelper.all_possibilities_mask),
+                            SudokuHelper.all_possibilities)
+
+    def test_find_subsets(self):
+        possibilities = [[2, 5], [1, 2, 5], None, [3, 4, 5, 7, 8], None, None, None, [1, 5], [4, 5, 6, 7]]
+        masks = [SudokuHelper.vals_to_mask(p) if p is not None else None for p in possibilities]
+        subsets = SudokuHelper.find_subsets(masks, 4)
+        self.assertListEqual(subsets[2], [])
+        self.assertListEqual(subsets[3], [((0, 1, 7), SudokuHelper.vals_to_mask([1, 2, 5]))])
+        self.assertListEqual(subsets[4], [])
+        masks = [0b11, 0b11, 0b110, 0b1, None, 0b111111111]
+        subsets = SudokuHelper.find_subsets(masks, 3)
+        self.assertListEqual(subsets[2], [((0, 1), 0b11), ((0, 3), 0b11), ((1, 3), 0b11)])
+        self.assertListEqual(subsets[3], [((0, 1, 2), 0b111), ((0, 1, 3), 0b11), ((0, 2, 3), 0b111),
+                                          ((1, 2, 3), 0b111)])
+
+    def test_loc_to_cell_id(self):
+        self.assertEqual(SudokuHelper.loc_to_cell_id(0, 0), 0)
+        self.assertEqual(SudokuHelper.loc_to_cell_id(0, 8), 8)
+        self.assertEqual(SudokuHelper.loc_to_cell_id(4, 5), 41)
+        self.assertEqual(SudokuHelper.loc_to_cell_id(8, 8), 80)
+        for cell_id in SudokuHelper.all_cell_ids:
+            self.assertEqual(SudokuHelper.loc_to_cell_id(*SudokuHelper.cell_id_to_loc(cell_id)), cell_id)
+            self.assertEqual(SudokuHelper.cell_id_by_name[SudokuHelper.name_by_cell_id[cell_id]], cell_id)
+        self.assertEqual(SudokuHelper.name_by_cell_id[41], 'c454')
+
+    def test_unit_tables(self):
+        self.assertEqual(len(SudokuHelper.unit_cell_ids), 27)
+        self.assertListEqual(SudokuHelper.unit_cell_ids[0], [0, 1, 2, 3, 4, 5, 6, 7, 8])
+        self.assertListEqual(SudokuHelper.unit_cell_ids[9], [0, 9, 18, 27, 36, 45, 54, 63, 72])
+        self.assertListEqual(SudokuHelper.unit_cell_ids[22], [30, 31, 32, 39, 40, 41, 48, 49, 50])
+        self.assertEqual(SudokuHelper.units_by_cell_id[41], (4, 14, 22))
+        for cell_id in SudokuHelper.all_cell_ids:
+            for unit_num in SudokuHelper.units_by_cell_id[cell_id]:
+                self.assertIn(cell_id, SudokuHelper.unit_cell_ids[unit_num])
+
+    def test_peers_by_cell_id(self):
+        for cell_id in SudokuHelper.all_cell_ids:
+            peers = SudokuHelper.peers_by_cell_id[cell_id]
+            self.assertEqual(len(peers), 20)
+            self.assertNotIn(cell_id, peers)
+        self.assertTupleEqual(SudokuHelper.peers_by_cell_id[0], (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 18, 19, 20, 27,
+                                                                 36, 45, 54, 63, 72))
+
+    def test_bitboards(self):
+        self.assertListEqual(SudokuHelper.bitboard_to_cell_ids(0), [])
+        self.assertListEqual(SudokuHelper.bitboard_to_cell_ids(SudokuHelper.all_cells_bitboard),
+                             SudokuHelper.all_cell_ids)
+        for unit_num in SudokuHelper.all_unit_nums:
+            self.assertListEqual(SudokuHelper.bitboard_to_cell_ids(SudokuHelper.unit_bitboards[unit_num]),
+                                 sorted(SudokuHelper.unit_cell_ids[unit_num]))
+        for cell_id in SudokuHelper.all_cell_ids:
+            self.assertTupleEqual(tuple(SudokuHelper.bitboard_to_cell_ids(SudokuHelper.peer_bitboards[cell_id])),
+                                  SudokuHelper.peers_by_cell_id[cell_id])
+
+    def test_templates(self):
+        for band in SudokuHelper.cell_locs:
+            band_templates = SudokuHelper.band_templates[band]
+            self.assertEqual(len(set(band_templates)), 162)
+            for (bitboard, cols_mask) in band_templates:
+                cell_ids = SudokuHelper.bitboard_to_cell_ids(bitboard)
+                self.assertSetEqual({SudokuHelper.y_by_cell_id[cell_id] for cell_id in cell_ids},
+                                    {3 * band, 3 * band + 1, 3 * band + 2})
+                self.assertEqual(len({SudokuHelper.block_by_cell_id[cell_id] for cell_id in cell_ids}), 3)
+                self.assertEqual(cols_mask, SudokuHelper.locs_to_mask(SudokuHelper.x_by_cell_id[cell_id]
+                                                                      for cell_id in cell_ids))
+        num_templates = 0
+        for cols_masks in SudokuHelper.template_cols_masks:
+            num_band_templates = [len([t for t in SudokuHelper.band_templates[band] if t[1] == cols_masks[band]])
+                                  for band in SudokuHelper.cell_locs]
+            num_templates += num_band_templates[0] * num_band_templates[1] * num_band_templates[2]
+        self.assertEqual(num_templates, 46656)
+
+    def test_common_peers_by_cell_ids(self):
+        # Cells in different rows, cols and blocks only share the two cells at their crossings
+        self.assertTupleEqual(SudokuHelper.common_peers_by_cell_ids[0][80], (8, 72))
+        # Cells in the same row and block share the rest of the row and block
+        self.assertTupleEqual(SudokuHelper.common_peers_by_cell_ids[0][1], (2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 18, 19, 20))
+        # Cells in the same block but different rows and cols share the rest of the block
+        self.assertTupleEqual(SudokuHelper.common_peers_by_cell_ids[0][10], (1, 2, 9, 11, 18, 19, 20))
+        for id_1 in SudokuHelper.all_cell_ids:
+            for id_2 in SudokuHelper.all_cell_ids:
+                self.assertTupleEqual(SudokuHelper.common_peers_by_cell_ids[id_1][id_2],
+                                      SudokuHelper.common_peers_by_cell_ids[id_2][id_1])
+
+    def test_locs_to_mask(self):
+        self.assertEqual(SudokuHelper.locs_to_mask([]), 0)
+        self.assertEqual(SudokuHelper.locs_to_mask({0, 4, 8}), 0b100010001)
+        self.assertTupleEqual(SudokuHelper.bit_to_locs[0b100010001], (0, 4, 8))
+        self.assertEqual(SudokuHelper.unit_loc_bits_by_cell_id[41], ((4, 1 << 5), (14, 1 << 4), (22, 1 << 5)))
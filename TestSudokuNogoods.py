@@ -0,0 +1,77 @@
+import unittest
+from SudokuBitPuzzle import SudokuBitPuzzle
+from SudokuFastSolver import solve_fast
+from SudokuGuessStrategy import SudokuGuessStrategy
+from SudokuHelper import cell_id_by_name
+from SudokuNogoods import SudokuNogoods
+from SudokuPuzzle import SudokuPuzzle
+import TestSudokuFastSolver
+import TestSudokuPuzzle
+
+__author__ = 'william'
+
+
+class TestSudokuNogoods(unittest.TestCase):
+
+    hard_board = [
+        [4, None, None, None, None, None, 8, None, 5],
+        [None, 3, None, None, None, None, None, None, None],
+        [None, None, None, 7, None, None, None, None, None],
+        [None, 2, None, None, None, None, None, 6, None],
+        [None, None, None, None, 8, None, 4, None, None],
+        [None, None, None, None, 1, None, None, None, None],
+        [None, None, None, 6, None, 3, None, 7, None],
+        [5, None, None, 2, None, None, None, None, None],
+        [1, None, 4, None, None, None, None, None, None]
+    ]
+
+    def test_solve_fast_learning_nogoods(self):
+        board_names = TestSudokuFastSolver.TestSudokuFastSolver.board_names
+        for board in [getattr(TestSudokuPuzzle.TestSudokuPuzzle, name) for name in board_names] + [self.hard_board]:
+            for puzzle_class in [SudokuPuzzle, SudokuBitPuzzle]:
+                solution = solve_fast([row[:] for row in board], puzzle_class, learn_nogoods=True)
+                sp = SudokuPuzzle(solution)
+                self.assertEqual(sp.num_filled, 81)
+                self.assertSetEqual(sp.validate_board(), set())
+        no_solution_board = TestSudokuFastSolver.TestSudokuFastSolver.no_solution_board
+        self.assertIsNone(solve_fast([row[:] for row in no_solution_board], learn_nogoods=True))
+
+    def test_fewer_backtracks(self):
+        strategy = SudokuGuessStrategy()
+        solve_fast([row[:] for row in self.hard_board], guess_strategy=strategy)
+        learning_strategy = SudokuGuessStrategy()
+        solve_fast([row[:] for row in self.hard_board], guess_strategy=learning_strategy, learn_nogoods=True)
+        self.assertLess(learning_strategy.num_backtracks, strategy.num_backtracks)
+
+    def test_nogood_prunes_guess(self):
+        sp = SudokuBitPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.empty_board])
+        nogoods = SudokuNogoods()
+        nogood = frozenset([(cell_id_by_name['c000'], 1), (cell_id_by_name['c444'], 2)])
+        nogoods.record_nogood(nogood)
+        self.assertIsNone(nogoods.find_nogood(sp, cell_id_by_name['c444'], 2))
+        nogoods.push_guess(sp, cell_id_by_name['c000'], 1)
+        self.assertEqual(sp.guess.depth, 1)
+        self.assertEqual(nogoods.find_nogood(sp, cell_id_by_name['c444'], 2), nogood)
+        nogoods.push_guess(sp, cell_id_by_name['c444'], 2)
+        self.assertEqual(sp.guess.depth, 1)
+        self.assertEqual(nogoods.num_pruned, 1)
+        self.assertNotIn(2, sp.get_cell_possibilities(cell_id_by_name['c444']))
+        # The removal follows from the guess in c000
+        self.assertEqual(nogoods.removal_labels[10 * cell_id_by_name['c444'] + 2], 1 << 1)
+
+    def test_backjump(self):
+        sp = SudokuBitPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.empty_board])
+        nogoods = SudokuNogoods()
+        for (name, val) in [('c000', 1), ('c444', 2), ('c888', 3)]:
+            nogoods.push_guess(sp, cell_id_by_name[name], val)
+        # Empties c010 with removals following from the first two guesses only
+        for val in range(2, 10):
+            nogoods.remove_possibility(sp, cell_id_by_name['c010'], val, 1 << 2 if val == 2 else 1 << 1)
+        self.assertFalse(nogoods.propagate(sp))
+        self.assertIsNotNone(nogoods.backjump(sp))
+        # The guess in c888 is skipped and the guess in c444 is reverted
+        self.assertEqual(sp.guess.depth, 1)
+        self.assertEqual(nogoods.num_jumped, 1)
+        self.assertNotIn(2, sp.get_cell_possibilities(cell_id_by_name['c444']))
+        self.assertEqual(nogoods.removal_labels[10 * cell_id_by_name['c444'] + 2], 1 << 1)
+        self.assertSetEqual(nogoods.nogoods, {frozenset([(cell_id_by_name['c000'], 1), (cell_id_by_name['c444'], 2)])})
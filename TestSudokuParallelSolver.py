@@ -0,0 +1,46 @@
+import unittest
+from SudokuBitPuzzle import SudokuBitPuzzle
+from SudokuFastSolver import count_solutions
+from SudokuParallelSolver import solve_parallel
+from SudokuParallelSolver import split_into_subtrees
+from SudokuPuzzle import SudokuPuzzle
+import TestSudokuFastSolver
+import TestSudokuPuzzle
+
+__author__ = 'william'
+
+
+class TestSudokuParallelSolver(unittest.TestCase):
+
+    board_names = ['test_board', 'guess_board', 'empty_board', 'fish_4_row_board', 'kite_board']
+
+    def test_solve_parallel(self):
+        for board_name in self.board_names:
+            board = getattr(TestSudokuPuzzle.TestSudokuPuzzle, board_name)
+            for processes in [1, 2]:
+                solution = solve_parallel([row[:] for row in board], processes)
+                sp = SudokuPuzzle(solution)
+                self.assertEqual(sp.num_filled, 81)
+                self.assertSetEqual(sp.validate_board(), set())
+                for (row, solution_row) in zip(board, solution):
+                    self.assertListEqual([val for val in row if val is not None],
+                                         [solution_val for (val, solution_val) in zip(row, solution_row)
+                                          if val is not None])
+
+    def test_solve_parallel_no_solution(self):
+        illegal_puzzle_board = TestSudokuPuzzle.TestSudokuPuzzle.illegal_puzzle_board
+        no_solution_board = TestSudokuFastSolver.TestSudokuFastSolver.no_solution_board
+        self.assertIsNone(solve_parallel([row[:] for row in illegal_puzzle_board], 2))
+        self.assertIsNone(solve_parallel([row[:] for row in no_solution_board], 2))
+
+    def test_split_into_subtrees(self):
+        empty_board = TestSudokuPuzzle.TestSudokuPuzzle.empty_board
+        self.assertEqual(len(split_into_subtrees(SudokuBitPuzzle([row[:] for row in empty_board]), 0)), 1)
+        self.assertEqual(len(split_into_subtrees(SudokuBitPuzzle([row[:] for row in empty_board]), 1)), 9)
+        self.assertEqual(len(split_into_subtrees(SudokuBitPuzzle([row[:] for row in empty_board]), 2)), 72)
+        # Every solution is in exactly one subtree
+        board = TestSudokuPuzzle.TestSudokuPuzzle.naked_triple_board
+        subtree_boards = split_into_subtrees(SudokuBitPuzzle([row[:] for row in board]), 2)
+        self.assertGreater(len(subtree_boards), 1)
+        self.assertEqual(sum(count_solutions(subtree_board, None) for subtree_board in subtree_boards),
+                         count_solutions([row[:] for row in board], None))
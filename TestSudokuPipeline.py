@@ -0,0 +1,122 @@
+import contextlib
+import io
+import unittest
+from SudokuPipeline import adaptive_pipeline
+from SudokuPipeline import default_pipeline
+from SudokuPipeline import get_pipeline
+from SudokuPipeline import ordered_optional_states
+from SudokuPipeline import SudokuAdaptivePipeline
+from SudokuPipeline import SudokuPipeline
+from SudokuPuzzle import SudokuPuzzle
+from SudokuSolver import SudokuSolver
+import TestSudokuPuzzle
+
+__author__ = 'william'
+
+
+class TestSudokuPipeline(unittest.TestCase):
+
+    def test_states_in_order(self):
+        self.assertListEqual(default_pipeline.states,
+                             ['Ready', 'Sole_Candidate', 'Unique_Candidate'] + ordered_optional_states +
+                             ['Make_Guess', 'Done', 'Not_Complete'])
+        self.assertTupleEqual(default_pipeline.steps['Unique_Candidate'], ('fill_unique_candidate', 'Naked_Pair'))
+        self.assertTupleEqual(default_pipeline.steps['Kite'], ('kite', 'XY_Wing'))
+        self.assertTupleEqual(default_pipeline.steps['Templates'], ('templates', 'Make_Guess'))
+
+    def test_restarts_after_a_step(self):
+        ss = SudokuSolver(SudokuPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.test_board]))
+        self.assertIs(ss.pipeline, default_pipeline)
+        self.assertEqual(ss.state, 'Ready')
+        ss.perform_step()
+        self.assertEqual(ss.state, 'Sole_Candidate')
+        self.assertEqual(ss.sudoku_logger.step_num, 1)
+        ss.perform_step()
+        self.assertEqual(ss.sudoku_logger.step_num, 2)
+        self.assertEqual(ss.state, 'Sole_Candidate')
+
+    def test_steps_through_every_technique(self):
+        solution = SudokuSolver(SudokuPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.test_board]))
+        with contextlib.redirect_stdout(io.StringIO()):
+            board = solution.do_work().board
+        # No technique finds anything on a solved board
+        ss = SudokuSolver(SudokuPuzzle(board))
+        ss.perform_step()
+        states = []
+        while ss.state != 'Make_Guess':
+            states.append(ss.state)
+            ss.perform_step()
+        self.assertListEqual(states, ['Sole_Candidate', 'Unique_Candidate'] + ordered_optional_states)
+        self.assertEqual(ss.sudoku_logger.step_num, 1)
+
+    def test_custom_pipeline(self):
+        pipeline = SudokuPipeline(['Naked_Pair'])
+        self.assertTupleEqual(pipeline.steps['Naked_Pair'], ('naked_pair', 'Make_Guess'))
+        board = TestSudokuPuzzle.TestSudokuPuzzle.naked_triple_board
+        ss = SudokuSolver(SudokuPuzzle([row[:] for row in board]), pipeline=pipeline)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = ss.do_work()
+        self.assertTrue(result.solved)
+        self.assertEqual(ss.state, 'Done')
+
+    def test_adaptive_pipeline_solves(self):
+        pipeline = SudokuAdaptivePipeline(reorder_interval=5)
+        for board_name in ['test_board', 'guess_board', 'kite_board', 'fish_4_row_board']:
+            board = getattr(TestSudokuPuzzle.TestSudokuPuzzle, board_name)
+            ss = SudokuSolver(SudokuPuzzle([row[:] for row in board]), pipeline=pipeline)
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = ss.do_work()
+            self.assertTrue(result.solved)
+            self.assertSetEqual(SudokuPuzzle(result.board).validate_board(), set())
+        self.assertGreater(pipeline.num_calls, 0)
+        self.assertEqual(sum(stats.num_calls for stats in pipeline.get_stats()), pipeline.num_calls)
+
+    def test_adaptive_pipeline_reorders_and_skips(self):
+        pipeline = SudokuAdaptivePipeline(['Naked_Pair', 'Fish_4', 'Kite'], min_calls=2, explore_interval=2)
+        for (state, num_eliminations, elapsed) in [('Naked_Pair', 1, 0.01), ('Fish_4', 0, 0.01), ('Kite', 5, 0.001)]:
+            for _ in range(0, 2):
+                pipeline.stats[state].record(num_eliminations > 0, num_eliminations, elapsed)
+        pipeline.reorder()
+        # Kite removes 2.5 possibilities per ms, Naked_Pair 0.1 and Fish_4 none
+        self.assertListEqual(pipeline.active_states, ['Kite'])
+        self.assertTupleEqual(pipeline.steps['Unique_Candidate'], ('fill_unique_candidate', 'Kite'))
+        self.assertTupleEqual(pipeline.steps['Kite'], ('kite', 'Make_Guess'))
+        self.assertTupleEqual(pipeline.steps['Fish_4'], ('fish_4', 'Make_Guess'))
+        # Every other reorder tries the skipped techniques again
+        pipeline.reorder()
+        self.assertListEqual(pipeline.active_states, ['Kite', 'Naked_Pair', 'Fish_4'])
+        self.assertEqual(pipeline.mode, 'adaptive')
+        self.assertEqual(default_pipeline.mode, 'faithful')
+
+    def test_get_pipeline(self):
+        self.assertIs(get_pipeline(), default_pipeline)
+        self.assertIs(get_pipeline('full', 'faithful'), default_pipeline)
+        self.assertIs(get_pipeline(ordered_optional_states), default_pipeline)
+        self.assertIs(get_pipeline(mode='adaptive'), adaptive_pipeline)
+        pipeline = get_pipeline('singles+search')
+        self.assertListEqual(pipeline.ordered_optional_states, [])
+        self.assertTupleEqual(pipeline.steps['Unique_Candidate'], ('fill_unique_candidate', 'Make_Guess'))
+        self.assertIs(get_pipeline('singles+search'), pipeline)
+        self.assertEqual(str(pipeline), 'singles+search faithful')
+        custom_pipeline = get_pipeline(['Kite', 'Naked_Pair'])
+        self.assertIs(get_pipeline(['Kite', 'Naked_Pair']), custom_pipeline)
+        self.assertEqual(str(custom_pipeline), 'custom faithful')
+        self.assertTupleEqual(custom_pipeline.steps['Unique_Candidate'], ('fill_unique_candidate', 'Kite'))
+
+    def test_get_pipeline_unknown(self):
+        self.assertRaises(ValueError, get_pipeline, 'everything')
+        self.assertRaises(ValueError, get_pipeline, ['Naked_Pair', 'Swordfish'])
+        self.assertRaises(ValueError, get_pipeline, 'full', 'fastest')
+        self.assertRaises(ValueError, SudokuSolver, SudokuPuzzle(), techniques='everything')
+
+    def test_solver_techniques(self):
+        board = TestSudokuPuzzle.TestSudokuPuzzle.naked_triple_board
+        ss = SudokuSolver(SudokuPuzzle([row[:] for row in board]), techniques='singles+search', profile=True)
+        self.assertIs(ss.pipeline, get_pipeline('singles+search'))
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = ss.do_work()
+        self.assertTrue(result.solved)
+        self.assertListEqual(ss.get_technique_names(),
+                             ['fill_sole_candidate', 'fill_unique_candidate', 'make_guess', 'revert_guess'])
+        ss = SudokuSolver(SudokuPuzzle([row[:] for row in board]), techniques=['Naked_Pair'], mode='adaptive')
+        self.assertIs(ss.pipeline, get_pipeline(['Naked_Pair'], 'adaptive'))
@@ -3,8 +3,16 @@ import unittest
 from SudokuError import BadGuessError
 from SudokuError import BadPuzzleError
 from SudokuPuzzle import SudokuPuzzle
+from SudokuHelper import all_cells_bitboard
 from SudokuHelper import all_locs
 from SudokuHelper import all_possibilities
+from SudokuHelper import all_unit_nums
+from SudokuHelper import bit_count
+from SudokuHelper import bit_to_locs
+from SudokuHelper import bitboard_to_cell_ids
+from SudokuHelper import cell_bits
+from SudokuHelper import unit_bitboards
+from SudokuHelper import unit_cell_ids
 
 __author__ = 'william'
 
@@ -384,6 +392,78 @@ class TestSudokuPuzzle(unittest.TestCase):
         [6, 7, 3, 1, 8, 4, 5, 9, 2],
         [None, 5, None, 7, 2, 6, 1, 4, 3]
     ]
+
+    xy_wing_board = [
+        [7, 6, 2, 5, 9, 3, 8, None, None],
+        [4, 3, 5, 8, 1, 7, 6, 9, 2],
+        [8, 9, 1, 4, 6, 2, 3, 5, 7],
+        [None, None, None, 9, 5, None, 7, None, None],
+        [None, None, 9, 7, 3, 4, None, 8, None],
+        [None, None, 7, None, None, 6, None, None, 9],
+        [None, None, None, None, 7, None, 2, None, 8],
+        [1, 7, 3, None, None, None, None, None, None],
+        [None, None, None, None, 4, None, None, 7, None]
+    ]
+
+    xyz_wing_board = [
+        [None, 9, None, 5, 7, None, None, None, 2],
+        [None, 4, None, 9, None, 2, 5, 3, 7],
+        [5, 2, 7, None, None, None, None, None, None],
+        [4, None, None, None, None, 9, None, None, None],
+        [6, None, None, None, None, None, None, 5, None],
+        [None, None, None, 3, None, None, 1, None, 8],
+        [None, None, None, None, 2, 4, 6, None, 9],
+        [2, None, 4, 1, 9, None, 3, 8, 5],
+        [None, None, None, None, None, None, None, None, None]
+    ]
+
+    w_wing_board = [
+        [4, None, None, 2, None, 7, None, None, 6],
+        [2, 6, None, None, 9, None, None, None, None],
+        [5, 7, None, 6, 3, 8, 4, 2, None],
+        [None, 3, None, None, None, 2, 7, 6, None],
+        [6, None, 2, 5, 7, None, 9, None, 3],
+        [7, None, None, 9, 6, 3, 2, None, None],
+        [None, None, None, None, 2, None, 6, None, None],
+        [None, 2, None, None, None, None, 1, 3, None],
+        [None, None, None, None, 4, None, None, None, 2]
+    ]
+
+    color_trap_board = [
+        [None, None, 3, 7, None, 8, 4, None, None],
+        [7, 5, 8, None, 2, None, 3, 9, None],
+        [4, None, 6, None, 5, None, 7, 8, None],
+        [3, 7, None, None, 8, None, 1, 6, None],
+        [None, None, None, None, None, 5, None, 4, 7],
+        [None, 4, None, None, 7, 1, 8, None, 3],
+        [None, None, 7, 8, None, None, None, 1, 4],
+        [None, None, 1, None, 4, None, None, 7, None],
+        [2, 6, 4, None, None, 7, None, 3, 8]
+    ]
+
+    color_wrap_board = [
+        [None, 6, 8, 4, None, None, None, 2, None],
+        [None, 2, 3, None, 6, None, None, 8, None],
+        [4, 5, 9, None, None, 8, 3, 6, 7],
+        [2, 7, None, 6, None, None, 9, 5, None],
+        [9, 3, None, 7, None, None, None, None, None],
+        [6, 8, 5, 9, None, None, None, None, 3],
+        [3, 4, 6, None, 7, None, None, None, None],
+        [5, 9, 2, None, None, 1, None, None, None],
+        [8, 1, 7, None, None, 6, None, None, None]
+    ]
+
+    x_chain_board = [
+        [None, 9, None, 5, 7, None, None, None, 2],
+        [None, 4, None, 9, None, 2, 5, 3, 7],
+        [5, 2, 7, None, None, None, None, None, None],
+        [4, None, None, None, None, 9, None, None, None],
+        [6, None, None, None, None, None, None, 5, None],
+        [None, None, None, 3, None, None, 1, None, 8],
+        [None, None, None, None, 2, 4, 6, None, 9],
+        [2, None, 4, 1, 9, None, 3, 8, 5],
+        [None, None, None, None, None, None, None, None, None]
+    ]
     # endregion
 
     # region Validation boards
@@ -501,6 +581,86 @@ class TestSudokuPuzzle(unittest.TestCase):
         self.assertDictEqual(sp.locs_left_by_block[0], expected_locs_left_by_block_0)
         self.assertDictEqual(sp.locs_left_by_block[7], expected_locs_left_by_block_7)
 
+    def test_locs_left_masks_are_incremental(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.guess_board))
+        initial_masks = copy.deepcopy(sp.locs_left_masks)
+        sp.make_guess(sp.board[0][3], 4)
+        sp.propagate_singles()
+        sp.perform_naked_pair()
+        masks = copy.deepcopy(sp.locs_left_masks)
+        num_locs_left = copy.deepcopy(sp.num_locs_left)
+        sp.recalculate_fields()
+        self.assertListEqual(sp.locs_left_masks, masks)
+        self.assertListEqual(sp.num_locs_left, num_locs_left)
+        sp.revert_guess()
+        self.assertEqual(sp.locs_left_masks[0][4], initial_masks[0][4] & ~(1 << 3))
+        self.assertEqual(sp.num_locs_left[0][4], bit_count[sp.locs_left_masks[0][4]])
+        # A filled cell stays the only loc left for its val
+        y_locs_left = sp.locs_left_by_y[0]
+        self.assertSetEqual(y_locs_left[1], {0})
+        self.assertSetEqual(y_locs_left[2], {1})
+
+    def test_num_possibilities_is_incremental(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.guess_board))
+        initial_num_possibilities = sp.num_possibilities
+        sp.make_guess(sp.board[0][3], 4)
+        sp.propagate_singles()
+        sp.perform_naked_pair()
+        self.assertLess(sp.num_possibilities, initial_num_possibilities)
+        self.assertEqual(sp.num_possibilities, sum(sum(num_locs_left) for num_locs_left in sp.num_locs_left[0:9]))
+        sp.undo_trail(sp.guess.trail_length)
+        self.assertEqual(sp.num_possibilities, initial_num_possibilities)
+
+    def test_zobrist_hash_is_incremental(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.guess_board))
+        initial_hash = sp.zobrist_hash
+        sp.make_guess(sp.board[0][3], 4)
+        sp.propagate_singles()
+        sp.perform_naked_pair()
+        zobrist_hash = sp.zobrist_hash
+        self.assertNotEqual(zobrist_hash, initial_hash)
+        sp.recalculate_fields()
+        self.assertEqual(sp.zobrist_hash, zobrist_hash)
+        sp.undo_trail(sp.guess.trail_length)
+        self.assertEqual(sp.zobrist_hash, initial_hash)
+
+    def test_val_bitboards_match_locs_left(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.guess_board))
+        initial_val_bitboards = list(sp.val_bitboards)
+        sp.make_guess(sp.board[0][3], 4)
+        sp.propagate_singles()
+        for val in all_possibilities:
+            for unit_num in all_unit_nums:
+                cell_ids = bitboard_to_cell_ids(sp.val_bitboards[val] & unit_bitboards[unit_num])
+                self.assertListEqual(cell_ids, sorted(unit_cell_ids[unit_num][loc]
+                                                      for loc in bit_to_locs[sp.locs_left_masks[unit_num][val]]))
+        val_bitboards = list(sp.val_bitboards)
+        sp.recalculate_fields()
+        self.assertListEqual(sp.val_bitboards, val_bitboards)
+        sp.undo_trail(0)
+        self.assertListEqual(sp.val_bitboards, initial_val_bitboards)
+
+    def test_strong_link_units_match_num_locs_left(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.guess_board))
+        initial_strong_link_units = list(sp.strong_link_units)
+        sp.make_guess(sp.board[0][3], 4)
+        sp.propagate_singles()
+        for val in all_possibilities:
+            self.assertListEqual([unit_num for (unit_num, link) in sp.get_strong_links(val)],
+                                 [unit_num for unit_num in all_unit_nums if sp.num_locs_left[unit_num][val] == 2])
+            for (unit_num, link) in sp.get_strong_links(val):
+                self.assertEqual(link, sp.val_bitboards[val] & unit_bitboards[unit_num])
+                self.assertEqual(len(bitboard_to_cell_ids(link)), 2)
+                graph = sp.get_strong_link_graph(val)
+                (cell_id_1, cell_id_2) = bitboard_to_cell_ids(link)
+                self.assertTrue(graph[cell_id_1] & cell_bits[cell_id_2])
+                self.assertTrue(graph[cell_id_2] & cell_bits[cell_id_1])
+        strong_link_units = list(sp.strong_link_units)
+        sp.recalculate_fields()
+        self.assertListEqual(sp.strong_link_units, strong_link_units)
+        sp.undo_trail(0)
+        self.assertListEqual(sp.strong_link_units, initial_strong_link_units)
+
     # endregion
     ###############################################################################################################
     # Enumerate candidates tests
@@ -551,6 +711,15 @@ class TestSudokuPuzzle(unittest.TestCase):
         self.assertEqual(cell.val, 5)
         self.assertSetEqual(sp.get_possibilities()[y][x], {5})
 
+    def test_propagate_singles(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.test_board))
+        steps = sp.propagate_singles()
+        self.assertEqual(len(steps), 81 - len([v for row in self.test_board for v in row if v]))
+        self.assertEqual(sp.num_filled, 81)
+        self.assertListEqual(sp.sole_candidate_queue, [])
+        self.assertListEqual(sp.unique_candidate_queue, [])
+        self.assertSetEqual(sp.validate_board(), set())
+
     # endregion
     ###############################################################################################################
     # Unique candidate tests
@@ -749,6 +918,27 @@ class TestSudokuPuzzle(unittest.TestCase):
         block_possibilities = sp.enumerate_block_possibilities(block_num)
         self.assert_should_contain(should_contain_after, block_possibilities, vals)
 
+    def test_perform_on_dirty_units(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.test_board))
+        scanned_rows = []
+
+        def scan_row(y):
+            scanned_rows.append(y)
+            return None
+
+        for y in all_locs:
+            sp.perform_on_dirty_units([y], scan_row, y)
+        self.assertListEqual(scanned_rows, all_locs)
+        # Nothing changed, so nothing is rescanned
+        for y in all_locs:
+            sp.perform_on_dirty_units([y], scan_row, y)
+        self.assertListEqual(scanned_rows, all_locs)
+        # Removing a possibility from c011 dirties row 0 (and col 1 and block 0)
+        self.assertTrue(sp.remove_possibility_from_puzzle_by_loc(0, 1, 5))
+        for y in all_locs:
+            sp.perform_on_dirty_units([y], scan_row, y)
+        self.assertListEqual(scanned_rows, all_locs + [0])
+
     # endregion
     ###############################################################################################################
     # Naked tuple tests
@@ -950,6 +1140,25 @@ class TestSudokuPuzzle(unittest.TestCase):
         block_possibilities = sp.enumerate_block_possibilities(block_num)
         self.assert_should_contain_count(should_contain_after, block_possibilities, excluded_vals)
 
+    def test_perform_hidden_subset_in_col(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.hidden_pair_board))
+        ss = sp.perform_hidden_subset(2)
+        self.assertTrue(ss.reason.startswith("Hidden Subset Col 2: In col 8"))
+        self.assertSetEqual(ss.updated_cells, {('c485', 6)})
+
+    def test_unit_subsets_are_shared(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.hidden_pair_board))
+        (naked_pairs, hidden_pairs) = sp.get_unit_subsets(17, 2)
+        self.assertListEqual(hidden_pairs, [((1, 9), (1 << 4) | (1 << 6))])
+        unit_subsets = sp.unit_subsets[17]
+        sp.get_unit_subsets(17, 3)
+        sp.get_unit_subsets(17, 4)
+        self.assertIs(sp.unit_subsets[17], unit_subsets)
+        sp.perform_hidden_subset(2)
+        # The hidden pair has nothing left to remove
+        self.assertListEqual(sp.get_unit_subsets(17, 2)[1], [])
+        self.assertIsNot(sp.unit_subsets[17], unit_subsets)
+
     # endregion
     ###############################################################################################################
     # X-Wing/Basic fish tests
@@ -999,6 +1208,13 @@ class TestSudokuPuzzle(unittest.TestCase):
         self.assert_should_contain(should_contain_after_y1, y1_possibilities, {val})
         self.assert_should_contain(should_contain_after_y2, y2_possibilities, {val})
 
+    def test_basic_fish_in_rows_updates_both_cols(self):
+        sp = SudokuPuzzle(self.get_board_copy(SudokuPuzzle.reflect_board_over_xy(self.basic_fish_col_board)))
+        ss = sp.basic_fish_in_rows(0, 4)
+        # Both cols of the fish have the candidate removed
+        self.assertSetEqual(ss.updated_cells, {('c241', 1), ('c313', 1), ('c344', 1), ('c616', 1), ('c647', 1),
+                                               ('c716', 1), ('c747', 1), ('c816', 1), ('c847', 1)})
+
     def test_fish_3_in_rows(self):
         y1 = 1
         y2 = 2
@@ -1225,6 +1441,69 @@ class TestSudokuPuzzle(unittest.TestCase):
         self.assertSetEqual(p[2][8], {1, 7})
         self.assertSetEqual(p[3][2], {1, 8, 9})
         self.assertSetEqual(p[5][0], {1, 4, 9})
+
+    def test_xy_wing(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.xy_wing_board))
+        p = sp.get_possibilities()
+        self.assertSetEqual(p[3][5], {1, 8})
+        self.assertSetEqual(p[5][3], {1, 2})
+        self.assertSetEqual(p[5][4], {2, 8})
+        ss = sp.xy_wing()
+        self.assertSetEqual(ss.updated_cells, {('c503', 2), ('c513', 2), ('c575', 2)})
+        self.assertIsNone(sp.xy_wing())
+
+    def test_xyz_wing(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.xyz_wing_board))
+        p = sp.get_possibilities()
+        self.assertSetEqual(p[8][3], {6, 7, 8})
+        self.assertSetEqual(p[6][3], {7, 8})
+        self.assertSetEqual(p[7][5], {6, 7})
+        self.assertIn(7, p[8][5])
+        ss = sp.xyz_wing()
+        self.assertSetEqual(ss.updated_cells, {('c857', 7)})
+
+    def test_w_wing(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.w_wing_board))
+        p = sp.get_possibilities()
+        self.assertSetEqual(p[1][3], {1, 4})
+        self.assertSetEqual(p[4][5], {1, 4})
+        # The strong link on 1 in col 4
+        self.assertListEqual([y for y in all_locs if 1 in p[y][4]], [0, 3])
+        ss = sp.w_wing()
+        self.assertSetEqual(ss.updated_cells, {('c151', 4), ('c334', 4)})
+
+    def test_simple_coloring(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.color_trap_board))
+        # Starting from c072
+        colors = sp.get_strong_link_colors(5, 7)
+        self.assertListEqual([{sp.board[cell_id // 9][cell_id % 9] for cell_id in bitboard_to_cell_ids(color)}
+                              for color in colors], [{'c072', 'c523', 'c385'}, {'c082', 'c323', 'c575'}])
+        self.assertIsNone(sp.simple_coloring(3))
+        ss = sp.simple_coloring(5)
+        # c503 sees c523 and c575. c788 sees c385 and c082
+        self.assertSetEqual(ss.updated_cells, {('c503', 5), ('c788', 5)})
+        sp = SudokuPuzzle(self.get_board_copy(self.color_wrap_board))
+        ss = sp.simple_coloring(1)
+        # c131 and c241 are both in block 1
+        self.assertSetEqual(ss.updated_cells, {('c131', 1), ('c241', 1)})
+
+    def test_x_chain(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.x_chain_board))
+        ss = sp.x_chain(4)
+        # c062 or c231 is 4
+        self.assertIn('c062 - c072 - c575 - c544 - c241 - c231', ss.reason)
+        self.assertSetEqual(ss.updated_cells, {('c262', 4), ('c272', 4), ('c282', 4)})
+
+    def test_templates(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.empty_board))
+        for val in all_possibilities:
+            self.assertEqual(sp.get_template_cells(val), all_cells_bitboard)
+        self.assertIsNone(sp.perform_templates())
+        # Every fish is covered by the templates
+        sp = SudokuPuzzle(self.get_board_copy(self.fish_4_row_board))
+        fish_cells = sp.fish_in_rows({2, 3, 5, 6}).updated_cells
+        sp = SudokuPuzzle(self.get_board_copy(self.fish_4_row_board))
+        self.assertSetEqual(sp.perform_templates().updated_cells, fish_cells)
     # endregion
     ###############################################################################################################
     # Guessing
@@ -1324,6 +1603,29 @@ class TestSudokuPuzzle(unittest.TestCase):
         self.assertTrue(5 in p[0][4])
         self.assertTrue(4 not in p[0][3])
 
+    def test_revert_guess_undoes_trail(self):
+        sp = SudokuPuzzle(self.get_board_copy(self.guess_board))
+        board = sp.get_board()
+        possibilities = sp.get_possibilities()
+        remaining_in_blocks = copy.deepcopy(sp.remaining_in_blocks)
+        locs_left_by_y = copy.deepcopy(sp.locs_left_by_y)
+        num_filled = sp.num_filled
+        sp.make_guess(sp.board[0][3], 4)
+        sp.make_guess(sp.board[0][4], 5)
+        sp.fill_sole_candidate()
+        self.assertTrue(sp.trail)
+        sp.revert_guess()
+        sp.revert_guess()
+        self.assertListEqual(sp.trail, [])
+        self.assertListEqual(sp.get_board(), board)
+        self.assertEqual(sp.num_filled, num_filled)
+        self.assertListEqual(sp.remaining_in_blocks, remaining_in_blocks)
+        # Only the candidate of the first guess is removed
+        possibilities[0][3].discard(4)
+        locs_left_by_y[0][4].discard(3)
+        self.assertListEqual(sp.get_possibilities(), possibilities)
+        self.assertListEqual(sp.locs_left_by_y, locs_left_by_y)
+
     def test_validate_updated_cells_missing_candidate(self):
         sp = SudokuPuzzle(self.get_board_copy(self.missing_candidate_validation_board))
         cell_name = sp.board[2][8]
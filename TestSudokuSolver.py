@@ -0,0 +1,98 @@
+import contextlib
+import io
+import time
+import unittest
+from SudokuBudget import SudokuBudget
+from SudokuPuzzle import SudokuPuzzle
+from SudokuSolver import SudokuSolver
+import TestSudokuFastSolver
+import TestSudokuPuzzle
+
+__author__ = 'william'
+
+
+class TestSudokuSolver(unittest.TestCase):
+
+    @staticmethod
+    def do_work(board, budget=None):
+        ss = SudokuSolver(SudokuPuzzle([row[:] for row in board]), budget=budget)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = ss.do_work()
+        return ss, result
+
+    def test_do_work_solves(self):
+        for board_name in ['test_board', 'guess_board', 'empty_board']:
+            (ss, result) = self.do_work(getattr(TestSudokuPuzzle.TestSudokuPuzzle, board_name))
+            self.assertTrue(result.solved)
+            self.assertEqual(result.reason, "Solved")
+            self.assertEqual(ss.state, 'Done')
+            self.assertSetEqual(SudokuPuzzle(result.board).validate_board(), set())
+            self.assertEqual(result.num_steps, ss.sudoku_logger.step_num)
+
+    def test_do_work_no_solution(self):
+        (ss, result) = self.do_work(TestSudokuFastSolver.TestSudokuFastSolver.no_solution_board)
+        self.assertFalse(result.solved)
+        self.assertEqual(result.reason, "The puzzle has no solution")
+        self.assertEqual(ss.state, 'Not_Complete')
+
+    def test_max_steps(self):
+        (ss, result) = self.do_work(TestSudokuPuzzle.TestSudokuPuzzle.test_board, SudokuBudget(max_steps=5))
+        self.assertFalse(result.solved)
+        self.assertEqual(result.reason, "Reached the maximum of 5 steps")
+        self.assertEqual(result.num_steps, 5)
+        self.assertListEqual(result.board, ss.sudoku_puzzle.get_board())
+        self.assertListEqual(result.possibilities, ss.sudoku_puzzle.get_possibilities())
+
+    def test_max_guesses_and_depth(self):
+        empty_board = TestSudokuPuzzle.TestSudokuPuzzle.empty_board
+        (ss, result) = self.do_work(empty_board, SudokuBudget(max_guesses=3))
+        self.assertEqual(result.reason, "Reached the maximum of 3 guesses")
+        self.assertEqual(result.num_guesses, 3)
+        (ss, result) = self.do_work(empty_board, SudokuBudget(max_guess_depth=2))
+        self.assertEqual(result.reason, "Reached the maximum guess depth of 2")
+        self.assertEqual(result.guess_depth, 2)
+        self.assertEqual(result.to_json()['guess_depth'], 2)
+
+    def test_deadline(self):
+        (ss, result) = self.do_work(TestSudokuPuzzle.TestSudokuPuzzle.empty_board, SudokuBudget(deadline=time.time()))
+        self.assertFalse(result.solved)
+        self.assertEqual(result.reason, "Reached the deadline")
+        self.assertEqual(result.num_steps, 0)
+
+    def test_parse_timeout(self):
+        self.assertEqual(SudokuBudget.parse_timeout(None, 10), 10)
+        self.assertEqual(SudokuBudget.parse_timeout("2.5", 10), 2.5)
+        self.assertEqual(SudokuBudget.parse_timeout(60, 10), 10)
+        for timeout in ["nan", "inf", float('nan'), 0, -1, "soon", [1]]:
+            self.assertRaises(ValueError, SudokuBudget.parse_timeout, timeout, 10)
+
+    def test_parse_limit(self):
+        self.assertIsNone(SudokuBudget.parse_limit('max_steps', None))
+        self.assertEqual(SudokuBudget.parse_limit('max_steps', "5"), 5)
+        self.assertEqual(SudokuBudget.parse_limit('max_guesses', 0), 0)
+        self.assertEqual(SudokuBudget.parse_limit('max_guesses', 4.0), 4)
+        self.assertEqual(SudokuBudget.parse_limit('max_guesses', "4.0"), 4)
+        for limit in ["five", "-1", -3, float('inf'), float('nan'), [1], 2.5, "2.5", True]:
+            self.assertRaises(ValueError, SudokuBudget.parse_limit, 'max_guess_depth', limit)
+        # A parsed limit can be compared by the budget
+        budget = SudokuBudget(max_steps=SudokuBudget.parse_limit('max_steps', "5"))
+        self.assertEqual(budget.get_exceeded_reason(5), "Reached the maximum of 5 steps")
+
+    def test_profile(self):
+        board = TestSudokuPuzzle.TestSudokuPuzzle.guess_board
+        (ss, result) = self.do_work(board)
+        self.assertIsNone(ss.get_profile())
+        self.assertNotIn('make_guess', vars(ss))
+        ss = SudokuSolver(SudokuPuzzle([row[:] for row in board]), profile=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            profiled_result = ss.do_work()
+        self.assertListEqual(profiled_result.board, result.board)
+        profile = {stats.technique_name: stats for stats in ss.get_profile()}
+        self.assertListEqual([stats.technique_name for stats in ss.get_profile()], ss.get_technique_names())
+        # No guess is reverted, so every logged step apart from the initial puzzle is the success of one technique
+        self.assertEqual(profile['revert_guess'].num_calls, 0)
+        self.assertEqual(sum(stats.num_successes for stats in ss.get_profile()), result.num_steps - 1)
+        self.assertEqual(profile['make_guess'].num_successes, result.num_guesses)
+        self.assertGreater(profile['fill_sole_candidate'].num_eliminations, 0)
+        self.assertGreaterEqual(profile['fill_unique_candidate'].num_calls, profile['naked_pair'].num_calls)
+        self.assertEqual(profile['kite'].to_json()['num_calls'], profile['kite'].num_calls)
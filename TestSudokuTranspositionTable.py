@@ -0,0 +1,70 @@
+import unittest
+from SudokuBitPuzzle import SudokuBitPuzzle
+from SudokuFastSolver import count_solutions
+from SudokuFastSolver import solve_fast
+from SudokuGuessStrategy import SudokuGuessStrategy
+from SudokuPuzzle import SudokuPuzzle
+from SudokuTranspositionTable import SudokuTranspositionTable
+import TestSudokuFastSolver
+import TestSudokuNogoods
+import TestSudokuPuzzle
+
+__author__ = 'william'
+
+
+class TestSudokuTranspositionTable(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        table = SudokuTranspositionTable(2)
+        table.put(1)
+        table.put(2, 'two')
+        self.assertIn(1, table)
+        table.put(3)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.num_evictions, 1)
+        self.assertNotIn(2, table)
+        self.assertIsNone(table.get(2))
+        self.assertTrue(table.get(1))
+        self.assertEqual(table.num_hits, 2)
+
+    def test_same_candidates_same_hash(self):
+        board = TestSudokuPuzzle.TestSudokuPuzzle.test_board
+        sp = SudokuPuzzle([row[:] for row in board])
+        sbp = SudokuBitPuzzle([row[:] for row in board])
+        self.assertEqual(sp.zobrist_hash, sbp.zobrist_hash)
+        other_sbp = SudokuBitPuzzle([row[:] for row in TestSudokuPuzzle.TestSudokuPuzzle.kite_board])
+        self.assertNotEqual(other_sbp.zobrist_hash, sbp.zobrist_hash)
+
+    def test_solve_fast_recording_dead_states(self):
+        board_names = TestSudokuFastSolver.TestSudokuFastSolver.board_names
+        no_solution_board = TestSudokuFastSolver.TestSudokuFastSolver.no_solution_board
+        for learn_nogoods in [False, True]:
+            dead_states = SudokuTranspositionTable()
+            for board in [getattr(TestSudokuPuzzle.TestSudokuPuzzle, name) for name in board_names]:
+                expected = solve_fast([row[:] for row in board], learn_nogoods=learn_nogoods)
+                solution = solve_fast([row[:] for row in board], learn_nogoods=learn_nogoods, dead_states=dead_states)
+                self.assertListEqual(solution, expected)
+            self.assertIsNone(solve_fast([row[:] for row in no_solution_board], learn_nogoods=learn_nogoods,
+                                         dead_states=dead_states))
+
+    def test_dead_states_shared_between_solves(self):
+        board = TestSudokuNogoods.TestSudokuNogoods.hard_board
+        dead_states = SudokuTranspositionTable()
+        strategy = SudokuGuessStrategy()
+        solution = solve_fast([row[:] for row in board], guess_strategy=strategy, dead_states=dead_states)
+        self.assertGreater(len(dead_states), 0)
+        # The second solve reverts a guess as soon as it reaches a state which is already known to be dead
+        second_strategy = SudokuGuessStrategy()
+        self.assertListEqual(solve_fast([row[:] for row in board], guess_strategy=second_strategy,
+                                        dead_states=dead_states), solution)
+        self.assertGreater(dead_states.num_hits, 0)
+        self.assertLess(second_strategy.num_guesses, strategy.num_guesses)
+
+    def test_count_solutions_cache(self):
+        cache = SudokuTranspositionTable()
+        board = TestSudokuPuzzle.TestSudokuPuzzle.naked_triple_board
+        self.assertEqual(count_solutions([row[:] for row in board], None, cache=cache), 8)
+        self.assertEqual(count_solutions([row[:] for row in board], None, cache=cache), 8)
+        self.assertEqual(cache.num_hits, 1)
+        self.assertEqual(count_solutions([row[:] for row in board], 5, cache=cache), 5)
+        self.assertEqual(len(cache), 2)